@@ -3,6 +3,8 @@
 Professional Dashboard with Perfect Layout & Maximized View
 """
 import os
+import argparse
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import pandas as pd
@@ -12,13 +14,56 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 import seaborn as sns
-from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.linear_model import Ridge
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import warnings
 
+from perf_monitor import tracer, profiler
+from analytics import (build_insights_text, compute_kpi_table, update_kpi_table, top_product,
+                       RollingStats, detect_anomalies, detect_seasonality, stl_decompose,
+                       fit_price_elasticity)
+from charts import (DEFAULT_THEME, build_dashboard_figure, build_decomposition_figure, save_figure,
+                    export_chart_pack)
+from reporting import (write_excel_report, daily_product_totals, build_report, report_text,
+                       write_report_files, export_report_batch)
+from data_quality import GAP_FILL_MODES, repair_sales_data
+from aggregate_store import AggregateStore
+from data_sources import FileSource, FolderSource, MultiFileSource, open_source
+from forecast_history import INTERVAL_Z, ForecastHistory
+from intermittent import (DEMAND_CLASSES, INTERMITTENT_MODELS, MIN_DEMANDS, ROUTED_MODEL,
+                          classify_demand, croston_rates, routed_rates)
+from inventory import (LEAD_TIME_DAYS, REVIEW_DAYS, SERVICE_LEVEL_Z, N_PATHS, reorder_policy,
+                       simulate_inventory)
+from sales_data import (to_compact, memory_footprint, day_to_datetime, datetime_to_day, DailyMatrix,
+                        SparseDaily, SliceIndex, SchemaError)
+from trend import fit_matrix_trends, fit_trends
+from ui_widgets import UpdateScheduler, VirtualGrid
+
 warnings.filterwarnings('ignore')
 
+# How often a watched folder is scanned for new or changed files
+WATCH_POLL_MS = 2000
+
+# Quiet time after a selection change before the dashboard is redrawn
+SELECTION_DEBOUNCE_MS = 150
+
+# Every forecast run keeps its metric rows in the results grid; only the
+# most recent ones also keep the series and predictions behind their chart
+MAX_FORECAST_CHARTS = 50
+
+# What a forecast run keeps of each model (the fitted estimators are dropped)
+RUN_MODEL_KEYS = ('mae', 'rmse', 'r2', 'predictions')
+
+# Trailing training windows offered in the forecast settings (days)
+TRAINING_WINDOWS = {
+    "All History": None,
+    "90 Days": 90,
+    "1 Year": 365,
+    "2 Years": 730,
+    "3 Years": 1095,
+}
+
 
 class SmartSalesForecaster:
     def __init__(self, root):
@@ -39,8 +84,33 @@ class SmartSalesForecaster:
 
         # Initialize data
         self.sales_data = None
+        self.data_source = None
+        self.slice_index = None
+        self.dimension_filters = {}
+        self.dimension_vars = {}
+        self.day_range = None
+        self.daily_matrix = None
+        # Slice index orderings and full-data aggregates of a dataset opened from its store
+        self.store = None
+        self.stored_orders = None
+        self.stored_aggregates = None
+        self.kpi_table = None
+        self.rolling_stats = None
+        self.anomalies = None
+        self.seasonality = None
+        self.quality_report = None
+        self.elasticity = None
+        self.sparse_daily = None
+        self.demand = None
+        self.trends = None
         self.forecast_results = None
+        self.forecast_runs = {}
+        self.dashboard_figure = None
+        self.background_job = None
+        self.watch_source = None
+        self.history = ForecastHistory()
         self.models = {}
+        self.forecast_product = None
         self.current_product = "All Products"
 
         # Enhanced Color scheme
@@ -56,6 +126,9 @@ class SmartSalesForecaster:
         self.text_secondary = '#8892b0'
         self.grid_color = '#2d3748'
 
+        # Redraws are scheduled on the event loop and coalesced
+        self.ui_updates = UpdateScheduler(self.root)
+
         # Setup enhanced styles
         self.setup_styles()
 
@@ -265,6 +338,21 @@ class SmartSalesForecaster:
                   fg=self.bg_color,
                   **btn_style).pack(fill=tk.X, pady=(0, 8))
 
+        tk.Button(data_section,
+                  text="🗂 Load Folder",
+                  command=self.load_folder_data,
+                  bg=self.primary_color,
+                  fg='white',
+                  **btn_style).pack(fill=tk.X, pady=(0, 8))
+
+        self.watch_button = tk.Button(data_section,
+                                      text="👀 Watch Folder",
+                                      command=self.toggle_watch_folder,
+                                      bg=self.primary_color,
+                                      fg='white',
+                                      **btn_style)
+        self.watch_button.pack(fill=tk.X, pady=(0, 8))
+
         tk.Button(data_section,
                   text="🎲 Generate Sample Data",
                   command=self.generate_sample_data,
@@ -279,6 +367,23 @@ class SmartSalesForecaster:
                   fg='white',
                   **btn_style).pack(fill=tk.X)
 
+        gap_frame = tk.Frame(data_section, bg=self.card_bg)
+        gap_frame.pack(fill=tk.X, pady=(10, 0))
+
+        tk.Label(gap_frame,
+                 text="Missing Days:",
+                 font=('Segoe UI', 10),
+                 bg=self.card_bg,
+                 fg=self.text_secondary).pack(side=tk.LEFT)
+
+        self.gap_fill_var = tk.StringVar(value=GAP_FILL_MODES[0])
+        ttk.Combobox(gap_frame,
+                     textvariable=self.gap_fill_var,
+                     values=GAP_FILL_MODES,
+                     font=('Segoe UI', 10),
+                     state='readonly',
+                     width=8).pack(side=tk.RIGHT)
+
         # Product Selection Section
         product_section = tk.LabelFrame(sidebar_content,
                                         text="🎯 PRODUCT FOCUS",
@@ -304,6 +409,72 @@ class SmartSalesForecaster:
         self.product_combo.pack(fill=tk.X, pady=(0, 5))
         self.product_combo.bind('<<ComboboxSelected>>', self.on_product_change)
 
+        tk.Button(product_section,
+                  text="📉 Seasonal Decomposition",
+                  command=self.show_decomposition,
+                  font=('Segoe UI', 10),
+                  bg=self.grid_color,
+                  fg='white',
+                  relief='flat',
+                  pady=6).pack(fill=tk.X, pady=(8, 0))
+
+        # One selector per extra categorical column (store, region, ...),
+        # filled in when data is loaded
+        self.dimension_frame = tk.Frame(product_section, bg=self.card_bg)
+        self.dimension_frame.pack(fill=tk.X)
+
+        # Date Range Section
+        date_section = tk.LabelFrame(sidebar_content,
+                                     text="📆 DATE RANGE",
+                                     font=('Segoe UI', 11, 'bold'),
+                                     bg=self.card_bg,
+                                     fg=self.accent_color,
+                                     padx=15,
+                                     pady=15)
+        date_section.pack(fill=tk.X, pady=(0, 20))
+
+        self.date_from_var = tk.StringVar()
+        self.date_to_var = tk.StringVar()
+        for label, var in (("From:", self.date_from_var), ("To:", self.date_to_var)):
+            row = tk.Frame(date_section, bg=self.card_bg)
+            row.pack(fill=tk.X, pady=(0, 5))
+
+            tk.Label(row,
+                     text=label,
+                     font=('Segoe UI', 10),
+                     bg=self.card_bg,
+                     fg=self.text_secondary).pack(side=tk.LEFT)
+
+            tk.Entry(row,
+                     textvariable=var,
+                     font=('Segoe UI', 10),
+                     width=12,
+                     bg=self.grid_color,
+                     fg='white',
+                     insertbackground='white',
+                     relief='flat').pack(side=tk.RIGHT)
+
+        date_buttons = tk.Frame(date_section, bg=self.card_bg)
+        date_buttons.pack(fill=tk.X, pady=(5, 0))
+
+        tk.Button(date_buttons,
+                  text="Apply",
+                  command=self.apply_date_range,
+                  font=('Segoe UI', 10),
+                  bg=self.primary_color,
+                  fg='white',
+                  relief='flat',
+                  pady=4).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 4))
+
+        tk.Button(date_buttons,
+                  text="Full History",
+                  command=self.reset_date_range,
+                  font=('Segoe UI', 10),
+                  bg=self.grid_color,
+                  fg='white',
+                  relief='flat',
+                  pady=4).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(4, 0))
+
         # Model Selection Section
         model_section = tk.LabelFrame(sidebar_content,
                                       text="🤖 ML MODELS",
@@ -369,6 +540,34 @@ class SmartSalesForecaster:
                                  buttonbackground=self.primary_color)
         period_spin.pack(side=tk.RIGHT)
 
+        window_frame = tk.Frame(forecast_section, bg=self.card_bg)
+        window_frame.pack(fill=tk.X, pady=(10, 0))
+
+        tk.Label(window_frame,
+                 text="Train On Last:",
+                 font=('Segoe UI', 10),
+                 bg=self.card_bg,
+                 fg=self.text_secondary).pack(side=tk.LEFT)
+
+        self.training_window_var = tk.StringVar(value="All History")
+        ttk.Combobox(window_frame,
+                     textvariable=self.training_window_var,
+                     values=list(TRAINING_WINDOWS),
+                     font=('Segoe UI', 10),
+                     state='readonly',
+                     width=10).pack(side=tk.RIGHT)
+
+        self.exclude_anomalies_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(forecast_section,
+                       text="Exclude anomalies from training",
+                       variable=self.exclude_anomalies_var,
+                       font=('Segoe UI', 10),
+                       bg=self.card_bg,
+                       fg=self.text_color,
+                       selectcolor=self.card_bg,
+                       activebackground=self.card_bg,
+                       activeforeground=self.text_color).pack(anchor=tk.W, pady=(10, 0))
+
         # Big Action Button
         forecast_btn = tk.Button(sidebar_content,
                                  text="🚀 RUN FORECAST ANALYSIS",
@@ -416,7 +615,12 @@ class SmartSalesForecaster:
         self.notebook.add(self.insights_tab, text='📈 BUSINESS INSIGHTS')
         self.setup_insights_tab()
 
-        # Tab 4: Export
+        # Tab 4: Performance
+        self.performance_tab = tk.Frame(self.notebook, bg=self.bg_color)
+        self.notebook.add(self.performance_tab, text='⏱️ PERFORMANCE')
+        self.setup_performance_tab()
+
+        # Tab 5: Export
         self.export_tab = tk.Frame(self.notebook, bg=self.bg_color)
         self.notebook.add(self.export_tab, text='💾 EXPORT & REPORTS')
         self.setup_export_tab()
@@ -467,36 +671,91 @@ class SmartSalesForecaster:
                  bg=self.bg_color,
                  fg=self.text_color).pack(anchor='w', pady=(0, 20))
 
-        # Create frame for table with scrollbar
-        table_frame = tk.Frame(container, bg=self.bg_color)
-        table_frame.pack(fill=tk.BOTH, expand=True)
-
-        # Create treeview with enhanced styling
-        columns = ('Model', 'MAE', 'RMSE', 'R² Score', 'Status')
-
-        self.metrics_tree = ttk.Treeview(table_frame,
-                                         columns=columns,
-                                         show='headings',
-                                         style='Custom.Treeview',
-                                         height=12)
+        # Results of every forecast run, one row per product and model. Only
+        # the visible rows are rendered, so the grid scales to whole catalogs;
+        # double-click a row to reopen that product's forecast chart
+        columns = ('Product', 'Model', 'MAE', 'RMSE', 'R² Score', 'Status')
+        col_widths = {'Product': 200, 'Model': 180, 'MAE': 120, 'RMSE': 120, 'R² Score': 100, 'Status': 120}
+        col_anchors = {'Product': tk.W, 'Model': tk.W}
+        metric = lambda value: f"{value:,.2f}" if np.isfinite(value) else "Error"
+        score = lambda value: f"{value:.3f}" if np.isfinite(value) else "Error"
+
+        self.metrics_grid = VirtualGrid(container,
+                                        columns,
+                                        widths=col_widths,
+                                        anchors=col_anchors,
+                                        formats={'MAE': metric, 'RMSE': metric, 'R² Score': score},
+                                        filter_column='Product',
+                                        on_open=self.open_forecast_result,
+                                        bg=self.bg_color)
+        self.metrics_grid.pack(fill=tk.BOTH, expand=True)
+        for color in (self.success_color, self.warning_color, self.danger_color):
+            self.metrics_grid.tag_configure(color, foreground=color)
+
+        # Price what-if: a post-hoc scaling of the trained forecasts through
+        # the fitted elasticity. Price is not a regressor of the forecast
+        # models, so changing it never refits a model
+        what_if_frame = tk.Frame(container, bg=self.card_bg, padx=15, pady=15)
+        what_if_frame.pack(fill=tk.X, pady=(20, 0))
+
+        tk.Label(what_if_frame,
+                 text="💲 Price What-If",
+                 font=('Segoe UI', 11, 'bold'),
+                 bg=self.card_bg,
+                 fg=self.accent_color).pack(anchor='w')
 
-        # Configure columns with proper width and alignment
-        col_widths = {'Model': 180, 'MAE': 120, 'RMSE': 120, 'R² Score': 100, 'Status': 120}
-        col_anchors = {'Model': tk.W, 'MAE': tk.CENTER, 'RMSE': tk.CENTER, 'R² Score': tk.CENTER, 'Status': tk.CENTER}
+        change_frame = tk.Frame(what_if_frame, bg=self.card_bg)
+        change_frame.pack(fill=tk.X, pady=(8, 8))
 
-        for col in columns:
-            self.metrics_tree.heading(col, text=col)
-            self.metrics_tree.column(col, width=col_widths[col], anchor=col_anchors[col])
+        tk.Label(change_frame,
+                 text="Price Change %:",
+                 font=('Segoe UI', 10),
+                 bg=self.card_bg,
+                 fg=self.text_secondary).pack(side=tk.LEFT)
 
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(table_frame,
-                                  orient=tk.VERTICAL,
-                                  command=self.metrics_tree.yview)
-        self.metrics_tree.configure(yscrollcommand=scrollbar.set)
+        self.price_change_var = tk.IntVar(value=0)
+        price_spin = tk.Spinbox(change_frame,
+                                from_=-50,
+                                to=50,
+                                increment=5,
+                                textvariable=self.price_change_var,
+                                command=self.update_what_if,
+                                font=('Segoe UI', 10),
+                                width=6,
+                                bg=self.grid_color,
+                                fg='white',
+                                relief='flat',
+                                buttonbackground=self.primary_color)
+        price_spin.pack(side=tk.LEFT, padx=(10, 0))
+        price_spin.bind('<KeyRelease>', self.update_what_if)
+
+        self.what_if_label = tk.Label(what_if_frame,
+                                      text="Run a forecast to explore price changes",
+                                      font=('Segoe UI', 10),
+                                      bg=self.card_bg,
+                                      fg=self.text_color,
+                                      justify=tk.LEFT)
+        self.what_if_label.pack(anchor='w')
+
+        tk.Button(container,
+                  text="📦 Simulate Inventory Policies",
+                  command=self.run_inventory_simulation,
+                  font=('Segoe UI', 10, 'bold'),
+                  bg=self.primary_color,
+                  fg='white',
+                  relief='flat',
+                  padx=20,
+                  pady=8).pack(anchor='w', pady=(15, 0))
 
-        # Pack with proper spacing
-        self.metrics_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tk.Button(container,
+                  text="📜 Forecast Accuracy History",
+                  command=self.show_forecast_accuracy,
+                  font=('Segoe UI', 10, 'bold'),
+                  bg=self.primary_color,
+                  fg='white',
+                  relief='flat',
+                  padx=20,
+                  pady=8).pack(anchor='w', pady=(10, 0))
 
     def setup_insights_tab(self):
         """Setup insights tab with proper layout"""
@@ -531,6 +790,142 @@ class SmartSalesForecaster:
         self.insights_text.tag_config('warning', foreground=self.warning_color)
         self.insights_text.tag_config('danger', foreground=self.danger_color)
 
+    def setup_performance_tab(self):
+        """Setup performance tab with per-stage timing spans"""
+        # Main container
+        container = tk.Frame(self.performance_tab, bg=self.bg_color, padx=20, pady=20)
+        container.pack(fill=tk.BOTH, expand=True)
+
+        # Title row with actions
+        header = tk.Frame(container, bg=self.bg_color)
+        header.pack(fill=tk.X, pady=(0, 15))
+
+        tk.Label(header,
+                 text="Stage Timing Breakdown",
+                 font=self.heading_font,
+                 bg=self.bg_color,
+                 fg=self.text_color).pack(side=tk.LEFT)
+
+        btn_style = {'font': ('Segoe UI', 9), 'relief': 'flat', 'padx': 12, 'pady': 5}
+
+        tk.Button(header,
+                  text="💾 Export Trace",
+                  command=self.export_performance_trace,
+                  bg=self.accent_color,
+                  fg=self.bg_color,
+                  **btn_style).pack(side=tk.RIGHT, padx=(10, 0))
+
+        tk.Button(header,
+                  text="🧹 Clear",
+                  command=self.clear_performance_data,
+                  bg=self.grid_color,
+                  fg='white',
+                  **btn_style).pack(side=tk.RIGHT, padx=(10, 0))
+
+        tk.Button(header,
+                  text="🔄 Refresh",
+                  command=self.refresh_performance_panel,
+                  bg=self.primary_color,
+                  fg='white',
+                  **btn_style).pack(side=tk.RIGHT)
+
+        # Aggregated stage table
+        summary_frame = tk.Frame(container, bg=self.bg_color)
+        summary_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ('Stage', 'Calls', 'Total (ms)', 'Avg (ms)', 'Max (ms)', 'Last (ms)')
+        self.perf_tree = ttk.Treeview(summary_frame,
+                                      columns=columns,
+                                      show='headings',
+                                      style='Custom.Treeview',
+                                      height=8)
+
+        for col in columns:
+            self.perf_tree.heading(col, text=col)
+            self.perf_tree.column(col,
+                                  width=220 if col == 'Stage' else 100,
+                                  anchor=tk.W if col == 'Stage' else tk.CENTER)
+
+        scrollbar = ttk.Scrollbar(summary_frame,
+                                  orient=tk.VERTICAL,
+                                  command=self.perf_tree.yview)
+        self.perf_tree.configure(yscrollcommand=scrollbar.set)
+        self.perf_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Most recent spans, nested stages indented
+        tk.Label(container,
+                 text="Recent Spans",
+                 font=('Segoe UI', 11, 'bold'),
+                 bg=self.bg_color,
+                 fg=self.text_secondary).pack(anchor='w', pady=(15, 8))
+
+        self.perf_recent_text = scrolledtext.ScrolledText(container,
+                                                          height=10,
+                                                          font=('Consolas', 9),
+                                                          bg=self.card_bg,
+                                                          fg=self.text_color,
+                                                          relief='flat',
+                                                          padx=10,
+                                                          pady=10)
+        self.perf_recent_text.pack(fill=tk.BOTH, expand=True)
+
+        self._perf_refresh_job = None
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+    def on_tab_changed(self, event=None):
+        """Refresh live panels while their tab is visible"""
+        if self._perf_refresh_job is not None:
+            self.root.after_cancel(self._perf_refresh_job)
+            self._perf_refresh_job = None
+
+        if self.notebook.select() == str(self.performance_tab):
+            self.refresh_performance_panel()
+            self._perf_refresh_job = self.root.after(2000, self.on_tab_changed)
+
+    def refresh_performance_panel(self):
+        """Reload the performance tab from the in-memory span buffer"""
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        for entry in tracer.summary():
+            self.perf_tree.insert('', 'end',
+                                  values=(entry['name'],
+                                          entry['count'],
+                                          f"{entry['total_ms']:,.1f}",
+                                          f"{entry['avg_ms']:,.1f}",
+                                          f"{entry['max_ms']:,.1f}",
+                                          f"{entry['last_ms']:,.1f}"))
+
+        lines = []
+        for span in tracer.recent(100):
+            indent = "  " * span['depth']
+            lines.append(f"{span['start_ms']:>12,.1f} ms  {indent}{span['name']:<40} "
+                         f"{span['duration_ms']:>10,.2f} ms")
+
+        if profiler.last_report:
+            lines.insert(0, f"🔬 Last profile report: {profiler.last_report}\n")
+
+        self.perf_recent_text.delete('1.0', tk.END)
+        self.perf_recent_text.insert('1.0', "\n".join(lines) if lines else "No spans recorded yet")
+
+    def clear_performance_data(self):
+        """Discard recorded spans"""
+        tracer.clear()
+        self.refresh_performance_panel()
+
+    def export_performance_trace(self):
+        """Export recorded spans as a Chrome trace JSON file"""
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[('Chrome trace', '*.json'), ('All files', '*.*')]
+        )
+
+        if filepath:
+            try:
+                count = tracer.export_chrome_trace(filepath)
+                self.update_status(f"✅ Trace exported: {count} spans to {os.path.basename(filepath)}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not export trace: {str(e)}")
+
     def setup_export_tab(self):
         """Setup export tab with proper layout"""
         # Main container
@@ -608,6 +1003,23 @@ class SmartSalesForecaster:
         """Generate sample sales data for demo"""
         self.update_status("🎲 Generating sample data...")
 
+        with tracer.span('load: sample data', 'load'):
+            self._generate_sample_frame()
+
+        self.stop_watching()
+        self.data_source = None
+        self.store = self.stored_orders = self.stored_aggregates = None
+        self.dimension_filters = {}
+        self.reset_slice()
+        self.rebuild_aggregates()
+        self.update_product_list()
+        self.request_redraw()
+        self.generate_insights()
+
+        self.update_status("✅ Sample data loaded successfully")
+
+    def _generate_sample_frame(self):
+        """Build the synthetic sales frame"""
         # Generate dates
         start_date = datetime.now() - timedelta(days=365)
         dates = pd.date_range(start=start_date, end=datetime.now(), freq='D')
@@ -646,14 +1058,10 @@ class SmartSalesForecaster:
                     'Price': round(np.random.uniform(15, 600), 2)
                 })
 
-        self.sales_data = pd.DataFrame(data)
-        self.update_product_list()
-        self.update_kpis()
-        self.plot_sales_dashboard()
-        self.generate_insights()
-
-        self.update_status("✅ Sample data loaded successfully")
+        self.sales_data = to_compact(pd.DataFrame(data))
 
+    @profiler.profiled('plot_sales_dashboard')
+    @tracer.traced('plot: sales dashboard', 'plot')
     def plot_sales_dashboard(self):
         """Plot enhanced sales dashboard with perfect layout"""
         if self.sales_data is None:
@@ -663,180 +1071,260 @@ class SmartSalesForecaster:
         for widget in self.dashboard_tab.winfo_children():
             widget.destroy()
 
-        # Filter data for selected product
-        if self.current_product == 'All Products':
-            plot_data = self.sales_data.copy()
-            title_suffix = "All Products"
-        else:
-            plot_data = self.sales_data[self.sales_data['Product'] == self.current_product]
-            title_suffix = self.current_product
+        # Rows of the active slice for the selected product
+        plot_data = self.slice_frame(self.current_product)
+        title_suffix = self.slice_label(self.current_product)
 
         # Create main container for charts
         charts_container = tk.Frame(self.dashboard_tab, bg=self.bg_color)
         charts_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
-        # Create 2x2 grid of charts
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.patch.set_facecolor(self.bg_color)
-
-        # 1. Sales Trend Chart
-        ax1 = axes[0, 0]
-        if 'Date' in plot_data.columns and 'Sales' in plot_data.columns:
-            daily_sales = plot_data.groupby('Date')['Sales'].sum()
-            ax1.plot(daily_sales.index, daily_sales.values,
-                     color=self.accent_color, linewidth=2.5, alpha=0.8)
-
-            # Add trend line
-            if len(daily_sales) > 30:
-                z = np.polyfit(range(len(daily_sales)), daily_sales.values, 1)
-                p = np.poly1d(z)
-                ax1.plot(daily_sales.index, p(range(len(daily_sales))),
-                         color=self.warning_color, linewidth=2, linestyle='--',
-                         label='Trend Line')
-
-            ax1.set_title(f'📈 Sales Trend - {title_suffix}',
-                          fontsize=14, fontweight='bold', color='white', pad=20)
-            ax1.set_ylabel('Sales ($)', color='white', fontsize=11)
-            ax1.tick_params(axis='x', colors='white', labelsize=9)
-            ax1.tick_params(axis='y', colors='white', labelsize=9)
-            ax1.grid(True, alpha=0.2, color='gray', linestyle='--')
-            ax1.legend(facecolor=self.card_bg, edgecolor='none',
-                       labelcolor='white', fontsize=9)
-
-        ax1.set_facecolor(self.card_bg)
-
-        # 2. Product Performance (if multiple products)
-        ax2 = axes[0, 1]
-        if 'Product' in plot_data.columns and len(plot_data['Product'].unique()) > 1:
-            product_sales = plot_data.groupby('Product')['Sales'].sum().sort_values()
-            colors = plt.cm.viridis(np.linspace(0.2, 0.8, len(product_sales)))
-            bars = ax2.barh(range(len(product_sales)), product_sales.values, color=colors, height=0.6)
-
-            # Add value labels
-            for i, (bar, val) in enumerate(zip(bars, product_sales.values)):
-                ax2.text(val + (val * 0.01), bar.get_y() + bar.get_height() / 2,
-                         f'${val:,.0f}', ha='left', va='center',
-                         fontsize=9, color='white', fontweight='bold')
-
-            ax2.set_title('🏆 Product Performance',
-                          fontsize=14, fontweight='bold', color='white', pad=20)
-            ax2.set_yticks(range(len(product_sales)))
-            ax2.set_yticklabels(product_sales.index, color='white', fontsize=10)
-            ax2.set_xlabel('Total Sales ($)', color='white', fontsize=11)
-            ax2.tick_params(axis='x', colors='white', labelsize=9)
-            ax2.grid(True, alpha=0.2, color='gray', linestyle='--', axis='x')
-
-        ax2.set_facecolor(self.card_bg)
-
-        # 3. Monthly Sales
-        ax3 = axes[1, 0]
-        if 'Date' in plot_data.columns:
-            plot_data['Month'] = plot_data['Date'].dt.strftime('%b %Y')
-            monthly_sales = plot_data.groupby('Month')['Sales'].sum()
-
-            colors = plt.cm.plasma(np.linspace(0.2, 0.8, len(monthly_sales)))
-            bars = ax3.bar(range(len(monthly_sales)), monthly_sales.values,
-                           color=colors, width=0.7, edgecolor='white', linewidth=1)
-
-            # Add value labels
-            for i, (bar, val) in enumerate(zip(bars, monthly_sales.values)):
-                ax3.text(bar.get_x() + bar.get_width() / 2, bar.get_height(),
-                         f'${val:,.0f}', ha='center', va='bottom',
-                         fontsize=9, color='white', rotation=0)
-
-            ax3.set_title('📅 Monthly Sales',
-                          fontsize=14, fontweight='bold', color='white', pad=20)
-            ax3.set_xticks(range(len(monthly_sales)))
-            ax3.set_xticklabels(monthly_sales.index, rotation=45,
-                                color='white', fontsize=9, ha='right')
-            ax3.set_ylabel('Sales ($)', color='white', fontsize=11)
-            ax3.tick_params(axis='y', colors='white', labelsize=9)
-            ax3.grid(True, alpha=0.2, color='gray', linestyle='--', axis='y')
-
-        ax3.set_facecolor(self.card_bg)
-
-        # 4. Moving Averages
-        ax4 = axes[1, 1]
-        if 'Date' in plot_data.columns and 'Sales' in plot_data.columns:
-            daily_sales = plot_data.groupby('Date')['Sales'].sum()
-            ma_7 = daily_sales.rolling(window=7).mean()
-            ma_30 = daily_sales.rolling(window=30).mean()
-
-            ax4.plot(daily_sales.index, daily_sales.values,
-                     color=self.text_secondary, alpha=0.4, linewidth=1, label='Daily')
-            ax4.plot(ma_7.index, ma_7.values,
-                     color=self.success_color, linewidth=2.5, label='7-Day MA')
-            ax4.plot(ma_30.index, ma_30.values,
-                     color=self.accent_color, linewidth=2.5, label='30-Day MA')
-
-            ax4.fill_between(ma_7.index, ma_7.values, alpha=0.2, color=self.success_color)
-            ax4.fill_between(ma_30.index, ma_30.values, alpha=0.1, color=self.accent_color)
-
-            ax4.set_title('📊 Moving Averages Analysis',
-                          fontsize=14, fontweight='bold', color='white', pad=20)
-            ax4.set_xlabel('Date', color='white', fontsize=11)
-            ax4.set_ylabel('Sales ($)', color='white', fontsize=11)
-            ax4.tick_params(axis='x', colors='white', labelsize=9)
-            ax4.tick_params(axis='y', colors='white', labelsize=9)
-            ax4.legend(facecolor=self.card_bg, edgecolor='none',
-                       labelcolor='white', fontsize=10, loc='upper left')
-            ax4.grid(True, alpha=0.2, color='gray', linestyle='--')
-
-        ax4.set_facecolor(self.card_bg)
-
-        # Adjust layout
-        plt.tight_layout()
+        # Build the 2x2 dashboard; kept so chart export can reuse it
+        fig = build_dashboard_figure(plot_data, title_suffix, self.chart_theme(),
+                                     daily_features=self.daily_features(self.current_product))
+        self.dashboard_figure = fig
 
         # Embed in tkinter with proper sizing
         canvas = FigureCanvasTkAgg(fig, charts_container)
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+    def chart_theme(self):
+        """Current color scheme as a plain dict for chart rendering"""
+        return {name: getattr(self, name) for name in DEFAULT_THEME}
+
+    def reset_slice(self):
+        """Index freshly loaded data by dimension and clear the active slice"""
+        self.slice_index = SliceIndex(self.sales_data, self.stored_orders)
+        self.dimension_filters = {}
+        self.day_range = None
+        self.show_date_range()
+
+    def show_date_range(self):
+        """Fill the date entries with the active range (or the full history)"""
+        days = self.slice_index.days
+        start, end = self.day_range or (days[0], days[-1])
+        self.date_from_var.set(day_to_datetime([start])[0].strftime('%Y-%m-%d'))
+        self.date_to_var.set(day_to_datetime([end])[0].strftime('%Y-%m-%d'))
+
+    def apply_date_range(self):
+        """Restrict every chart, KPI and model to the entered date range"""
+        if self.sales_data is None:
+            messagebox.showwarning("Warning", "Please load data first")
+            return
+
+        try:
+            start, end = datetime_to_day(pd.to_datetime([self.date_from_var.get(),
+                                                         self.date_to_var.get()]))
+        except (ValueError, TypeError):
+            messagebox.showerror("Error", "Dates must look like YYYY-MM-DD")
+            return
+
+        if self.data_source is not None and self.data_source.pushes_down:
+            # The engine filters the dates; only the range's daily totals come back
+            self.reload_date_range((int(start), int(end)))
+            return
+
+        if not len(self.slice_index.rows(self.dimension_filters, (start, end))):
+            messagebox.showwarning("Warning", "No sales records in that date range")
+            return
+
+        days = self.slice_index.days
+        full = start <= days[0] and end >= days[-1]
+        self.day_range = None if full else (int(start), int(end))
+        self.on_slice_change()
+
+    def reset_date_range(self):
+        """Go back to the full history"""
+        if self.sales_data is None:
+            return
+        if self.data_source is not None and self.data_source.pushes_down:
+            self.reload_date_range(None)
+            return
+        self.day_range = None
+        self.show_date_range()
+        self.on_slice_change()
+
+    def reload_date_range(self, day_range):
+        """Re-query a database source for a new date range"""
+        previous = self.day_range
+        self.day_range = day_range
+        try:
+            self.load_from_source()
+        except SchemaError:
+            self.day_range = previous
+            self.show_date_range()
+            messagebox.showwarning("Warning", "No sales records in that date range")
+            return
+        self.slice_index = SliceIndex(self.sales_data)
+        self.show_date_range()
+        self.on_slice_change()
+
+    def rebuild_aggregates(self):
+        """Precompute the product x day matrix, KPIs, rolling features, anomalies and seasonality"""
+        # The full, unfiltered slice reuses what was saved with the data
+        stored = self.stored_aggregates if not self.dimension_filters and self.day_range is None else None
+        if stored is not None and 'kpi_table' in stored:
+            self.apply_aggregates(stored)
+            return
+
+        aggregates = self.compute_aggregates(self.slice_frame(),
+                                             stored['daily_matrix'] if stored is not None else None)
+        if stored is not None:
+            self.stored_aggregates = aggregates
+            try:
+                self.store.save_aggregates(aggregates)
+            except OSError as e:
+                self.update_status(f"⚠️ Could not cache aggregates: {e}")
+        self.apply_aggregates(aggregates)
+
+    @tracer.traced('aggregate: daily matrix', 'aggregate')
+    def compute_aggregates(self, frame, daily_matrix=None):
+        """Every precomputed aggregate of a slice frame; touches no widgets or state
+
+        daily_matrix may pass in an already built matrix of the same frame.
+        """
+        if daily_matrix is None:
+            daily_matrix = DailyMatrix.from_frame(frame)
+        sparse_daily = SparseDaily.from_frame(frame)
+        return {'daily_matrix': daily_matrix,
+                'sparse_daily': sparse_daily,
+                'demand': classify_demand(sparse_daily),
+                'kpi_table': compute_kpi_table(daily_matrix),
+                'rolling_stats': RollingStats.from_matrix(daily_matrix),
+                'anomalies': detect_anomalies(daily_matrix),
+                'seasonality': detect_seasonality(daily_matrix),
+                'trends': fit_matrix_trends(daily_matrix),
+                'elasticity': fit_price_elasticity(frame)}
+
+    @tracer.traced('aggregate: extend', 'aggregate')
+    def extend_aggregates(self, previous, frame, first_day):
+        """compute_aggregates of frame from those of an earlier state of the data
+
+        frame must hold the same products from the same first day, changed
+        only from first_day on. The daily matrix is re-aggregated from that
+        day, rolling features are appended for the new days, and KPIs and
+        trends are refitted only for the products whose sales changed.
+        Anomaly and seasonality scores depend on a series' whole calendar, so
+        they are redone for every product when days were added and only for
+        the changed ones otherwise. Returns None when frame is no such
+        extension, for a full compute_aggregates.
+        """
+        old = previous['daily_matrix']
+        days = frame['Day'].to_numpy()
+        if not len(days) or int(days.min()) != old.start_day or \
+                int(days.max()) < old.start_day + old.n_days - 1 or \
+                not frame['Product'].cat.categories.equals(old.products):
+            return None
+
+        if first_day is None:
+            first_day = old.start_day + old.n_days
+        daily_matrix, rewritten = old.updated(frame, first_day)
+        added = np.append(daily_matrix.counts[:, old.n_days:].any(axis=1),
+                          daily_matrix.total_counts[old.n_days:].any())
+        changed = np.flatnonzero(rewritten | added)
+
+        rolling_stats = previous['rolling_stats'].copy()
+        rolling_stats.append(np.vstack([daily_matrix.values[:, old.n_days:],
+                                        daily_matrix.totals[None, old.n_days:]]))
+        if rewritten.any():
+            rows = np.flatnonzero(rewritten)
+            rolling_stats = rolling_stats.with_rows(rows, RollingStats.from_matrix(daily_matrix, rows=rows))
+
+        trends, anomalies, seasonality = previous['trends'], previous['anomalies'], previous['seasonality']
+        if len(changed):
+            trends = trends.with_rows(changed, fit_matrix_trends(daily_matrix, rows=changed))
+        if daily_matrix.n_days > old.n_days:
+            anomalies = detect_anomalies(daily_matrix)
+            seasonality = detect_seasonality(daily_matrix)
+        elif len(changed):
+            anomalies = previous['anomalies'].with_rows(changed, detect_anomalies(daily_matrix, rows=changed))
+            seasonality = previous['seasonality'].with_rows(
+                changed, detect_seasonality(daily_matrix, rows=changed))
+
+        sparse_daily = previous['sparse_daily'].updated(frame, first_day, rewritten[:-1])
+        return {'daily_matrix': daily_matrix,
+                'sparse_daily': sparse_daily,
+                'demand': classify_demand(sparse_daily),
+                'kpi_table': update_kpi_table(previous['kpi_table'], daily_matrix, changed),
+                'rolling_stats': rolling_stats,
+                'anomalies': anomalies,
+                'seasonality': seasonality,
+                'trends': trends,
+                'elasticity': fit_price_elasticity(frame)}
+
+    def apply_aggregates(self, aggregates):
+        self.daily_matrix = aggregates['daily_matrix']
+        self.sparse_daily = aggregates['sparse_daily']
+        self.demand = aggregates['demand']
+        self.kpi_table = aggregates['kpi_table']
+        self.rolling_stats = aggregates['rolling_stats']
+        self.anomalies = aggregates['anomalies']
+        self.seasonality = aggregates['seasonality']
+        self.trends = aggregates['trends']
+        self.elasticity = aggregates['elasticity']
+
+    def slice_frame(self, product='All Products'):
+        """Rows of the active dimension slice, optionally narrowed to one product"""
+        # Filters a database source already applied are not local columns
+        filters = {dim: value for dim, value in self.dimension_filters.items()
+                   if dim in self.slice_index.groups}
+        if product != 'All Products':
+            filters['Product'] = product
+        return self.slice_index.select(filters, self.day_range)
+
+    def slice_segment(self):
+        """The active dimension filters as text ('' when unfiltered)"""
+        return " · ".join(f"{dim}: {value}" for dim, value in self.dimension_filters.items())
+
+    def slice_label(self, product='All Products'):
+        """Product name followed by the active dimension filters and date range"""
+        parts = [product] + ([self.slice_segment()] if self.dimension_filters else [])
+        if self.day_range:
+            start, end = day_to_datetime(self.day_range).strftime('%Y-%m-%d')
+            parts.append(f"{start} to {end}")
+        return " · ".join(parts)
+
+    def daily_features(self, product):
+        """Precomputed daily series and moving averages for the dashboard"""
+        if self.rolling_stats is None:
+            return None
+        return {
+            'dates': self.daily_matrix.dates(),
+            'daily': self.daily_matrix.series(product),
+            'ma_7': self.rolling_stats.series('ma_7', product),
+            'ma_30': self.rolling_stats.series('ma_30', product),
+            # The trend fits end with the all-products total
+            'trend': self.trends[len(self.trends) - 1 if product == 'All Products'
+                                 else self.daily_matrix.row(product)].trend()[0],
+        }
+
+    @tracer.traced('aggregate: kpis', 'aggregate')
     def update_kpis(self):
         """Update KPI cards with enhanced information"""
-        if self.sales_data is not None:
-            if self.current_product == 'All Products':
-                data = self.sales_data
+        if self.sales_data is not None and self.kpi_table is not None:
+            # Every product's KPIs are precomputed; switching products is a lookup
+            if self.current_product in self.kpi_table.index:
+                kpis = self.kpi_table.loc[self.current_product]
+                total_sales = kpis['Total Sales']
+                avg_daily = kpis['Avg Daily']
+                growth = kpis['Growth %']
             else:
-                data = self.sales_data[self.sales_data['Product'] == self.current_product]
-
-            # Calculate KPIs
-            total_sales = data['Sales'].sum() if 'Sales' in data.columns else 0
-            avg_daily = data['Sales'].mean() if 'Sales' in data.columns else 0
-
-            # Growth calculation
-            if len(data) > 60 and 'Date' in data.columns:
-                recent = data.sort_values('Date').tail(30)['Sales']
-                older = data.sort_values('Date').head(30)['Sales']
-                if older.mean() > 0:
-                    growth = ((recent.mean() - older.mean()) / older.mean()) * 100
-                else:
-                    growth = 0
-            else:
-                growth = 0
+                total_sales = avg_daily = 0
+                growth = np.nan
 
-            # Top product
-            if 'Product' in self.sales_data.columns:
-                top_product = self.sales_data.groupby('Product')['Sales'].sum().idxmax()
-                top_product_sales = self.sales_data.groupby('Product')['Sales'].sum().max()
-            else:
-                top_product = "N/A"
-                top_product_sales = 0
-
-            # Best day
-            if 'Date' in self.sales_data.columns:
-                daily_sales = self.sales_data.groupby('Date')['Sales'].sum()
-                best_day = daily_sales.idxmax().strftime('%b %d')
-                best_day_sales = daily_sales.max()
+            # Top product and best day cover the whole dataset
+            top = top_product(self.kpi_table)
+            if 'All Products' in self.kpi_table.index:
+                best_day = self.kpi_table.loc['All Products', 'Best Day'].strftime('%b %d')
             else:
                 best_day = "N/A"
-                best_day_sales = 0
 
             # Update KPI labels
             self.kpi_labels['Total Sales'].config(text=f"$ {total_sales:,.0f}")
             self.kpi_labels['Avg Daily'].config(text=f"$ {avg_daily:,.0f}")
-            self.kpi_labels['Growth %'].config(text=f"{growth:+.1f}%")
-            self.kpi_labels['Top Product'].config(text=top_product[:15])
+            self.kpi_labels['Growth %'].config(text="N/A" if np.isnan(growth) else f"{growth:+.1f}%")
+            self.kpi_labels['Top Product'].config(text=str(top)[:15])
             self.kpi_labels['Best Day'].config(text=best_day)
 
             # Update forecast KPI if available
@@ -847,7 +1335,9 @@ class SmartSalesForecaster:
                     self.kpi_labels['Forecast'].config(text=f"$ {forecast_value:,.0f}")
 
             # Color coding for growth
-            if growth >= 10:
+            if np.isnan(growth):
+                self.kpi_labels['Growth %'].config(fg=self.text_secondary)
+            elif growth >= 10:
                 self.kpi_labels['Growth %'].config(fg=self.success_color)
             elif growth >= 0:
                 self.kpi_labels['Growth %'].config(fg=self.warning_color)
@@ -860,128 +1350,514 @@ class SmartSalesForecaster:
         messagebox.showinfo("Success", "✅ New sample data generated!")
 
     def load_csv_data(self):
-        """Load sales data from CSV file"""
-        filetypes = [('CSV files', '*.csv'), ('Excel files', '*.xlsx'), ('All files', '*.*')]
+        """Load sales data from CSV / Excel files or a SQLite / DuckDB database"""
+        filetypes = [('CSV files', '*.csv'), ('Excel files', '*.xlsx'),
+                     ('Database files', '*.db *.sqlite *.sqlite3 *.duckdb'), ('All files', '*.*')]
 
-        filepath = filedialog.askopenfilename(
-            title="Select Sales Data File",
+        filepaths = filedialog.askopenfilenames(
+            title="Select Sales Data File(s)",
             filetypes=filetypes
         )
 
-        if filepath:
-            try:
-                if filepath.endswith('.csv'):
-                    self.sales_data = pd.read_csv(filepath)
-                else:
-                    self.sales_data = pd.read_excel(filepath)
+        if filepaths:
+            self.open_data(list(filepaths))
 
-                # Convert date column
-                if 'Date' in self.sales_data.columns:
-                    self.sales_data['Date'] = pd.to_datetime(self.sales_data['Date'])
+    def load_folder_data(self):
+        """Load every CSV / Excel file in a folder as one dataset"""
+        folder = filedialog.askdirectory(title="Select Folder of Sales Files")
+        if folder:
+            self.open_data(folder)
+
+    def open_data(self, path):
+        """Load a file, a list of files, a folder or a glob pattern and show it"""
+        if path:
+            try:
+                self.stop_watching()
+                self.data_source = open_source(path)
+                self.dimension_filters = {}
+                self.day_range = None
+                self.load_from_source()
 
                 # Update UI
+                self.reset_slice()
+                self.rebuild_aggregates()
                 self.update_product_list()
-                self.update_kpis()
-                self.plot_sales_dashboard()
+                self.request_redraw()
                 self.generate_insights()
 
-                self.update_status(f"✅ Data loaded: {len(self.sales_data)} records")
+                self.update_status(f"✅ Data loaded: {len(self.sales_data):,} records "
+                                   f"({memory_footprint(self.sales_data) / 1e6:,.1f} MB in memory)")
+
+                if self.quality_report.has_issues:
+                    messagebox.showinfo("Data Quality Report", str(self.quality_report))
 
             except Exception as e:
                 messagebox.showerror("Error", f"Could not load file:\n{str(e)}")
 
+    def load_from_source(self):
+        """Read the active data source into the compact frame
+
+        Database sources aggregate to daily totals inside the engine with the
+        active dimension filters in the query; files are read whole, several
+        of them in parallel worker processes. Files that were ingested before
+        are opened from their AggregateStore instead, memory-mapped, and
+        newly ingested files are saved to one.
+        """
+        source = self.data_source
+        self.store = self.stored_orders = self.stored_aggregates = None
+        store = None
+        if isinstance(source, (FileSource, MultiFileSource)):
+            store = AggregateStore.for_files(source.files(), self.gap_fill_var.get())
+            if store.exists():
+                self.sales_data, self.stored_orders, self.stored_aggregates, self.quality_report = store.open()
+                self.store = store
+                return
+
+        filters = self.dimension_filters if source.pushes_down else None
+        with tracer.span('load: file', 'load', file=source.name):
+            if isinstance(source, MultiFileSource):
+                raw_data = source.load(progress=lambda fraction, message: self.update_status(
+                    f"⏳ Loading {source.name} {fraction:.0%} - {message}"))
+            elif source.pushes_down:
+                raw_data = source.load(filters, self.day_range)
+            else:
+                raw_data = source.load(filters)
+
+            # Validate, repair and convert to the compact representation
+            repaired, self.quality_report = repair_sales_data(
+                raw_data, fill=self.gap_fill_var.get(), upstream=source.report)
+            self.sales_data = to_compact(repaired)
+            del raw_data, repaired
+
+        if store is not None:
+            # The cache is an optimization only; a failed save keeps the data in memory
+            try:
+                store.save(self.sales_data, SliceIndex(self.sales_data), self.quality_report)
+                self.sales_data, self.stored_orders, self.stored_aggregates, self.quality_report = store.open()
+                self.store = store
+            except OSError as e:
+                self.update_status(f"⚠️ Could not cache {source.name}: {e}")
+
+    def toggle_watch_folder(self):
+        """Start or stop auto-ingesting the files dropped into a folder"""
+        if self.watch_source is not None:
+            self.stop_watching()
+            self.update_status("⏹ Stopped watching folder")
+            return
+
+        folder = filedialog.askdirectory(title="Select Folder to Watch")
+        if folder:
+            self.watch_source = FolderSource(folder)
+            self.watch_button.config(text="⏹ Stop Watching")
+            self.refresh_watched_folder()
+            self.root.after(WATCH_POLL_MS, self.poll_watch_folder, self.watch_source)
+
+    def stop_watching(self):
+        self.watch_source = None
+        self.watch_button.config(text="👀 Watch Folder")
+
+    def poll_watch_folder(self, source):
+        """Scan the watched folder and refresh once a burst of changes has settled"""
+        # A stale poll chain from an earlier watch ends here
+        if source is not self.watch_source:
+            return
+
+        busy = self.background_job is not None and self.background_job['thread'].is_alive()
+        try:
+            if not busy and source.poll():
+                self.refresh_watched_folder()
+        except OSError as e:
+            self.update_status(f"⚠️ Cannot scan {source.name}: {e}")
+
+        self.root.after(WATCH_POLL_MS, self.poll_watch_folder, source)
+
+    def refresh_watched_folder(self):
+        """Re-ingest the watched folder on a worker thread
+
+        Only new or changed files are parsed. While the full data is shown,
+        its aggregates are extended with the changed days rather than
+        rebuilt (see extend_aggregates). Everything is computed off the Tk
+        thread and swapped in together by swap_in_data, so the UI never
+        shows a half-updated state.
+        """
+        source = self.watch_source
+        fill = self.gap_fill_var.get()
+        filters, day_range = dict(self.dimension_filters), self.day_range
+        previous = None
+        if source is self.data_source and self.daily_matrix is not None and \
+                not filters and day_range is None:
+            previous = {'daily_matrix': self.daily_matrix, 'sparse_daily': self.sparse_daily,
+                        'kpi_table': self.kpi_table, 'rolling_stats': self.rolling_stats, 'anomalies': self.anomalies,
+                        'seasonality': self.seasonality, 'trends': self.trends}
+
+        def work(progress):
+            raw = source.load(progress=progress)
+            repaired, report = repair_sales_data(raw, fill=fill, upstream=source.report)
+            sales_data = to_compact(repaired)
+            slice_index = SliceIndex(sales_data)
+
+            # Keep the active slice when the new data still has rows for it
+            local = {dim: value for dim, value in filters.items() if dim in slice_index.groups}
+            active_range = day_range
+            frame = slice_index.select(local, active_range)
+            if not len(frame):
+                local, active_range = {}, None
+                frame = slice_index.select(local)
+
+            aggregates = None
+            if previous is not None:
+                aggregates = self.extend_aggregates(previous, frame, source.changed_from)
+            if aggregates is None:
+                aggregates = self.compute_aggregates(frame)
+            return sales_data, slice_index, report, local, active_range, aggregates
+
+        def done(result):
+            if source is self.watch_source:
+                self.swap_in_data(source, *result)
+
+        def failed(error):
+            self.update_status(f"⚠️ {source.name}: {error} - retrying when the folder changes")
+
+        self.start_background_job(f"Folder refresh ({source.name})", work, done, on_error=failed)
+
+    def swap_in_data(self, source, sales_data, slice_index, report, filters, day_range, aggregates):
+        """Make freshly ingested data current, then re-run the open forecast"""
+        self.data_source = source
+        self.store = self.stored_orders = self.stored_aggregates = None
+        self.sales_data = sales_data
+        self.slice_index = slice_index
+        self.quality_report = report
+        self.dimension_filters = filters
+        self.day_range = day_range
+        self.apply_aggregates(aggregates)
+
+        if self.current_product not in sales_data['Product'].cat.categories:
+            self.current_product = 'All Products'
+            self.product_var.set(self.current_product)
+
+        self.update_product_list()
+        for dim, var in self.dimension_vars.items():
+            var.set(filters.get(dim, "All"))
+        self.show_date_range()
+        self.request_redraw()
+        self.generate_insights()
+        self.update_status(f"👀 {source.name}: {len(sales_data):,} records from "
+                           f"{len(source.frames)} file(s)")
+
+        # A forecast that was showing for this view is retrained in the background
+        if self.models and self.forecast_product == self.slice_label(self.current_product):
+            job = self.prepare_forecast(quiet=True)
+            if job is not None:
+                self.start_background_job("Forecast refresh",
+                                          lambda progress: self.train_forecast(job),
+                                          self.finish_forecast_refresh)
+
+    def finish_forecast_refresh(self, job):
+        # Dropped when the selection moved on while the models were training
+        if job['label'] == self.slice_label(self.current_product):
+            self.finish_forecast(job, show_chart=False)
+
     def update_product_list(self):
         """Update product selection dropdown"""
         if self.sales_data is not None and 'Product' in self.sales_data.columns:
-            products = ['All Products'] + sorted(self.sales_data['Product'].unique().tolist())
+            products = ['All Products'] + self.sales_data['Product'].cat.categories.tolist()
             self.product_combo['values'] = products
+        self.update_dimension_filters()
+
+    def update_dimension_filters(self):
+        """Rebuild the dimension selectors for the loaded data"""
+        for widget in self.dimension_frame.winfo_children():
+            widget.destroy()
+        self.dimension_vars = {}
+
+        if self.data_source is not None and self.data_source.pushes_down:
+            dimensions = {dim: self.data_source.dimension_values(dim)
+                          for dim in self.data_source.dimensions()}
+        else:
+            dimensions = {dim: self.slice_index.values(dim) for dim in self.slice_index.dimensions}
+
+        for dim, values in dimensions.items():
+            tk.Label(self.dimension_frame,
+                     text=f"{dim}:",
+                     font=('Segoe UI', 10),
+                     bg=self.card_bg,
+                     fg=self.text_secondary).pack(anchor='w', pady=(8, 4))
+
+            var = tk.StringVar(value="All")
+            combo = ttk.Combobox(self.dimension_frame,
+                                 textvariable=var,
+                                 values=["All"] + values,
+                                 font=('Segoe UI', 10),
+                                 state='readonly',
+                                 height=15)
+            combo.pack(fill=tk.X)
+            combo.bind('<<ComboboxSelected>>', lambda event: self.ui_updates.request(
+                'slice', self.on_dimension_change, SELECTION_DEBOUNCE_MS))
+            self.dimension_vars[dim] = var
+
+    def on_dimension_change(self, event=None):
+        """Apply the selected dimension values as the active slice"""
+        previous = self.dimension_filters
+        self.dimension_filters = {dim: var.get() for dim, var in self.dimension_vars.items()
+                                  if var.get() != "All"}
+
+        if self.data_source is not None and self.data_source.pushes_down:
+            # The engine applies the filters and returns only matching daily totals
+            try:
+                self.load_from_source()
+            except SchemaError:
+                self.dimension_filters = previous
+                for dim, var in self.dimension_vars.items():
+                    var.set(previous.get(dim, "All"))
+                messagebox.showwarning("Warning", "No sales records for that selection")
+                return
+            self.slice_index = SliceIndex(self.sales_data)
+
+        self.on_slice_change()
+
+    def on_slice_change(self):
+        """Recompute everything for the new dimension / date slice"""
+        self.rebuild_aggregates()
+        self.request_redraw()
+        self.generate_insights()
+        self.update_status(f"🔎 Slice: {self.slice_label()} "
+                           f"({len(self.slice_frame()):,} records)")
 
     def on_product_change(self, event=None):
         """Handle product selection change"""
         self.current_product = self.product_var.get()
+        self.request_redraw(SELECTION_DEBOUNCE_MS)
+        self.update_status(f"📊 Viewing: {self.current_product}")
+
+    def request_redraw(self, delay_ms=0):
+        """Schedule a dashboard and KPI redraw for the current selection
+
+        Requests made before the redraw runs collapse into one, so a burst
+        of selection changes draws only the last selection.
+        """
+        self.ui_updates.request('dashboard', self.redraw_dashboard, delay_ms)
+
+    def redraw_dashboard(self):
         self.plot_sales_dashboard()
         self.update_kpis()
-        self.update_status(f"📊 Viewing: {self.current_product}")
 
     def refresh_data(self):
         """Refresh data visualization"""
         if self.sales_data is not None:
-            self.plot_sales_dashboard()
-            self.update_kpis()
+            self.request_redraw()
             self.update_status("🔄 Dashboard refreshed")
         else:
             messagebox.showwarning("Warning", "No data to refresh")
 
+    @profiler.profiled('run_forecast')
     def run_forecast(self):
         """Run sales forecasting using selected models"""
-        if self.sales_data is None:
-            messagebox.showwarning("Warning", "Please load data first")
+        with tracer.span('forecast: total', 'forecast', product=self.current_product):
+            self._run_forecast()
+
+    def _run_forecast(self):
+        """Train the selected models on the current product's daily series"""
+        job = self.prepare_forecast()
+        if job is None:
             return
 
         self.update_status("🤖 Training ML models...")
+        self.train_forecast(job)
+        self.finish_forecast(job)
 
-        # Filter data for selected product
-        if self.current_product == 'All Products':
-            data = self.sales_data.groupby('Date')['Sales'].sum().reset_index()
-        else:
-            data = self.sales_data[self.sales_data['Product'] == self.current_product]
-            data = data.groupby('Date')['Sales'].sum().reset_index()
+    def prepare_forecast(self, quiet=False):
+        """Collect everything training needs from the UI and the current slice
 
-        if len(data) < 30:
-            messagebox.showwarning("Warning", "Need at least 30 days of data for forecasting")
-            return
+        Returns a job dict for train_forecast, or None (after a warning
+        unless quiet) when there is nothing to train on.
+        """
+        def warn(message):
+            if not quiet:
+                messagebox.showwarning("Warning", message)
+
+        if self.sales_data is None:
+            warn("Please load data first")
+            return None
+
+        # The daily matrix already holds the slice's daily totals; one
+        # product's history is a view of its row
+        with tracer.span('aggregate: daily series', 'aggregate'):
+            days, sales = self.daily_matrix.recorded(self.current_product)
+            data = pd.DataFrame({'Day': days, 'Sales': sales})
+
+            # Optionally train on a trailing window only; days are sorted,
+            # so the cutoff is a binary search
+            window = TRAINING_WINDOWS[self.training_window_var.get()]
+            if window and len(data):
+                cutoff = data['Day'].iloc[-1] - window + 1
+                data = data.iloc[np.searchsorted(data['Day'].to_numpy(), cutoff):]
+
+            # Classify the series over its whole calendar, days without
+            # records counting as zero demand; intermittent and lumpy series
+            # are forecast on that zero-filled calendar by Croston-type models
+            demand_class = 'no demand'
+            if len(data):
+                end_day = self.daily_matrix.start_day + self.daily_matrix.n_days - 1
+                dense = data.set_index('Day')['Sales'].reindex(
+                    np.arange(data['Day'].iloc[0], end_day + 1), fill_value=0)
+                series = SparseDaily.from_dense(dense.to_numpy())
+                demand_class = DEMAND_CLASSES[classify_demand(series).classes[0]]
+                if demand_class in ROUTED_MODEL:
+                    data = dense.rename_axis('Day').reset_index()
+
+            data['Sales'] = data['Sales'].astype(np.float64)
+            data['Date'] = day_to_datetime(data['Day'])
+
+        intermittent = demand_class in ROUTED_MODEL
+        if intermittent and (np.count_nonzero(data['Sales']) < MIN_DEMANDS or len(data) < 10):
+            warn(f"Need at least {MIN_DEMANDS} days with sales for forecasting")
+            return None
+        if not intermittent and len(data) < 30:
+            warn("Need at least 30 days of data for forecasting")
+            return None
 
         # Prepare data
-        data = data.sort_values('Date')
-        data['Days'] = (data['Date'] - data['Date'].min()).dt.days
+        data = data.sort_values('Day')
+        data['Days'] = data['Day'] - data['Day'].min()
 
         # Split data
         X = data['Days'].values.reshape(-1, 1)
         y = data['Sales'].values
 
         train_size = int(len(X) * 0.8)
-        X_train, X_test = X[:train_size], X[train_size:]
         y_train, y_test = y[:train_size], y[train_size:]
 
-        # Clear previous results
-        for item in self.metrics_tree.get_children():
-            self.metrics_tree.delete(item)
-
-        self.models = {}
+        # Tree models also get the shared rolling features, lagged past the
+        # whole test window so no test-period sales leak into them
+        X_features = X
+        if self.rolling_stats is not None:
+            lag = int(data['Day'].iloc[-1] - data['Day'].iloc[train_size - 1])
+            lagged = self.rolling_stats.feature_frame(self.current_product, lag=lag)
+            # Only carry values forward; days with no history yet get 0
+            lagged = lagged.reindex(data['Day']).ffill().fillna(0)
+            X_features = np.column_stack([X, lagged.to_numpy()])
+        Xf_train, Xf_test = X_features[:train_size], X_features[train_size:]
+
+        # Optionally leave flagged days out of training; the test window is
+        # kept as-is so the metrics still reflect the real series
+        keep_all = np.ones(len(y), dtype=bool)
+        y_smooth_all = y
+        if self.exclude_anomalies_var.get() and self.anomalies is not None:
+            all_days = data['Day'].to_numpy()
+            keep_all = ~np.isin(all_days, self.anomalies.days_for(self.current_product))
+            # Exponential smoothing needs an unbroken series, so flagged
+            # days are replaced by their seasonal baseline instead
+            baseline = self.anomalies.expected_for(self.current_product)[
+                all_days - self.anomalies.start_day]
+            y_smooth_all = np.where(~keep_all & np.isfinite(baseline), baseline, y)
+        keep, y_smooth = keep_all[:train_size], y_smooth_all[:train_size]
+
+        # The forward forecast refits on the whole series and predicts the
+        # forecast_days calendar days after its last day; tree features are
+        # lagged by the whole horizon for the same no-leak reason
         forecast_days = self.period_var.get()
-
-        # Train selected models
-        selected_models = [model for model, var in self.model_vars.items() if var.get()]
-
+        last_day = int(data['Day'].iloc[-1])
+        future_days = np.arange(last_day + 1, last_day + forecast_days + 1)
+        X_future = (future_days - data['Day'].min()).reshape(-1, 1)
+        Xf_all, Xf_future = X, X_future
+        if self.rolling_stats is not None:
+            lagged = self.rolling_stats.feature_frame(self.current_product, lag=forecast_days)
+            lagged = lagged.reindex(np.concatenate([data['Day'].to_numpy(), future_days]))
+            lagged = lagged.ffill().fillna(0).to_numpy()
+            Xf_all = np.column_stack([X, lagged[:len(X)]])
+            Xf_future = np.column_stack([X_future, lagged[len(X):]])
+
+        # Holt-Winters uses the product's detected season, as long as two
+        # full cycles fit into the training window
+        period = 7
+        if self.seasonality is not None:
+            period = self.seasonality.period_for(self.current_product, max_period=train_size // 2)
+
+        # Sparse series are routed to the intermittent-demand models
+        if intermittent:
+            selected_models = list(INTERMITTENT_MODELS)
+        else:
+            selected_models = [model for model, var in self.model_vars.items() if var.get()]
         if not selected_models:
-            messagebox.showwarning("Warning", "Please select at least one model")
-            return
+            warn("Please select at least one model")
+            return None
+
+        return {'product': self.current_product, 'segment': self.slice_segment(),
+                'label': self.slice_label(self.current_product),
+                'demand_class': demand_class, 'routed_model': ROUTED_MODEL.get(demand_class),
+                'forecast_days': forecast_days, 'selected_models': selected_models,
+                'data': data, 'train_size': train_size, 'period': period, 'keep': keep,
+                'Xf_train': Xf_train, 'Xf_test': Xf_test,
+                'y_train': y_train, 'y_test': y_test, 'y_smooth': y_smooth,
+                'y': y, 'keep_all': keep_all, 'y_smooth_all': y_smooth_all,
+                'Xf_all': Xf_all, 'Xf_future': Xf_future, 'future_days': future_days}
+
+    def fit_predict(self, model_name, days, y, y_smooth, keep, X, dates, period, next_days, X_next):
+        """Fit one model on a series and predict the days after it
+
+        days/y/y_smooth/keep/X/dates describe the fitting window; next_days
+        and X_next the days to predict. Returns (model, predictions).
+        """
+        if model_name == 'Linear Regression':
+            # Trend plus weekday effects; flagged days are masked out
+            with tracer.span(f'fit: {model_name}', 'model'):
+                model = fit_trends(y, days, keep)
+            with tracer.span(f'predict: {model_name}', 'model'):
+                predictions = model.predict(next_days)[0]
+
+        elif model_name in ('Random Forest', 'Gradient Boosting'):
+            if model_name == 'Random Forest':
+                model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
+            else:
+                model = GradientBoostingRegressor(n_estimators=100, random_state=42, max_depth=5)
+            with tracer.span(f'fit: {model_name}', 'model'):
+                model.fit(X[keep], y[keep])
+            with tracer.span(f'predict: {model_name}', 'model'):
+                predictions = model.predict(X_next)
+
+        elif model_name in INTERMITTENT_MODELS:
+            # Flat daily demand rate from the window's demand days
+            series = SparseDaily.from_dense(y)
+            with tracer.span(f'fit: {model_name}', 'model'):
+                rate = croston_rates(series, model_name)[0]
+            model, predictions = rate, np.full(len(next_days), rate)
+
+        elif model_name == 'Exponential Smoothing':
+            from statsmodels.tsa.holtwinters import ExponentialSmoothing
+            train_series = pd.Series(y_smooth, index=dates)
+            if period:
+                model = ExponentialSmoothing(train_series, seasonal='add',
+                                             seasonal_periods=period)
+            else:
+                model = ExponentialSmoothing(train_series, trend='add')
+            with tracer.span(f'fit: {model_name}', 'model'):
+                model_fit = model.fit()
+            with tracer.span(f'predict: {model_name}', 'model'):
+                predictions = model_fit.forecast(len(next_days))
+            predictions = predictions.values
 
-        for model_name in selected_models:
+        else:
+            raise ValueError(f"Unknown model: {model_name}")
+        return model, predictions
+
+    def train_forecast(self, job):
+        """Fit and score the job's models; touches no widgets, so it can run on a worker thread
+
+        Every model that scores is then refit on the whole series for the
+        forward forecast the history records (job['forward']).
+        """
+        data, train_size, period, keep = job['data'], job['train_size'], job['period'], job['keep']
+        Xf_train, Xf_test = job['Xf_train'], job['Xf_test']
+        y_train, y_test, y_smooth = job['y_train'], job['y_test'], job['y_smooth']
+        days, dates = data['Day'].to_numpy(), data['Date']
+
+        models = {}
+        results = []
+        for model_name in job['selected_models']:
             try:
-                if model_name == 'Linear Regression':
-                    model = LinearRegression()
-                    model.fit(X_train, y_train)
-                    predictions = model.predict(X_test)
-
-                elif model_name == 'Random Forest':
-                    model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
-                    model.fit(X_train, y_train)
-                    predictions = model.predict(X_test)
-
-                elif model_name == 'Gradient Boosting':
-                    model = GradientBoostingRegressor(n_estimators=100, random_state=42, max_depth=5)
-                    model.fit(X_train, y_train)
-                    predictions = model.predict(X_test)
-
-                elif model_name == 'Exponential Smoothing':
-                    # Simple exponential smoothing implementation
-                    from statsmodels.tsa.holtwinters import ExponentialSmoothing
-                    train_series = pd.Series(y_train, index=data['Date'].iloc[:train_size])
-                    model = ExponentialSmoothing(train_series, seasonal='add', seasonal_periods=7)
-                    model_fit = model.fit()
-                    predictions = model_fit.forecast(len(y_test))
-                    predictions = predictions.values
+                model, predictions = self.fit_predict(
+                    model_name, days[:train_size], y_train, y_smooth, keep, Xf_train,
+                    dates.iloc[:train_size], period, days[train_size:], Xf_test)
 
                 # Calculate metrics
                 mae = mean_absolute_error(y_test, predictions)
@@ -989,7 +1865,7 @@ class SmartSalesForecaster:
                 r2 = r2_score(y_test, predictions)
 
                 # Store model
-                self.models[model_name] = {
+                models[model_name] = {
                     'model': model,
                     'mae': mae,
                     'rmse': rmse,
@@ -997,8 +1873,13 @@ class SmartSalesForecaster:
                     'predictions': predictions
                 }
 
-                # Determine status with emoji
-                if r2 > 0.8:
+                # Determine status with emoji; a flat rate has no R² to speak
+                # of, so intermittent models are labelled by their routing
+                if model_name in INTERMITTENT_MODELS:
+                    routed = model_name == job['routed_model']
+                    status = f"🧮 Routed ({job['demand_class']})" if routed else "🧮 Alternative"
+                    status_color = self.success_color if routed else self.warning_color
+                elif r2 > 0.8:
                     status = "⭐ Excellent"
                     status_color = self.success_color
                 elif r2 > 0.6:
@@ -1011,21 +1892,51 @@ class SmartSalesForecaster:
                     status = "❌ Poor"
                     status_color = self.danger_color
 
-                # Add to treeview with colors
-                item_id = self.metrics_tree.insert('', 'end',
-                                                   values=(model_name,
-                                                           f"{mae:,.2f}",
-                                                           f"{rmse:,.2f}",
-                                                           f"{r2:.3f}",
-                                                           status))
-
-                # Color code based on performance
-                self.metrics_tree.item(item_id, tags=(status_color,))
+                results.append((model_name, mae, rmse, r2, status, status_color))
 
             except Exception as e:
                 print(f"Error training {model_name}: {e}")
-                self.metrics_tree.insert('', 'end',
-                                         values=(model_name, "Error", "Error", "Error", "❌ Failed"))
+                results.append((model_name, np.nan, np.nan, np.nan, "❌ Failed", self.danger_color))
+
+        forward = {}
+        for model_name in models:
+            try:
+                with tracer.span(f'forward: {model_name}', 'model'):
+                    forward[model_name] = np.asarray(self.fit_predict(
+                        model_name, days, job['y'], job['y_smooth_all'], job['keep_all'], job['Xf_all'],
+                        dates, period, job['future_days'], job['Xf_future'])[1], dtype=np.float64)
+            except Exception as e:
+                print(f"Error forecasting {model_name}: {e}")
+
+        job['models'] = models
+        job['results'] = results
+        job['forward'] = forward
+        return job
+
+    def finish_forecast(self, job, show_chart=True):
+        """Make a trained job the current forecast and update the results views"""
+        data, train_size, y_test = job['data'], job['train_size'], job['y_test']
+        forecast_days = job['forecast_days']
+        self.models = job['models']
+        self.forecast_product = job['label']
+
+        # Rerunning a product moves it to the end, so the oldest run is first;
+        # past the chart limit the oldest runs drop their arrays, not their rows
+        self.forecast_runs.pop(self.forecast_product, None)
+        self.forecast_runs[self.forecast_product] = {
+            'data': data, 'days': forecast_days, 'results': job['results'],
+            'models': {name: {key: model[key] for key in RUN_MODEL_KEYS}
+                       for name, model in self.models.items()}}
+        charted = [label for label, run in self.forecast_runs.items() if 'models' in run]
+        for label in charted[:-MAX_FORECAST_CHARTS]:
+            del self.forecast_runs[label]['data'], self.forecast_runs[label]['models']
+        self.update_results_grid()
+
+        # Keep the test-window predictions for export
+        self.forecast_results = pd.DataFrame({'Date': data['Date'].iloc[train_size:].values,
+                                              'Actual': y_test})
+        for model_name, model_data in self.models.items():
+            self.forecast_results[model_name] = np.asarray(model_data['predictions'])
 
         # Update forecast KPI
         if self.models:
@@ -1033,16 +1944,261 @@ class SmartSalesForecaster:
             forecast_value = best_model[1]['predictions'][-1] if len(best_model[1]['predictions']) > 0 else 0
             self.kpi_labels['Forecast'].config(text=f"$ {forecast_value:,.0f}")
 
+        self.update_what_if()
+
+        if not show_chart:
+            self.record_forecast(job)
+            return
+
         # Show forecast visualization
-        self.show_forecast_visualization(data, forecast_days)
+        with tracer.span('plot: forecast', 'plot'):
+            self.show_forecast_visualization(data, forecast_days)
 
-        self.update_status("✅ Forecasting complete! Check results tab")
+        if job['routed_model']:
+            self.update_status(f"✅ Forecasting complete! {job['demand_class'].capitalize()} demand, "
+                               f"routed to {job['routed_model']}")
+        else:
+            self.update_status("✅ Forecasting complete! Check results tab")
+        # After the completion message, so a failed save stays on the status bar
+        self.record_forecast(job)
 
         # Switch to forecast tab
         self.notebook.select(1)
 
-    def show_forecast_visualization(self, historical_data, forecast_days):
-        """Show forecast results in a new window"""
+    def update_results_grid(self):
+        """Load the results of every forecast run into the results grid"""
+        rows = [(product,) + result for product, run in self.forecast_runs.items()
+                for result in run['results']]
+        products, models, mae, rmse, r2, status, colors = zip(*rows) if rows else ((),) * 7
+        self.metrics_grid.set_data({'Product': np.array(products, dtype=str),
+                                    'Model': np.array(models, dtype=str),
+                                    'MAE': np.array(mae, dtype=np.float64),
+                                    'RMSE': np.array(rmse, dtype=np.float64),
+                                    'R² Score': np.array(r2, dtype=np.float64),
+                                    'Status': np.array(status, dtype=str)},
+                                   tags=colors)
+
+    def record_forecast(self, job):
+        """Append a trained job's forward forecast to the forecast history
+
+        The predictions cover the forecast_days after the last observed day,
+        so they are scored once later loads bring in those days. Intervals
+        are sized by each model's test-window RMSE.
+        """
+        forward = job['forward']
+        if not forward:
+            return
+
+        origin_day = int(job['data']['Day'].iloc[-1])
+        target_days = job['future_days']
+        n_days, n_rows = len(target_days), len(target_days) * len(forward)
+        predicted = np.concatenate(list(forward.values()))
+        width = np.repeat([INTERVAL_Z * job['models'][name]['rmse'] for name in forward], n_days)
+
+        records = {
+            'product': np.full(n_rows, job['product']),
+            'segment': np.full(n_rows, job['segment']),
+            'model': np.repeat(list(forward), n_days),
+            'origin_day': np.full(n_rows, origin_day),
+            'target_day': np.tile(target_days, len(forward)),
+            'predicted': predicted,
+            'lower': predicted - width,
+            'upper': predicted + width,
+        }
+
+        try:
+            self.history.append(records)
+        except OSError as e:
+            self.update_status(f"⚠️ Could not save forecast history: {e}")
+
+    def show_forecast_accuracy(self):
+        """Score the last year of saved forecasts against the loaded actuals"""
+        if self.daily_matrix is None:
+            messagebox.showwarning("Warning", "Please load data first")
+            return
+
+        actuals = self.daily_matrix
+        segment = self.slice_segment()
+        since = datetime.now() - timedelta(days=365)
+
+        def work(progress):
+            return self.history.accuracy(actuals, segment, since=since)
+
+        def done(table):
+            if table.empty:
+                self.update_status("ℹ️ No saved forecasts overlap the loaded data yet")
+                messagebox.showinfo("Forecast Accuracy",
+                                    "No saved forecast targets a day covered by the loaded data yet.")
+                return
+            self.update_status(f"✅ Scored {int(table['Forecasts'].sum()):,} past forecasts")
+            self.show_accuracy_table(table)
+
+        self.start_background_job("Forecast accuracy", work, done)
+
+    def show_accuracy_table(self, table):
+        """Show realized accuracy by model and horizon in a new window"""
+        window = tk.Toplevel(self.root)
+        window.title("📜 Forecast Accuracy History")
+        window.geometry("900x600")
+        window.configure(bg=self.bg_color)
+
+        tk.Label(window,
+                 text=f"Saved forecasts vs. actuals  ·  horizon = days after the last training day  ·  "
+                      f"interval ±{INTERVAL_Z} RMSE",
+                 font=('Segoe UI', 11),
+                 bg=self.bg_color,
+                 fg=self.text_secondary).pack(anchor='w', padx=20, pady=(20, 10))
+
+        grid = VirtualGrid(window,
+                           tuple(table.columns),
+                           widths={'Model': 200},
+                           anchors={'Model': tk.W},
+                           formats={'Forecasts': "{:,}", 'MAE': "{:,.2f}", 'MAPE %': "{:.1f}%",
+                                    'Coverage %': "{:.1f}%"},
+                           filter_column='Model',
+                           bg=self.bg_color)
+        grid.set_data({col: table[col].to_numpy() for col in table.columns})
+        grid.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+
+    def open_forecast_result(self, index):
+        """Reopen the forecast chart of the product in a results grid row"""
+        label = str(self.metrics_grid.data['Product'][index])
+        run = self.forecast_runs.get(label)
+        if run is None:
+            return
+        if 'models' not in run:
+            self.update_status(f"⚠️ The chart of {label} is no longer kept; rerun its forecast to see it")
+            return
+        self.show_forecast_visualization(run['data'], run['days'], run['models'])
+
+    def update_what_if(self, event=None):
+        """Rescale the current forecasts for the entered price change
+
+        The forecast models never see price; their predictions are scaled
+        after the fact by the product's fitted log-log elasticity.
+        """
+        if not self.models or self.elasticity is None or \
+                self.forecast_product != self.slice_label(self.current_product):
+            self.what_if_label.config(text="Run a forecast to explore price changes")
+            return
+
+        try:
+            change = float(self.price_change_var.get())
+        except (tk.TclError, ValueError):
+            return
+
+        elasticity = self.elasticity.elasticity_for(self.current_product)
+        if not np.isfinite(elasticity):
+            self.what_if_label.config(text="Not enough price variation to estimate elasticity")
+            return
+
+        sales_factor, quantity_factor = self.elasticity.what_if(self.current_product, change)
+        lines = ["Forecasts scaled by the fitted elasticity (price is not a model input)",
+                 f"Price elasticity of demand: {elasticity:.2f}  ·  "
+                 f"Units {(quantity_factor - 1) * 100:+.1f}%  ·  Sales {(sales_factor - 1) * 100:+.1f}%"]
+        for model_name, model_data in self.models.items():
+            baseline = float(np.sum(model_data['predictions']))
+            lines.append(f"{model_name}: ${baseline:,.0f} → ${baseline * sales_factor:,.0f} "
+                         f"over the {len(model_data['predictions'])}-day test window")
+        self.what_if_label.config(text="\n".join(lines))
+
+    def inventory_inputs(self, horizon, history=90):
+        """Demand forecasts and forecast-error pools for every product in the slice
+
+        Each product's demand path is its batched trend + weekday forecast
+        over the horizon (its flat SBA / TSB rate when its demand is
+        intermittent or lumpy), with the last `history` days of deviations
+        from that model as the error pool. Products with too few days for a
+        trend fit fall back to their latest 30-day moving average. The
+        product of the last forecast run uses its best model's final
+        prediction and test-window errors instead.
+        """
+        active = self.daily_matrix.counts.sum(axis=1) > 0
+        labels = list(self.daily_matrix.products[active])
+        daily = self.daily_matrix.values[active]
+        recent = slice(max(daily.shape[1] - history, 0), None)
+
+        # Trend, matrix and CSR rows all follow the product categories
+        trends = self.trends[np.flatnonzero(active)]
+        demand = trends.forecast(horizon)
+        fitted = trends.predict(self.daily_matrix.days[recent])
+
+        unfitted = ~np.isfinite(trends.coefficients).all(axis=1)
+        ma_30 = self.rolling_stats.features['ma_30'][:-1][active][unfitted]
+        demand[unfitted] = np.nan_to_num(ma_30[:, -1:])
+        fitted[unfitted] = ma_30[:, recent]
+
+        rates, _ = routed_rates(self.sparse_daily, self.demand)
+        sparse = np.isfinite(rates[active])
+        demand[sparse] = rates[active][sparse, None]
+        fitted[sparse] = rates[active][sparse, None]
+
+        residuals = np.nan_to_num(daily[:, recent] - fitted)
+        demand = np.maximum(demand, 0)
+
+        if self.models and self.forecast_product == self.slice_label(self.current_product) \
+                and self.current_product in labels:
+            best = max(self.models.values(), key=lambda m: m['r2'])
+            errors = self.forecast_results['Actual'].to_numpy() - np.asarray(best['predictions'])
+            row = labels.index(self.current_product)
+            demand[row] = max(float(best['predictions'][-1]), 0.0)
+            residuals[row] = np.random.default_rng(0).choice(errors, size=residuals.shape[1])
+
+        return labels, demand, residuals
+
+    def run_inventory_simulation(self):
+        """Simulate reorder-point / order-up-to policies for the whole slice"""
+        if self.daily_matrix is None:
+            messagebox.showwarning("Warning", "Please load data first")
+            return
+
+        horizon = self.period_var.get()
+        labels, demand, residuals = self.inventory_inputs(horizon)
+        reorder_point, order_up_to = reorder_policy(demand.mean(axis=1), residuals.std(axis=1))
+
+        def work(progress):
+            return simulate_inventory(labels, demand, residuals, reorder_point, order_up_to,
+                                      progress=progress)
+
+        def done(result):
+            self.update_status(f"✅ Simulated {len(labels):,} products × {N_PATHS:,} paths")
+            self.show_inventory_results(result)
+
+        self.start_background_job("Inventory simulation", work, done)
+
+    def show_inventory_results(self, result):
+        """Show per-product stockout risk and fill rate in a new window"""
+        window = tk.Toplevel(self.root)
+        window.title("📦 Inventory Simulation")
+        window.geometry("1100x650")
+        window.configure(bg=self.bg_color)
+
+        tk.Label(window,
+                 text=f"{result.n_paths:,} demand paths × {result.horizon} days  ·  "
+                      f"lead time {LEAD_TIME_DAYS} days  ·  review every {REVIEW_DAYS} days  ·  "
+                      f"safety stock z = {SERVICE_LEVEL_Z}\n"
+                      f"Demand: trend + weekday forecasts, SBA / TSB rates for intermittent products",
+                 font=('Segoe UI', 11),
+                 justify=tk.LEFT,
+                 bg=self.bg_color,
+                 fg=self.text_secondary).pack(anchor='w', padx=20, pady=(20, 10))
+
+        table = result.frame().reset_index()
+        grid = VirtualGrid(window,
+                           tuple(table.columns),
+                           widths={col: 200 if col == 'Product' else 110 for col in table.columns},
+                           anchors={'Product': tk.W},
+                           formats={'Reorder Point': "{:,.0f}", 'Order Up To': "{:,.0f}",
+                                    'Stockout %': "{:.1f}%", 'Stockout Days': "{:.1f}",
+                                    'Fill Rate %': "{:.1f}%", 'Avg On Hand': "{:,.0f}", 'Orders': "{:.1f}"},
+                           filter_column='Product',
+                           bg=self.bg_color)
+        grid.set_data({col: table[col].to_numpy() for col in table.columns})
+        grid.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+
+    def show_forecast_visualization(self, historical_data, forecast_days, models=None):
+        """Show forecast results in a new window (models defaults to the last run)"""
+        models = self.models if models is None else models
         forecast_window = tk.Toplevel(self.root)
         forecast_window.title("🔮 Forecast Visualization")
         forecast_window.geometry("1200x700")
@@ -1069,9 +2225,9 @@ class SmartSalesForecaster:
                 color=self.text_secondary, linewidth=3, alpha=0.7, label='Historical Sales')
 
         # Plot each model's predictions
-        colors = plt.cm.Set3(np.linspace(0, 1, len(self.models)))
+        colors = plt.cm.Set3(np.linspace(0, 1, len(models)))
 
-        for i, (model_name, model_data) in enumerate(self.models.items()):
+        for i, (model_name, model_data) in enumerate(models.items()):
             if 'predictions' in model_data and len(model_data['predictions']) > 0:
                 # Get test dates
                 test_dates = historical_data['Date'].iloc[-len(model_data['predictions']):]
@@ -1099,6 +2255,38 @@ class SmartSalesForecaster:
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
+    @tracer.traced('plot: seasonal decomposition', 'plot')
+    def show_decomposition(self):
+        """Show the STL decomposition of the current product at its detected period"""
+        if self.daily_matrix is None:
+            messagebox.showwarning("Warning", "Please load data first")
+            return
+
+        # STL's seasonal smoother needs several cycles to separate the season
+        # from the noise, so longer periods fall back to the weekly one
+        n_days = self.daily_matrix.n_days
+        period = self.seasonality.period_for(self.current_product, max_period=n_days // 4)
+        if not period:
+            period = 7
+        if n_days < 2 * period:
+            messagebox.showwarning("Warning", f"Need at least {2 * period} days of data for decomposition")
+            return
+
+        series = self.daily_matrix.series(self.current_product)
+        components = stl_decompose(series, period)
+        fig = build_decomposition_figure(self.daily_matrix.dates(), series, components, period,
+                                         self.current_product, self.chart_theme())
+
+        window = tk.Toplevel(self.root)
+        window.title("📉 Seasonal Decomposition")
+        window.geometry("1200x800")
+        window.configure(bg=self.bg_color)
+
+        canvas = FigureCanvasTkAgg(fig, window)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+    @tracer.traced('aggregate: insights', 'aggregate')
     def generate_insights(self):
         """Generate enhanced business insights"""
         if self.sales_data is None:
@@ -1107,65 +2295,20 @@ class SmartSalesForecaster:
         # Clear previous insights
         self.insights_text.delete('1.0', tk.END)
 
-        insights = ""
-
-        # Title
-        insights += "📊 BUSINESS INTELLIGENCE INSIGHTS\n"
-        insights += "=" * 50 + "\n\n"
-
-        # Overall Statistics
-        insights += "[OVERALL PERFORMANCE]\n"
-        insights += "• Total Sales: ${:,.2f}\n".format(self.sales_data['Sales'].sum())
-        insights += "• Average Daily Sales: ${:,.2f}\n".format(self.sales_data['Sales'].mean())
-        insights += "• Total Transactions: {:,}\n\n".format(len(self.sales_data))
-
-        # Product Analysis
-        if 'Product' in self.sales_data.columns:
-            product_sales = self.sales_data.groupby('Product')['Sales'].sum()
-            total_sales = product_sales.sum()
-
-            insights += "[PRODUCT PERFORMANCE]\n"
-            for product, sales in product_sales.sort_values(ascending=False).items():
-                share = (sales / total_sales) * 100
-                insights += "• {}: ${:,.0f} ({:.1f}%)\n".format(product, sales, share)
-            insights += "\n"
-
-        # Time-based Insights
-        if 'Date' in self.sales_data.columns:
-            self.sales_data['Month'] = self.sales_data['Date'].dt.strftime('%B')
-            self.sales_data['DayOfWeek'] = self.sales_data['Date'].dt.day_name()
-
-            monthly_sales = self.sales_data.groupby('Month')['Sales'].sum()
-            daily_sales = self.sales_data.groupby('DayOfWeek')['Sales'].sum()
-
-            insights += "[TIME ANALYSIS]\n"
-            insights += "• Best Month: {} (${:,.0f})\n".format(
-                monthly_sales.idxmax(), monthly_sales.max())
-            insights += "• Best Day: {} (${:,.0f})\n".format(
-                daily_sales.idxmax(), daily_sales.max())
-            insights += "• Average Monthly Growth: {:.1f}%\n\n".format(
-                monthly_sales.pct_change().mean() * 100)
-
-        # Recommendations
-        insights += "[RECOMMENDATIONS]\n"
-        insights += "1. 📈 Focus marketing on top-performing products\n"
-        insights += "2. 🏪 Increase inventory before peak seasons\n"
-        insights += "3. 💰 Run promotions on low-sales days\n"
-        insights += "4. 📊 Monitor sales trends weekly\n"
-        insights += "5. 🤖 Use ML forecasting for inventory planning\n\n"
-
-        insights += "Report generated: {}\n".format(datetime.now().strftime('%Y-%m-%d %H:%M'))
+        insights = build_insights_text(self.slice_frame(), rolling=self.rolling_stats,
+                                       anomalies=self.anomalies, seasonality=self.seasonality,
+                                       demand=self.demand)
 
         # Insert with formatting
         self.insights_text.insert('1.0', insights)
 
         # Apply formatting
-        self.insights_text.tag_add('title', '1.0', '1.50')
-        self.insights_text.tag_add('heading', '3.0', '3.19')
-        self.insights_text.tag_add('heading', '11.0', '11.19')
-        self.insights_text.tag_add('heading', '19.0', '19.16')
-        self.insights_text.tag_add('heading', '26.0', '26.15')
+        self.insights_text.tag_add('title', '1.0', '1.end')
+        for line_no, line in enumerate(insights.splitlines(), start=1):
+            if line.startswith('['):
+                self.insights_text.tag_add('heading', f'{line_no}.0', f'{line_no}.end')
 
+    @tracer.traced('export: csv', 'export')
     def export_to_csv(self):
         """Export forecast results to CSV"""
         if not self.models:
@@ -1198,40 +2341,88 @@ class SmartSalesForecaster:
                 messagebox.showerror("Error", f"Could not export: {str(e)}")
 
     def export_to_excel(self):
-        """Export comprehensive report to Excel"""
+        """Export comprehensive report to Excel in the background"""
         if self.sales_data is None:
             messagebox.showwarning("Warning", "No data to export")
             return
 
+        sales_data = self.slice_frame()
+        raw = messagebox.askyesnocancel(
+            "Excel Export",
+            f"Export all {len(sales_data):,} raw records?\n\n"
+            "Yes = raw records (split across sheets past 1,048,576 rows)\n"
+            "No = daily product totals only"
+        )
+        if raw is None:
+            return
+
         filepath = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
             filetypes=[('Excel files', '*.xlsx'), ('All files', '*.*')]
         )
 
         if filepath:
-            try:
-                with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                    # Export raw data
-                    self.sales_data.to_excel(writer, sheet_name='Raw Data', index=False)
-
-                    # Export summary
-                    summary = pd.DataFrame({
-                        'Metric': ['Total Sales', 'Average Daily', 'Transactions', 'Date Range'],
-                        'Value': [
-                            f"${self.sales_data['Sales'].sum():,.2f}",
-                            f"${self.sales_data['Sales'].mean():,.2f}",
-                            len(self.sales_data),
-                            f"{self.sales_data['Date'].min().date()} to {self.sales_data['Date'].max().date()}"
-                            if 'Date' in self.sales_data.columns else 'N/A'
-                        ]
-                    })
-                    summary.to_excel(writer, sheet_name='Summary', index=False)
+            models = dict(self.models)
+            forecast_results = self.forecast_results
+
+            def work(progress):
+                return write_excel_report(filepath, sales_data,
+                                          models=models,
+                                          forecast_results=forecast_results,
+                                          raw=raw,
+                                          progress=progress)
+
+            def done(sheets):
+                self.update_status(f"✅ Excel report exported: {os.path.basename(filepath)}")
+                messagebox.showinfo("Success",
+                                    f"Complete report exported to Excel!\n"
+                                    f"Data sheets: {', '.join(sheets)}")
+
+            self.start_background_job("Excel export", work, done)
+
+    def start_background_job(self, title, work, on_success, on_error=None):
+        """Run work(progress) on a worker thread and poll it from the Tk loop
+
+        Errors are shown in a dialog unless an on_error(exception) handler is given.
+        """
+        if self.background_job is not None and self.background_job['thread'].is_alive():
+            messagebox.showwarning("Warning", f"{self.background_job['title']} is still running")
+            return
 
-                self.update_status(f"✅ Excel report exported")
-                messagebox.showinfo("Success", "Complete report exported to Excel!")
+        job = {'title': title, 'progress': (0.0, "Starting..."),
+               'result': None, 'error': None, 'on_success': on_success, 'on_error': on_error}
 
+        def progress(fraction, message):
+            job['progress'] = (fraction, message)
+
+        def worker():
+            try:
+                job['result'] = work(progress)
             except Exception as e:
-                messagebox.showerror("Error", f"Could not export: {str(e)}")
+                job['error'] = e
+
+        job['thread'] = threading.Thread(target=worker, daemon=True)
+        self.background_job = job
+        job['thread'].start()
+        self.poll_background_job()
+
+    def poll_background_job(self):
+        """Report background job progress in the status bar"""
+        job = self.background_job
+        fraction, message = job['progress']
+
+        if job['thread'].is_alive():
+            self.update_status(f"⏳ {job['title']} {fraction:.0%} - {message}")
+            self.root.after(250, self.poll_background_job)
+            return
+
+        if job['error'] is not None and job['on_error'] is not None:
+            job['on_error'](job['error'])
+        elif job['error'] is not None:
+            self.update_status(f"❌ {job['title']} failed")
+            messagebox.showerror("Error", f"{job['title']} failed:\n{str(job['error'])}")
+        else:
+            job['on_success'](job['result'])
 
     def generate_report(self):
         """Generate comprehensive business report"""
@@ -1258,38 +2449,70 @@ class SmartSalesForecaster:
         report_content.insert('1.0', report)
         report_content.config(state=tk.DISABLED)
 
-        # Save button
-        tk.Button(report_window,
-                  text="💾 Save Report as Text",
-                  command=lambda: self.save_text_report(report),
-                  font=('Segoe UI', 10),
+        # Save buttons
+        buttons_frame = tk.Frame(report_window, bg=self.bg_color)
+        buttons_frame.pack(pady=(0, 20))
+
+        btn_style = {'font': ('Segoe UI', 10), 'relief': 'flat', 'padx': 20, 'pady': 10}
+
+        tk.Button(buttons_frame,
+                  text="📄 Save as PDF",
+                  command=lambda: self.save_rich_report('pdf'),
                   bg=self.accent_color,
                   fg=self.bg_color,
-                  relief='flat',
-                  padx=30,
-                  pady=10).pack(pady=(0, 20))
+                  **btn_style).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(buttons_frame,
+                  text="🌐 Save as HTML",
+                  command=lambda: self.save_rich_report('html'),
+                  bg=self.success_color,
+                  fg='white',
+                  **btn_style).pack(side=tk.LEFT, padx=5)
+
+        tk.Button(buttons_frame,
+                  text="💾 Save as Text",
+                  command=lambda: self.save_text_report(report),
+                  bg=self.primary_color,
+                  fg='white',
+                  **btn_style).pack(side=tk.LEFT, padx=5)
 
+        tk.Button(buttons_frame,
+                  text="📚 Reports for All Products",
+                  command=self.generate_report_batch,
+                  bg=self.warning_color,
+                  fg=self.bg_color,
+                  **btn_style).pack(side=tk.LEFT, padx=5)
+
+    @tracer.traced('export: charts', 'export')
     def save_charts(self):
         """Save dashboard charts as images"""
-        if self.sales_data is None:
+        if self.sales_data is None or self.dashboard_figure is None:
             messagebox.showwarning("Warning", "No charts to save")
             return
 
+        current_only = messagebox.askyesnocancel(
+            "Save Charts",
+            "Save the current dashboard?\n\n"
+            "Yes = current dashboard as one image\n"
+            "No = chart pack with one image per product"
+        )
+        if current_only is None:
+            return
+
+        if not current_only:
+            self.save_chart_pack()
+            return
+
         filepath = filedialog.asksaveasfilename(
             defaultextension=".png",
-            filetypes=[('PNG files', '*.png'), ('All files', '*.*')]
+            filetypes=[('PNG files', '*.png'), ('PDF files', '*.pdf'),
+                       ('SVG files', '*.svg'), ('All files', '*.*')]
         )
 
         if filepath:
             try:
-                # Recreate the dashboard figure
-                fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-
-                # ... (same plotting code as in plot_sales_dashboard)
-
-                plt.tight_layout()
-                plt.savefig(filepath, dpi=300, bbox_inches='tight', facecolor=self.bg_color)
-                plt.close()
+                # Reuse the rendered dashboard figure instead of plotting again
+                save_figure(self.dashboard_figure, filepath, dpi=300, theme=self.chart_theme())
 
                 self.update_status(f"✅ Charts saved: {os.path.basename(filepath)}")
                 messagebox.showinfo("Success", "Charts saved successfully!")
@@ -1297,9 +2520,73 @@ class SmartSalesForecaster:
             except Exception as e:
                 messagebox.showerror("Error", f"Could not save charts: {str(e)}")
 
+    def save_chart_pack(self):
+        """Render one dashboard image per product in worker processes"""
+        output_dir = filedialog.askdirectory(title="Select Folder for Chart Pack")
+
+        if output_dir:
+            sales_data = self.slice_frame()
+            theme = self.chart_theme()
+
+            def work(progress):
+                return export_chart_pack(sales_data, output_dir, theme=theme, progress=progress)
+
+            def done(paths):
+                self.update_status(f"✅ Chart pack saved: {len(paths)} images")
+                messagebox.showinfo("Success", f"Saved {len(paths)} chart images to:\n{output_dir}")
+
+            self.start_background_job("Chart pack export", work, done)
+
+    def build_current_report(self):
+        """Collect report content for the currently selected product"""
+        totals = daily_product_totals(self.slice_frame(self.current_product))
+        models = self.models if self.forecast_product == self.slice_label(self.current_product) else None
+        return totals, build_report(totals, self.slice_label(self.current_product), models)
+
     def generate_report_text(self):
         """Generate report text"""
-        return "Sales Forecasting Report - Generated by Smart Sales Forecasting AI"
+        _, report = self.build_current_report()
+        return report_text(report)
+
+    def save_rich_report(self, fmt):
+        """Save the current product's report as PDF or HTML"""
+        filetypes = {'pdf': [('PDF files', '*.pdf')], 'html': [('HTML files', '*.html')]}
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=f".{fmt}",
+            filetypes=filetypes[fmt] + [('All files', '*.*')]
+        )
+
+        if filepath:
+            try:
+                totals, _ = self.build_current_report()
+                models = self.models if self.forecast_product == self.slice_label(self.current_product) else None
+                stem = os.path.splitext(filepath)[0]
+                with tracer.span(f'export: {fmt} report', 'export'):
+                    paths = write_report_files(self.slice_label(self.current_product), totals, stem, (fmt,),
+                                               models=models, theme=self.chart_theme())
+
+                self.update_status(f"✅ Report saved: {os.path.basename(paths[0])}")
+                messagebox.showinfo("Success", "Report saved successfully!")
+
+            except Exception as e:
+                messagebox.showerror("Error", f"Could not save report: {str(e)}")
+
+    def generate_report_batch(self):
+        """Write PDF and HTML reports for every product in worker processes"""
+        output_dir = filedialog.askdirectory(title="Select Folder for Product Reports")
+
+        if output_dir:
+            sales_data = self.slice_frame()
+            theme = self.chart_theme()
+
+            def work(progress):
+                return export_report_batch(sales_data, output_dir, theme=theme, progress=progress)
+
+            def done(paths):
+                self.update_status(f"✅ Batch reports saved: {len(paths)} files")
+                messagebox.showinfo("Success", f"Saved {len(paths)} report files to:\n{output_dir}")
+
+            self.start_background_job("Batch report export", work, done)
 
     def save_text_report(self, report_text):
         """Save report to text file"""
@@ -1323,10 +2610,24 @@ class SmartSalesForecaster:
         """Update status bar with timestamp"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.status_label.config(text=f"[{timestamp}] {message}")
-        self.root.update()
+        # Repaint only: unlike update(), this never dispatches user input, so
+        # compute code calling it cannot be re-entered by clicks or selections
+        self.status_label.update_idletasks()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Smart Sales Forecasting AI")
+    parser.add_argument('--profile', nargs='?', const='profiles', metavar='DIR',
+                        help="profile run_forecast and plot_sales_dashboard with cProfile "
+                             "and tracemalloc, writing reports to DIR (default: ./profiles)")
+    parser.add_argument('--data', metavar='PATH',
+                        help="sales data to load at startup: a file, a folder or a quoted glob "
+                             "pattern such as 'exports/sales_2024-*.csv'")
+    args, _ = parser.parse_known_args()
+
+    if args.profile:
+        profiler.enable(args.profile)
+
     root = tk.Tk()
 
     # Start maximized
@@ -1334,6 +2635,8 @@ def main():
 
     # Create application
     app = SmartSalesForecaster(root)
+    if args.data:
+        app.open_data(args.data)
 
     # Check dependencies
     try:
@@ -1343,7 +2646,8 @@ def main():
         messagebox.showwarning(
             "Missing Dependencies",
             "Please install:\n\n"
-            "pip install pandas matplotlib scikit-learn seaborn statsmodels openpyxl"
+            "pip install pandas matplotlib scikit-learn seaborn statsmodels openpyxl\n\n"
+            "Optional (faster Excel export): pip install xlsxwriter"
         )
 
     root.mainloop()
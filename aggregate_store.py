@@ -0,0 +1,262 @@
+"""
+💽 Aggregate Store for Smart Sales Forecasting AI
+Ingested datasets on disk as memory-mapped column and matrix files
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from analytics import AnomalyReport, PriceElasticity, RollingStats, SeasonalityProfile
+from data_quality import QualityReport
+from intermittent import DemandClassification
+from perf_monitor import tracer
+from sales_data import DailyMatrix, SparseDaily
+from trend import TrendFit
+
+# Next to the application rather than the working directory it was started from
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sales_cache')
+
+# Bumped whenever the file layout changes, so older stores are never opened
+STORE_VERSION = 2
+
+# Datasets kept under STORE_DIR; the least recently opened ones are removed
+MAX_STORES = 8
+
+# Products aggregated per pass when the daily matrix is written
+CHUNK_PRODUCTS = 4096
+
+# Aggregate types save_aggregates can write, looked up by name when opening
+_AGGREGATE_CLASSES = {cls.__name__: cls for cls in (
+    SparseDaily, DemandClassification, RollingStats, AnomalyReport,
+    SeasonalityProfile, TrendFit, PriceElasticity)}
+
+
+class AggregateStore:
+    """One ingested dataset as a directory of .npy files
+
+    Every column of the compact frame is saved as its own array
+    (categoricals as codes plus categories), next to the slice index
+    orderings and the product x day matrix with its column totals. The
+    aggregates derived from the matrix (KPIs, rolling features, anomalies,
+    ...) are added by save_aggregates once computed. open() maps them all
+    with np.load(mmap_mode='r'), so reopening costs file-mapping time and
+    pages come in only as rows, products or days are touched. The matrix is
+    row-major by product: one product's history is a contiguous,
+    zero-copy slice.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def for_files(cls, source_paths, fill, root=STORE_DIR):
+        """Store for a set of source files; any change to a file or the gap fill gets a new one"""
+        parts = []
+        for path in sorted(os.path.abspath(path) for path in source_paths):
+            stat = os.stat(path)
+            parts.append(f"{path}|{stat.st_mtime_ns}|{stat.st_size}")
+        key = "\n".join(parts + [fill, str(STORE_VERSION)])
+        return cls(os.path.join(root, hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]))
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, 'meta.json'))
+
+    @tracer.traced('store: save', 'load')
+    def save(self, frame, slice_index, report=None, chunk_products=CHUNK_PRODUCTS):
+        """Write a compact frame, its slice index orderings and its daily matrix
+
+        Files go to a temporary directory that is renamed into place, so a
+        store is either complete or absent.
+        """
+        tmp = self.path + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        columns = []
+        for col in frame.columns:
+            values = frame[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                np.save(os.path.join(tmp, f'{len(columns)}.codes.npy'), values.cat.codes.to_numpy())
+                np.save(os.path.join(tmp, f'{len(columns)}.categories.npy'),
+                        values.cat.categories.to_numpy().astype(str))
+                np.save(os.path.join(tmp, f'{len(columns)}.order.npy'), slice_index.groups[col][2])
+                columns.append({'name': col, 'kind': 'category'})
+            else:
+                np.save(os.path.join(tmp, f'{len(columns)}.npy'), values.to_numpy())
+                columns.append({'name': col, 'kind': 'array'})
+
+        start_day, n_days = _write_matrix(frame, slice_index, tmp, chunk_products)
+
+        meta = {'columns': columns, 'start_day': start_day, 'n_days': n_days,
+                'report': vars(report) if report is not None else None}
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(tmp, self.path)
+        evict_stores(os.path.dirname(self.path))
+
+    @tracer.traced('store: save aggregates', 'load')
+    def save_aggregates(self, aggregates):
+        """Write the aggregates derived from the stored matrix next to it
+
+        aggregates is the dict of the app's compute_aggregates; the daily
+        matrix itself is already in the store and is skipped.
+        """
+        directory = os.path.join(self.path, 'aggregates')
+        tmp = directory + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        specs = {name: _dump(value, tmp, name) for name, value in aggregates.items()
+                 if name != 'daily_matrix'}
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(specs, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    @tracer.traced('store: open', 'load')
+    def open(self):
+        """(frame, slice index orderings, aggregates, QualityReport) backed by memory maps
+
+        aggregates holds the daily matrix, plus everything save_aggregates
+        wrote when it was called for this store.
+        """
+        with open(os.path.join(self.path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        # The modification time orders the stores for evict_stores
+        os.utime(self.path)
+
+        def load(name):
+            return np.load(os.path.join(self.path, name), mmap_mode='r')
+
+        data, orders = {}, {}
+        for i, column in enumerate(meta['columns']):
+            if column['kind'] == 'category':
+                categories = pd.Index(np.load(os.path.join(self.path, f'{i}.categories.npy')))
+                data[column['name']] = pd.Categorical.from_codes(load(f'{i}.codes.npy'), categories,
+                                                                 validate=False)
+                orders[column['name']] = load(f'{i}.order.npy')
+            else:
+                data[column['name']] = load(f'{i}.npy')
+        frame = pd.DataFrame(data, copy=False)
+
+        matrix = DailyMatrix(load('values.npy'), load('counts.npy'),
+                             frame['Product'].cat.categories, meta['start_day'],
+                             load('totals.npy'), load('total_counts.npy'))
+        aggregates = {'daily_matrix': matrix}
+
+        directory = os.path.join(self.path, 'aggregates')
+        if os.path.exists(os.path.join(directory, 'meta.json')):
+            with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+                specs = json.load(f)
+            aggregates.update({name: _load(spec, directory) for name, spec in specs.items()})
+
+        report = None
+        if meta['report'] is not None:
+            report = QualityReport(meta['report']['fill'])
+            vars(report).update(meta['report'])
+        return frame, orders, aggregates, report
+
+
+def evict_stores(root=STORE_DIR, keep=MAX_STORES):
+    """Remove all but the keep most recently saved or opened stores under root"""
+    stores = [entry for entry in os.scandir(root)
+              if entry.is_dir() and not entry.name.endswith('.tmp')]
+    stores.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for entry in stores[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _dump(value, directory, name):
+    """Save the arrays of an aggregate as .npy files named after name
+
+    Returns the JSON description _load rebuilds the value from: frames,
+    indexes, lists, tuples and dicts are taken apart recursively, the
+    aggregate classes by their attributes, and plain values kept inline.
+    """
+    if isinstance(value, pd.DataFrame):
+        return {'frame': [[col, _dump(value[col].to_numpy(), directory, f'{name}.{i}')]
+                          for i, col in enumerate(value.columns)],
+                'index': _dump(value.index, directory, f'{name}.index')}
+    if isinstance(value, pd.Index):
+        return {'index': _dump(value.to_numpy(), directory, name), 'name': value.name}
+    if isinstance(value, np.ndarray):
+        # Object arrays only ever hold labels here; text keeps them mappable
+        np.save(os.path.join(directory, f'{name}.npy'),
+                value.astype(str) if value.dtype == object else value)
+        return {'array': f'{name}.npy'}
+    if isinstance(value, (list, tuple)):
+        return {type(value).__name__: _dump(np.asarray(value), directory, name)}
+    if isinstance(value, dict):
+        return {'dict': [[key, _dump(item, directory, f'{name}.{i}')]
+                         for i, (key, item) in enumerate(value.items())]}
+    if type(value).__name__ in _AGGREGATE_CLASSES:
+        return {'object': type(value).__name__, 'attributes': _dump(vars(value), directory, name)}
+    return {'value': value.item() if isinstance(value, np.generic) else value}
+
+
+def _load(spec, directory):
+    """Rebuild a value written by _dump, its arrays memory-mapped"""
+    if 'frame' in spec:
+        return pd.DataFrame({col: _load(column, directory) for col, column in spec['frame']},
+                            index=_load(spec['index'], directory), copy=False)
+    if 'index' in spec:
+        return pd.Index(_load(spec['index'], directory), name=spec['name'])
+    if 'array' in spec:
+        return np.load(os.path.join(directory, spec['array']), mmap_mode='r')
+    if 'list' in spec:
+        return _load(spec['list'], directory).tolist()
+    if 'tuple' in spec:
+        return tuple(_load(spec['tuple'], directory).tolist())
+    if 'dict' in spec:
+        return {key: _load(item, directory) for key, item in spec['dict']}
+    if 'object' in spec:
+        value = object.__new__(_AGGREGATE_CLASSES[spec['object']])
+        vars(value).update(_load(spec['attributes'], directory))
+        return value
+    return spec['value']
+
+
+def _write_matrix(frame, slice_index, directory, chunk_products):
+    """Fill the on-disk daily matrix a block of products at a time
+
+    Rows are taken in product order from the slice index, so each block is
+    one contiguous range of it and only that block is ever aggregated in
+    memory.
+    """
+    days = frame['Day'].to_numpy()
+    start_day = int(days.min()) if len(days) else 0
+    n_days = int(days.max()) - start_day + 1 if len(days) else 0
+    categories, codes, order, bounds = slice_index.groups['Product']
+    n_products = len(categories)
+
+    values = np.lib.format.open_memmap(os.path.join(directory, 'values.npy'), mode='w+',
+                                       dtype=np.float64, shape=(n_products, n_days))
+    counts = np.lib.format.open_memmap(os.path.join(directory, 'counts.npy'), mode='w+',
+                                       dtype=np.int32, shape=(n_products, n_days))
+    totals = np.zeros(n_days)
+    total_counts = np.zeros(n_days, dtype=np.int32)
+    sales = frame['Sales'].to_numpy()
+
+    for first in range(0, n_products, chunk_products):
+        last = min(first + chunk_products, n_products)
+        rows = order[bounds[first]:bounds[last]]
+        flat = (codes[rows].astype(np.int64) - first) * n_days + (days[rows] - start_day)
+        size = (last - first) * n_days
+        values[first:last] = np.bincount(flat, weights=sales[rows], minlength=size).reshape(-1, n_days)
+        counts[first:last] = np.bincount(flat, minlength=size).reshape(-1, n_days)
+        totals += values[first:last].sum(axis=0)
+        total_counts += counts[first:last].sum(axis=0)
+
+    np.save(os.path.join(directory, 'totals.npy'), totals)
+    np.save(os.path.join(directory, 'total_counts.npy'), total_counts)
+    values.flush()
+    counts.flush()
+    del values, counts
+    return start_day, n_days
@@ -0,0 +1,815 @@
+"""
+📈 Analytics Engine for Smart Sales Forecasting AI
+Business insight calculations shared by the dashboard and reports
+"""
+import calendar
+import copy
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from perf_monitor import tracer
+from intermittent import ROUTED_MODEL
+from sales_data import month_key, month_of_year, weekday, day_to_datetime
+
+# Growth compares the mean daily sales of the last and first window of days
+KPI_WINDOW_DAYS = 30
+
+# Rolling feature windows (days) and exponential moving average spans
+ROLLING_WINDOWS = (7, 30, 90, 365)
+EWMA_SPANS = (7, 30)
+
+# Anomaly detection defaults: robust z-score threshold, trailing window for
+# the rolling z-score, and the weekly season used by the seasonal methods
+ANOMALY_THRESHOLD = 3.5
+ANOMALY_WINDOW = 30
+ANOMALY_PERIOD = 7
+
+# Candidate seasonal periods (days) and the minimum share of the detrended
+# variance a period must explain to count as seasonal
+SEASONAL_CANDIDATES = (7, 14, 30, 91, 182, 365)
+SEASONAL_MIN_STRENGTH = 0.1
+
+# Product rows processed per block by the matrix-wide aggregates, bounding
+# their temporary arrays
+CHUNK_ROWS = 4096
+
+
+def record_count(frame):
+    """Number of underlying sales records (aggregated frames carry a Transactions column)"""
+    if 'Transactions' in frame.columns:
+        return int(frame['Transactions'].sum())
+    return len(frame)
+
+
+def build_insights_text(frame, max_products=20, rolling=None, anomalies=None, max_anomalies=10,
+                        seasonality=None, demand=None):
+    """Build the business insights text for a compact frame or its daily product totals
+
+    When a RollingStats engine is given, a trend-signal section based on
+    the latest moving averages is added; an AnomalyReport adds the most
+    significant spikes and drops, a SeasonalityProfile the detected cycles
+    and a DemandClassification the mix of demand patterns.
+    """
+    insights = ""
+
+    # Title
+    insights += "📊 BUSINESS INTELLIGENCE INSIGHTS\n"
+    insights += "=" * 50 + "\n\n"
+
+    # Overall Statistics
+    total = frame['Sales'].to_numpy().sum(dtype=np.float64)
+    count = record_count(frame)
+    # Per day with sales records, like the KPI table's Avg Daily
+    n_days = frame['Day'].nunique() if 'Day' in frame.columns else 0
+    insights += "[OVERALL PERFORMANCE]\n"
+    insights += "• Total Sales: ${:,.2f}\n".format(total)
+    insights += "• Average Daily Sales: ${:,.2f}\n".format(total / n_days if n_days else 0)
+    insights += "• Total Transactions: {:,}\n\n".format(count)
+
+    # Product Analysis
+    if 'Product' in frame.columns:
+        product_sales = frame.groupby('Product', observed=True)['Sales'].sum()
+        total_sales = product_sales.sum()
+
+        insights += "[PRODUCT PERFORMANCE]\n"
+        ranked = product_sales.sort_values(ascending=False)
+        for product, sales in ranked.head(max_products).items():
+            share = (sales / total_sales) * 100
+            insights += "• {}: ${:,.0f} ({:.1f}%)\n".format(product, sales, share)
+        if len(ranked) > max_products:
+            insights += "• ... and {:,} more products\n".format(len(ranked) - max_products)
+        insights += "\n"
+
+    # Time-based Insights
+    if 'Day' in frame.columns and len(frame) > 0:
+        # Integer calendar codes; names are looked up only for the winners
+        days = frame['Day'].to_numpy()
+        sales = frame['Sales']
+
+        calendar_month_sales = sales.groupby(month_of_year(days)).sum()
+        weekday_sales = sales.groupby(weekday(days)).sum()
+        monthly_sales = sales.groupby(month_key(days)).sum()
+
+        insights += "[TIME ANALYSIS]\n"
+        insights += "• Best Month: {} (${:,.0f})\n".format(
+            calendar.month_name[calendar_month_sales.idxmax()], calendar_month_sales.max())
+        insights += "• Best Day: {} (${:,.0f})\n".format(
+            calendar.day_name[weekday_sales.idxmax()], weekday_sales.max())
+        insights += "• Average Monthly Growth: {:.1f}%\n\n".format(
+            monthly_sales.pct_change().mean() * 100)
+
+    # Trend signals from the shared rolling statistics
+    if rolling is not None and rolling.n_days >= 30:
+        # The last row of the rolling arrays is the 'All Products' total
+        ma_7 = rolling.latest('ma_7')
+        ma_30 = rolling.latest('ma_30')
+        rising = int(np.sum(ma_7[:-1] > ma_30[:-1]))
+
+        insights += "[TREND SIGNALS]\n"
+        if ma_30[-1] > 0:
+            insights += "• Momentum (7-day vs 30-day MA): {:+.1f}%\n".format(
+                (ma_7[-1] / ma_30[-1] - 1) * 100)
+        insights += "• Products trending up: {:,} of {:,}\n\n".format(rising, len(ma_7) - 1)
+
+    # Detected seasonal cycles
+    if seasonality is not None:
+        periods = seasonality.frame()
+        # The totals row is last, whatever the products are called
+        overall = periods.iloc[-1]
+        per_product = periods.iloc[:-1]['Period'].value_counts()
+
+        insights += "[SEASONALITY]\n"
+        if overall['Period']:
+            insights += "• Overall cycle: {}-day ({:.0f}% of variation)\n".format(
+                int(overall['Period']), overall['Strength'] * 100)
+        else:
+            insights += "• Overall cycle: none detected\n"
+        for period, count in per_product.sort_index().items():
+            label = "{}-day cycle".format(period) if period else "No clear cycle"
+            insights += "• {}: {:,} product(s)\n".format(label, count)
+        insights += "\n"
+
+    # Demand patterns, and which products get Croston-type forecasts
+    if demand is not None:
+        insights += "[DEMAND PATTERNS]\n"
+        for demand_class, count in demand.counts().items():
+            if count:
+                routed = ROUTED_MODEL.get(demand_class)
+                insights += "• {}: {:,} product(s){}\n".format(
+                    demand_class.capitalize(), count, " → {} forecasts".format(routed) if routed else "")
+        insights += "\n"
+
+    # Spikes and drops from the anomaly detectors
+    if anomalies is not None:
+        table = anomalies.table
+        spikes = int((table['Kind'] == 'spike').sum())
+        insights += "[ANOMALIES]\n"
+        if table.empty:
+            insights += "• No unusual spikes or drops detected\n"
+        else:
+            insights += "• Flagged days: {:,} ({:,} spikes, {:,} drops)\n".format(
+                len(table), spikes, len(table) - spikes)
+        for row in table.head(max_anomalies).itertuples(index=False):
+            insights += "• {} {} {}: ${:,.0f} (expected ${:,.0f})\n".format(
+                row.Date.strftime('%Y-%m-%d'), row.Product,
+                '▲ spike' if row.Kind == 'spike' else '▼ drop', row.Sales, row.Expected)
+        if len(table) > max_anomalies:
+            insights += "• ... and {:,} more\n".format(len(table) - max_anomalies)
+        insights += "\n"
+
+    # Recommendations
+    insights += "[RECOMMENDATIONS]\n"
+    insights += "1. 📈 Focus marketing on top-performing products\n"
+    insights += "2. 🏪 Increase inventory before peak seasons\n"
+    if 'Day' in frame.columns and len(frame) > 0:
+        insights += "3. 💰 Run promotions on {}s, the lowest-sales day\n".format(
+            calendar.day_name[weekday_sales.idxmin()])
+    else:
+        insights += "3. 💰 Run promotions on low-sales days\n"
+    insights += "4. 📊 Monitor sales trends weekly\n"
+    insights += "5. 🤖 Use ML forecasting for inventory planning\n\n"
+
+    insights += "Report generated: {}\n".format(datetime.now().strftime('%Y-%m-%d %H:%M'))
+    return insights
+
+
+def _row_blocks(daily, rows=None, chunk_rows=CHUNK_ROWS):
+    """(output rows, values, counts) blocks covering rows of a DailyMatrix
+
+    Rows are the products followed by 'All Products' (row
+    len(daily.products)), whose values come from the matrix's separate
+    totals instead of a stacked copy of the whole (possibly memory-mapped)
+    matrix. rows optionally picks an ascending subset; the output rows then
+    index into that subset.
+    """
+    n_products = len(daily.products)
+    if rows is None:
+        rows = np.arange(n_products + 1)
+    products = rows[rows < n_products]
+    for first in range(0, len(products), chunk_rows):
+        block = products[first:first + chunk_rows]
+        out = slice(first, first + len(block))
+        if len(block) == block[-1] - block[0] + 1:
+            # Contiguous rows are a plain slice of the matrix
+            block = slice(block[0], block[-1] + 1)
+        yield out, daily.values[block], daily.counts[block]
+    if len(products) < len(rows):
+        yield slice(len(products), len(rows)), daily.totals[None], daily.total_counts[None]
+
+
+def _row_labels(daily, rows=None):
+    labels = list(daily.products) + ['All Products']
+    return labels if rows is None else [labels[row] for row in rows]
+
+
+@tracer.traced('aggregate: kpi table', 'aggregate')
+def compute_kpi_table(daily, window=KPI_WINDOW_DAYS, rows=None):
+    """KPI table for every product plus an 'All Products' row, in one vectorized pass
+
+    daily is a DailyMatrix. Windows are calendar days, so several records
+    per date (or missing dates) don't skew the growth figure, which is NaN
+    when the history is too short for two separate windows. rows limits
+    the table to some rows (see _row_blocks).
+    """
+    blocks = [_kpi_block(values, counts, window) for _, values, counts in _row_blocks(daily, rows)]
+    kpis = {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+    table = pd.DataFrame({
+        'Total Sales': kpis['total'],
+        'Avg Daily': kpis['avg_daily'],
+        'Growth %': kpis['growth'],
+        'Best Day': day_to_datetime(daily.start_day + kpis['best']),
+        'Best Day Sales': kpis['best_sales'],
+        'Active Days': kpis['active_days'],
+        'First Day': day_to_datetime(daily.start_day + kpis['first']),
+        'Last Day': day_to_datetime(daily.start_day + kpis['last']),
+    }, index=pd.Index(_row_labels(daily, rows), name='Product'))
+
+    return table[kpis['has_data']]
+
+
+def update_kpi_table(table, daily, rows, window=KPI_WINDOW_DAYS):
+    """A KPI table with the given rows recomputed from daily, the others kept"""
+    if not len(rows):
+        return table
+    labels = _row_labels(daily)
+    kept = table.drop(index=_row_labels(daily, rows), errors='ignore')
+    merged = pd.concat([kept, compute_kpi_table(daily, window, rows)])
+    return merged.reindex([label for label in labels if label in merged.index])
+
+
+def _kpi_block(values, counts, window):
+    """compute_kpi_table's per-row figures for one block of rows"""
+    n_rows, n_days = values.shape
+    rows = np.arange(n_rows)
+
+    active = counts > 0
+    has_data = active.any(axis=1)
+    first = np.argmax(active, axis=1)
+    last = n_days - 1 - np.argmax(active[:, ::-1], axis=1)
+    active_days = active.sum(axis=1)
+
+    total = values.sum(axis=1)
+    avg_daily = np.divide(total, active_days, out=np.zeros(n_rows), where=active_days > 0)
+
+    # Window sums from one cumulative sum per row
+    csum = np.zeros((n_rows, n_days + 1))
+    np.cumsum(values, axis=1, out=csum[:, 1:])
+    older = (csum[rows, np.minimum(first + window, n_days)] - csum[rows, first]) / window
+    recent = (csum[rows, last + 1] - csum[rows, np.maximum(last + 1 - window, 0)]) / window
+    eligible = has_data & (last - first + 1 >= 2 * window) & (older > 0)
+    growth = np.divide(recent - older, older, out=np.full(n_rows, np.nan), where=eligible) * 100
+
+    best = np.argmax(values, axis=1)
+    return {'total': total, 'avg_daily': avg_daily, 'growth': growth, 'best': best,
+            'best_sales': values[rows, best], 'active_days': active_days,
+            'first': first, 'last': last, 'has_data': has_data}
+
+
+def top_product(kpi_table):
+    """Best-selling product in a KPI table"""
+    products = kpi_table.drop(index='All Products', errors='ignore')
+    return products['Total Sales'].idxmax() if len(products) else "N/A"
+
+
+class RollingStats:
+    """Moving averages and EWMAs for every product, as product x day arrays
+
+    Rows follow the DailyMatrix products with an extra last row for
+    'All Products'. Window means come from one cumulative sum per row
+    (O(n) regardless of window size); EWMAs from a single IIR filter pass.
+    New days can be appended without recomputing the history.
+    """
+
+    def __init__(self, windows=ROLLING_WINDOWS, ewma_spans=EWMA_SPANS):
+        self.windows = tuple(windows)
+        self.ewma_spans = tuple(ewma_spans)
+        self.labels = []
+        self.start_day = 0
+        self.features = {}
+        self._tail_csum = None
+        self._last_ewma = {}
+
+    @classmethod
+    @tracer.traced('aggregate: rolling stats', 'aggregate')
+    def from_matrix(cls, daily, windows=ROLLING_WINDOWS, ewma_spans=EWMA_SPANS, rows=None):
+        """Compute all rolling features for a DailyMatrix (or some of its rows)"""
+        stats = cls(windows, ewma_spans)
+        stats.labels = _row_labels(daily, rows)
+        stats.start_day = daily.start_day
+
+        n_rows = len(stats.labels)
+        stats._tail_csum = np.zeros((n_rows, 1))
+        stats.features = {name: np.empty((n_rows, 0), dtype=np.float32)
+                          for name in stats.feature_names}
+        stats._append_blocks([(out, values) for out, values, _ in _row_blocks(daily, rows)],
+                             daily.n_days)
+        return stats
+
+    def copy(self):
+        """A copy that append() can extend without changing this one"""
+        stats = copy.copy(self)
+        stats.features = dict(self.features)
+        stats._last_ewma = dict(self._last_ewma)
+        return stats
+
+    def with_rows(self, rows, part):
+        """Copy with the given rows taken from part, the same features
+        computed for just those rows over the same days"""
+        stats = self.copy()
+        for name in self.feature_names:
+            stats.features[name] = np.array(self.features[name])
+            stats.features[name][rows] = part.features[name]
+        for span in self.ewma_spans:
+            stats._last_ewma[span] = np.array(self._last_ewma[span])
+            stats._last_ewma[span][rows] = part._last_ewma[span]
+        stats._tail_csum = np.array(self._tail_csum)
+        stats._tail_csum[rows] = part._tail_csum
+        return stats
+
+    @property
+    def feature_names(self):
+        return [f'ma_{w}' for w in self.windows] + [f'ewma_{s}' for s in self.ewma_spans]
+
+    @property
+    def n_days(self):
+        return self.features[self.feature_names[0]].shape[1] if self.features else 0
+
+    def append(self, new_values):
+        """Extend every feature with new day columns (rows x k, same row order)"""
+        new_values = np.asarray(new_values)
+        self._append_blocks([(slice(None), new_values)], new_values.shape[1])
+
+    def _append_blocks(self, blocks, n_new):
+        """append() given the new columns as (rows, values) blocks of rows"""
+        if n_new == 0:
+            return
+
+        n_rows = len(self._tail_csum)
+        keep = max(self.windows)
+        offset = self._tail_csum.shape[1] - 1
+        history = self.n_days
+        tail_csum = np.empty((n_rows, min(offset + n_new, keep) + 1))
+        added = {name: np.empty((n_rows, n_new), dtype=np.float32) for name in self.feature_names}
+        last_ewma = {span: np.empty(n_rows) for span in self.ewma_spans}
+
+        for rows, new_values in blocks:
+            new_values = np.asarray(new_values, dtype=np.float64)
+
+            # Cumulative sums continue from the kept tail of the previous run
+            tail = self._tail_csum[rows]
+            csum = np.concatenate([tail, tail[:, -1:] + np.cumsum(new_values, axis=1)], axis=1)
+
+            for w in self.windows:
+                end = np.arange(n_new) + offset + 1
+                start = end - w
+                window_mean = np.full((len(new_values), n_new), np.nan)
+                valid = (start >= 0) & (history + np.arange(n_new) + 1 >= w)
+                window_mean[:, valid] = (csum[:, end[valid]] - csum[:, start[valid]]) / w
+                added[f'ma_{w}'][rows] = window_mean
+
+            for span in self.ewma_spans:
+                alpha = 2.0 / (span + 1)
+                previous = self._last_ewma[span][rows] if span in self._last_ewma \
+                    else new_values[:, 0]
+                smoothed, _ = lfilter([alpha], [1, alpha - 1], new_values, axis=1,
+                                      zi=((1 - alpha) * previous)[:, None])
+                last_ewma[span][rows] = smoothed[:, -1]
+                added[f'ewma_{span}'][rows] = smoothed
+
+            tail_csum[rows] = csum[:, -tail_csum.shape[1]:]
+
+        for name, block in added.items():
+            self.features[name] = np.concatenate([self.features[name], block], axis=1)
+        self._last_ewma = last_ewma
+        self._tail_csum = tail_csum
+
+    def row(self, product=None):
+        """Row index for a product ('All Products' or None for the total)"""
+        if product is None:
+            product = 'All Products'
+        return self.labels.index(product)
+
+    def series(self, name, product=None):
+        """One feature's daily values for a product"""
+        return self.features[name][self.row(product)]
+
+    def latest(self, name):
+        """Most recent value of a feature for every row"""
+        return self.features[name][:, -1]
+
+    def feature_frame(self, product=None, lag=1):
+        """Feature table indexed by Day, shifted by lag days so it only uses the past
+
+        Days before a window has filled stay NaN; filling them from later
+        rows would leak future sales into the features.
+        """
+        row = self.row(product)
+        days = np.arange(self.start_day, self.start_day + self.n_days) + lag
+        return pd.DataFrame({name: self.features[name][row] for name in self.feature_names},
+                            index=pd.Index(days, name='Day'))
+
+
+# ============ ANOMALY DETECTION ============
+
+def _window_sums(values, valid, window, centered=False):
+    """NaN-aware sums/counts over a sliding window along axis 1 via cumulative sums
+
+    Trailing windows cover [t - window, t) (the current day excluded);
+    centered windows cover [t - window // 2, t + window // 2].
+    """
+    n_rows, n_days = values.shape
+    filled = np.where(valid, values, 0.0)
+    csum = np.zeros((n_rows, n_days + 1))
+    csq = np.zeros((n_rows, n_days + 1))
+    ccount = np.zeros((n_rows, n_days + 1))
+    np.cumsum(filled, axis=1, out=csum[:, 1:])
+    np.cumsum(filled ** 2, axis=1, out=csq[:, 1:])
+    np.cumsum(valid, axis=1, out=ccount[:, 1:])
+
+    t = np.arange(n_days)
+    if centered:
+        start = np.clip(t - window // 2, 0, n_days)
+        end = np.clip(t + window // 2 + 1, 0, n_days)
+    else:
+        start = np.clip(t - window, 0, n_days)
+        end = t
+
+    return (csum[:, end] - csum[:, start],
+            csq[:, end] - csq[:, start],
+            ccount[:, end] - ccount[:, start])
+
+
+def _nanmean(values, axis, keepdims=False):
+    """np.nanmean without the empty-slice warning: all-NaN slices give NaN"""
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=axis, keepdims=keepdims)
+    sums = np.where(valid, values, 0.0).sum(axis=axis, keepdims=keepdims)
+    return np.divide(sums, counts, out=np.full(np.shape(sums), np.nan), where=counts > 0)
+
+
+def _nanmedian(values, axis):
+    """np.nanmedian (keepdims) where all-NaN slices quietly give NaN"""
+    with warnings.catch_warnings():
+        warnings.filterwarnings('ignore', 'All-NaN slice encountered', RuntimeWarning)
+        return np.nanmedian(values, axis=axis, keepdims=True)
+
+
+def _robust_z(residuals):
+    """Per-row robust z-scores using the median absolute deviation"""
+    median = _nanmedian(residuals, axis=1)
+    mad = _nanmedian(np.abs(residuals - median), axis=1)
+    mad = np.where(mad > 0, mad, np.nan)
+    return 0.6745 * (residuals - median) / mad
+
+
+def _seasonal_blocks(values, start_day, period):
+    """Reshape rows into (rows, cycles, period) blocks aligned on the calendar"""
+    n_rows, n_days = values.shape
+    lead = int((start_day + 3) % 7) if period == 7 else 0
+    total = -(-(lead + n_days) // period) * period
+    padded = np.full((n_rows, total), np.nan)
+    padded[:, lead:lead + n_days] = values
+    return padded.reshape(n_rows, -1, period), lead
+
+
+def rolling_zscore(values, valid, window=ANOMALY_WINDOW):
+    """z-score of each day against the mean and std of the trailing window"""
+    sums, squares, counts = _window_sums(values, valid, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / counts
+        std = np.sqrt(np.maximum(squares / counts - mean ** 2, 0))
+        z = (values - mean) / std
+    z[(counts < window // 2) | ~valid | ~np.isfinite(z)] = np.nan
+    return z, mean
+
+
+def decomposition_residual_zscore(values, valid, start_day, period=ANOMALY_PERIOD):
+    """Robust z-score of the residual after removing trend and seasonality
+
+    A vectorized classical decomposition: centered moving-average trend plus
+    per-phase seasonal means, applied to every row at once.
+    """
+    # The day itself is left out of its trend window so a spike can't mask itself
+    sums, _, counts = _window_sums(values, valid, period, centered=True)
+    sums -= np.where(valid, values, 0.0)
+    counts -= valid
+    # Rounding can leave a tiny sum where no other day has records; that
+    # must give no trend rather than an infinite one
+    trend = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+    detrended = np.where(valid, values - trend, np.nan)
+
+    blocks, lead = _seasonal_blocks(detrended, start_day, period)
+    phase_means = _nanmean(blocks, axis=1)
+    phase_means -= _nanmean(phase_means, axis=1, keepdims=True)
+    seasonal = np.tile(phase_means, blocks.shape[1])[:, lead:lead + values.shape[1]]
+
+    expected = trend + seasonal
+    return _robust_z(values - expected), expected
+
+
+def seasonal_mad_zscore(values, valid, start_day, period=ANOMALY_PERIOD):
+    """Robust z-score of each day against the median of the same weekday"""
+    masked = np.where(valid, values, np.nan)
+    blocks, lead = _seasonal_blocks(masked, start_day, period)
+    median = _nanmedian(blocks, axis=1)
+    mad = _nanmedian(np.abs(blocks - median), axis=1)
+    mad = np.where(mad > 0, mad, np.nan)
+    z = (0.6745 * (blocks - median) / mad).reshape(len(values), -1)
+    expected = np.broadcast_to(median, blocks.shape).reshape(len(values), -1)
+    n_days = values.shape[1]
+    return z[:, lead:lead + n_days], expected[:, lead:lead + n_days]
+
+
+class AnomalyReport:
+    """Flagged days per product from the combined anomaly detectors"""
+
+    def __init__(self, labels, start_day, mask, scores, expected, table):
+        self.labels = labels
+        self.start_day = start_day
+        self.mask = mask
+        self.scores = scores
+        self.expected = expected
+        self.table = table
+
+    def with_rows(self, rows, part):
+        """Report with the given rows taken from part, a report of just those
+        rows over the same days"""
+        mask, scores, expected = (np.array(self.mask), np.array(self.scores),
+                                  np.array(self.expected))
+        mask[rows], scores[rows], expected[rows] = part.mask, part.scores, part.expected
+        table = pd.concat([self.table[~self.table['Product'].isin(part.labels)], part.table],
+                          ignore_index=True)
+        table = table.reindex(table['Score'].abs().sort_values(ascending=False).index)
+        return AnomalyReport(self.labels, self.start_day, mask, scores, expected,
+                             table.reset_index(drop=True))
+
+    def days_for(self, product=None):
+        """Flagged day offsets of one product ('All Products' when None)"""
+        row = self.labels.index(product if product is not None else 'All Products')
+        return self.start_day + np.flatnonzero(self.mask[row])
+
+    def expected_for(self, product=None):
+        """Baseline values for one product, aligned with the DailyMatrix days"""
+        row = self.labels.index(product if product is not None else 'All Products')
+        return self.expected[row]
+
+
+@tracer.traced('aggregate: anomalies', 'aggregate')
+def detect_anomalies(daily, threshold=ANOMALY_THRESHOLD, window=ANOMALY_WINDOW,
+                     period=ANOMALY_PERIOD, min_votes=2, rows=None):
+    """Flag spikes and drops in every product series at once
+
+    Three detectors score each day: a trailing rolling z-score, the robust
+    z-score of decomposition residuals, and a seasonal (same weekday) MAD
+    score. A day is flagged when at least min_votes detectors agree on the
+    direction. Days without any records are never flagged. rows limits the
+    report to some rows (see _row_blocks).
+    """
+    labels = _row_labels(daily, rows)
+    shape = (len(labels), daily.n_days)
+    mask = np.empty(shape, dtype=bool)
+    combined = np.empty(shape)
+    expected = np.empty(shape)
+
+    tables = []
+    for out, values, counts in _row_blocks(daily, rows):
+        valid = counts > 0
+        z_roll, _ = rolling_zscore(values, valid, window)
+        z_resid, baseline = decomposition_residual_zscore(values, valid, daily.start_day, period)
+        z_season, seasonal_median = seasonal_mad_zscore(values, valid, daily.start_day, period)
+        expected[out] = np.where(np.isfinite(baseline), baseline, seasonal_median)
+
+        scores = np.stack([z_roll, z_resid, z_season])
+        spikes = np.sum(np.nan_to_num(scores) > threshold, axis=0)
+        drops = np.sum(np.nan_to_num(scores) < -threshold, axis=0)
+        mask[out] = valid & ((spikes >= min_votes) | (drops >= min_votes))
+        combined[out] = _nanmean(scores, axis=0)
+
+        r, cols = np.nonzero(mask[out])
+        tables.append(pd.DataFrame({
+            'Product': np.asarray(labels[out], dtype=object)[r],
+            'Date': day_to_datetime(daily.start_day + cols),
+            'Sales': values[r, cols],
+            'Expected': expected[out][r, cols],
+            'Score': combined[out][r, cols],
+            'Kind': np.where(spikes[r, cols] >= min_votes, 'spike', 'drop'),
+            'Detectors': np.maximum(spikes, drops)[r, cols],
+        }))
+
+    table = pd.concat(tables, ignore_index=True)
+    table = table.reindex(table['Score'].abs().sort_values(ascending=False).index)
+
+    return AnomalyReport(labels, daily.start_day, mask, combined,
+                         expected, table.reset_index(drop=True))
+
+
+# ============ SEASONALITY ============
+
+class SeasonalityProfile:
+    """Periodogram strength of each candidate period for every product
+
+    strength[r, c] is the share of row r's detrended variance carried by
+    candidate period c (NaN when the history holds too few cycles).
+    """
+
+    def __init__(self, labels, candidates, strength, min_strength=SEASONAL_MIN_STRENGTH):
+        self.labels = labels
+        self.candidates = np.asarray(candidates)
+        self.strength = strength
+        self.min_strength = min_strength
+
+    def with_rows(self, rows, part):
+        """Profile with the given rows taken from part, a profile of just those rows"""
+        strength = np.array(self.strength)
+        strength[rows] = part.strength
+        return SeasonalityProfile(self.labels, self.candidates, strength, self.min_strength)
+
+    def _pick(self, strength, max_period=None):
+        allowed = np.isfinite(strength) & (strength >= self.min_strength)
+        if max_period is not None:
+            allowed &= self.candidates <= max_period
+        if not allowed.any():
+            return 0, 0.0
+        best = np.argmax(np.where(allowed, strength, -1))
+        return int(self.candidates[best]), float(strength[best])
+
+    def period_for(self, product=None, max_period=None):
+        """Strongest seasonal period of a product, or 0 when none is detected
+
+        max_period limits the choice, e.g. to periods a model can still fit
+        twice into its training window.
+        """
+        row = self.labels.index(product if product is not None else 'All Products')
+        return self._pick(self.strength[row], max_period)[0]
+
+    def frame(self):
+        """Detected period and its strength for every product"""
+        picks = [self._pick(row) for row in self.strength]
+        return pd.DataFrame({'Period': [p for p, _ in picks],
+                             'Strength': [s for _, s in picks]},
+                            index=pd.Index(self.labels, name='Product'))
+
+
+@tracer.traced('aggregate: seasonality', 'aggregate')
+def detect_seasonality(daily, candidates=SEASONAL_CANDIDATES, min_cycles=2,
+                       min_strength=SEASONAL_MIN_STRENGTH, rows=None):
+    """Score candidate seasonal periods for every product with one batched FFT
+
+    Rows are linearly detrended (days without records take the row mean)
+    and the periodogram power at each candidate frequency is expressed as a
+    share of the total. Periods need min_cycles full cycles of history.
+    rows limits the profile to some rows (see _row_blocks).
+    """
+    labels = _row_labels(daily, rows)
+    strength = np.full((len(labels), len(candidates)), np.nan)
+    for out, values, counts in _row_blocks(daily, rows):
+        strength[out] = _seasonal_strength(values, counts > 0, candidates, min_cycles)
+    return SeasonalityProfile(labels, candidates, strength, min_strength)
+
+
+def _seasonal_strength(values, valid, candidates, min_cycles):
+    """detect_seasonality's candidate strengths for one block of rows"""
+    n_rows, n_days = values.shape
+    active = np.maximum(valid.sum(axis=1, keepdims=True), 1)
+    row_mean = np.where(valid, values, 0.0).sum(axis=1, keepdims=True) / active
+    filled = np.where(valid, values, row_mean)
+
+    # Closed-form linear detrend of all rows at once
+    t = np.arange(n_days) - (n_days - 1) / 2
+    denom = max(float(t @ t), 1.0)
+    slope = (filled - filled.mean(axis=1, keepdims=True)) @ t / denom
+    residual = filled - filled.mean(axis=1, keepdims=True) - slope[:, None] * t
+
+    power = np.abs(np.fft.rfft(residual, axis=1)) ** 2
+    power[:, 0] = 0
+    total = power.sum(axis=1)
+    total[total == 0] = np.nan
+
+    n_bins = power.shape[1]
+    strength = np.full((n_rows, len(candidates)), np.nan)
+    for c, period in enumerate(candidates):
+        if n_days < min_cycles * period:
+            continue
+        k = n_days / period
+        bins = np.unique(np.clip([int(np.floor(k)), int(np.ceil(k))], 1, n_bins - 1))
+        strength[:, c] = power[:, bins].max(axis=1) / total
+    return strength
+
+
+def stl_decompose(series, period):
+    """STL decomposition of one daily series into trend, seasonal and residual"""
+    from statsmodels.tsa.seasonal import STL
+
+    result = STL(np.asarray(series, dtype=np.float64), period=period, robust=True).fit()
+    return {'trend': result.trend, 'seasonal': result.seasonal, 'resid': result.resid}
+
+
+# ============ PRICE ELASTICITY ============
+
+class PriceElasticity:
+    """Log-log demand model per product: log(Q) = a + e * log(P) + b * years
+
+    Rows follow the frame's products with an extra last 'All Products' row
+    whose elasticity is the sales-weighted mean of the fitted products.
+    Products without enough price variation get NaN.
+    """
+
+    def __init__(self, labels, coef, n_obs):
+        self.labels = labels
+        self.coef = coef
+        self.n_obs = n_obs
+
+    @property
+    def elasticity(self):
+        return self.coef[:, 1]
+
+    def _row(self, product):
+        return self.labels.index(product if product is not None else 'All Products')
+
+    def elasticity_for(self, product=None):
+        return float(self.elasticity[self._row(product)])
+
+    def what_if(self, product, price_change_pct):
+        """(sales, quantity) multipliers for a relative price change, without refitting
+
+        Quantity scales with (1 + change) ** e and sales revenue with
+        (1 + change) ** (1 + e).
+        """
+        e = self.elasticity_for(product)
+        factor = 1 + price_change_pct / 100
+        if not np.isfinite(e) or factor <= 0:
+            return 1.0, 1.0
+        return factor ** (1 + e), factor ** e
+
+    def frame(self):
+        """Elasticity and observation count for every product"""
+        return pd.DataFrame({'Elasticity': self.elasticity, 'Observations': self.n_obs},
+                            index=pd.Index(self.labels, name='Product'))
+
+
+@tracer.traced('aggregate: price elasticity', 'aggregate')
+def fit_price_elasticity(frame, min_obs=10):
+    """Fit the log-log elasticity model for every product in one batched solve
+
+    Each product's 3x3 normal equations are accumulated with bincount over
+    the records that have a positive price and quantity, then all systems
+    are solved together with numpy.linalg.solve. Products whose records all
+    fall on one day drop the time term; any system that is still singular
+    (e.g. price moving in lockstep with time) is left unfitted.
+    """
+    products = frame['Product'].cat.categories
+    labels = list(products) + ['All Products']
+    n_products = len(products)
+
+    price = frame['Price'].to_numpy(dtype=np.float64)
+    quantity = frame['Quantity'].to_numpy(dtype=np.float64)
+    usable = np.isfinite(price) & (price > 0) & (quantity > 0)
+
+    codes = frame['Product'].cat.codes.to_numpy()[usable]
+    days = frame['Day'].to_numpy()[usable]
+    features = [np.ones(len(codes)), np.log(price[usable]),
+                (days - days.mean()) / 365.25 if len(days) else days.astype(np.float64)]
+    target = np.log(quantity[usable])
+
+    xtx = np.empty((n_products, 3, 3))
+    xty = np.empty((n_products, 3))
+    for i in range(3):
+        xty[:, i] = np.bincount(codes, weights=features[i] * target, minlength=n_products)
+        for j in range(i, 3):
+            xtx[:, i, j] = xtx[:, j, i] = np.bincount(codes, weights=features[i] * features[j],
+                                                      minlength=n_products)
+    n_obs = xtx[:, 0, 0].astype(np.int64)
+
+    # Products with too few records or a constant price are left unfitted
+    mean_log_price = np.divide(xtx[:, 0, 1], n_obs, out=np.zeros(n_products), where=n_obs > 0)
+    price_var = np.divide(xtx[:, 1, 1], n_obs, out=np.zeros(n_products), where=n_obs > 0) \
+        - mean_log_price ** 2
+    fitted = (n_obs >= min_obs) & (price_var > 1e-9)
+
+    # No date spread: pin the time coefficient to zero instead of solving for it
+    mean_time = np.divide(xtx[:, 0, 2], n_obs, out=np.zeros(n_products), where=n_obs > 0)
+    time_var = np.divide(xtx[:, 2, 2], n_obs, out=np.zeros(n_products), where=n_obs > 0) \
+        - mean_time ** 2
+    flat = time_var <= 1e-12
+    xtx[flat, 2, :] = 0
+    xtx[flat, :, 2] = 0
+    xtx[flat, 2, 2] = 1
+    xty[flat, 2] = 0
+    if fitted.any():
+        fitted[fitted] = np.linalg.matrix_rank(xtx[fitted]) == 3
+
+    coef = np.full((n_products + 1, 3), np.nan)
+    if fitted.any():
+        coef[:-1][fitted] = np.linalg.solve(xtx[fitted], xty[fitted][..., None])[..., 0]
+
+    sales = np.bincount(frame['Product'].cat.codes.to_numpy(),
+                        weights=frame['Sales'].to_numpy(dtype=np.float64), minlength=n_products)
+    if fitted.any() and sales[fitted].sum() > 0:
+        coef[-1] = np.average(coef[:-1][fitted], axis=0, weights=sales[fitted])
+
+    return PriceElasticity(labels, coef, np.append(n_obs, n_obs.sum()))
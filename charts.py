@@ -0,0 +1,276 @@
+"""
+🖼️ Dashboard Charts for Smart Sales Forecasting AI
+Backend-independent figure construction and headless chart export
+"""
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+
+from perf_monitor import tracer
+from sales_data import day_to_datetime, month_key, month_labels, product_slices
+from trend import fit_trends
+
+# Dashboard color scheme, shared with the Tk application
+DEFAULT_THEME = {
+    'bg_color': '#0a1929',
+    'card_bg': '#112240',
+    'accent_color': '#64ffda',
+    'accent_light': '#99ffe8',
+    'primary_color': '#1d3557',
+    'success_color': '#4cc9f0',
+    'warning_color': '#ffd166',
+    'danger_color': '#ef476f',
+    'text_color': '#ffffff',
+    'text_secondary': '#8892b0',
+    'grid_color': '#2d3748',
+}
+
+
+def build_dashboard_figure(plot_data, title_suffix, theme=None, daily_features=None):
+    """Build the 2x2 sales dashboard figure for a compact sales frame
+
+    The figure is created without pyplot, so it can be embedded in Tk,
+    rendered headless on the Agg backend or built in a worker process.
+    daily_features optionally supplies precomputed 'dates', 'daily',
+    'ma_7', 'ma_30' and 'trend' arrays (see RollingStats and TrendFit) so
+    nothing is re-rolled or re-fitted.
+    """
+    theme = theme or DEFAULT_THEME
+
+    # Daily totals are shared by the trend and moving-average charts
+    if daily_features is not None:
+        dates = daily_features['dates']
+        daily_sales = pd.Series(daily_features['daily'], index=dates)
+        ma_7 = pd.Series(daily_features['ma_7'], index=dates)
+        ma_30 = pd.Series(daily_features['ma_30'], index=dates)
+        trend = daily_features['trend']
+    else:
+        daily_sales = plot_data.groupby('Day')['Sales'].sum()
+        trend = fit_trends(daily_sales.to_numpy(dtype=np.float64), daily_sales.index).trend()[0]
+        daily_sales.index = day_to_datetime(daily_sales.index)
+        ma_7 = daily_sales.rolling(window=7).mean()
+        ma_30 = daily_sales.rolling(window=30).mean()
+
+    # Create 2x2 grid of charts
+    fig = Figure(figsize=(16, 12))
+    axes = fig.subplots(2, 2)
+    fig.patch.set_facecolor(theme['bg_color'])
+
+    # 1. Sales Trend Chart
+    ax1 = axes[0, 0]
+    if len(daily_sales) > 0:
+        ax1.plot(daily_sales.index, daily_sales.values,
+                 color=theme['accent_color'], linewidth=2.5, alpha=0.8)
+
+        # Add trend line (fitted with weekday effects, which are left out of the line)
+        if len(daily_sales) > 30:
+            ax1.plot(daily_sales.index, trend,
+                     color=theme['warning_color'], linewidth=2, linestyle='--',
+                     label='Trend Line')
+
+        ax1.set_title(f'📈 Sales Trend - {title_suffix}',
+                      fontsize=14, fontweight='bold', color='white', pad=20)
+        ax1.set_ylabel('Sales ($)', color='white', fontsize=11)
+        ax1.tick_params(axis='x', colors='white', labelsize=9)
+        ax1.tick_params(axis='y', colors='white', labelsize=9)
+        ax1.grid(True, alpha=0.2, color='gray', linestyle='--')
+        ax1.legend(facecolor=theme['card_bg'], edgecolor='none',
+                   labelcolor='white', fontsize=9)
+
+    ax1.set_facecolor(theme['card_bg'])
+
+    # 2. Product Performance (if multiple products)
+    ax2 = axes[0, 1]
+    if 'Product' in plot_data.columns and len(plot_data['Product'].unique()) > 1:
+        product_sales = plot_data.groupby('Product', observed=True)['Sales'].sum().sort_values()
+        colors = colormaps['viridis'](np.linspace(0.2, 0.8, len(product_sales)))
+        bars = ax2.barh(range(len(product_sales)), product_sales.values, color=colors, height=0.6)
+
+        # Add value labels
+        for i, (bar, val) in enumerate(zip(bars, product_sales.values)):
+            ax2.text(val + (val * 0.01), bar.get_y() + bar.get_height() / 2,
+                     f'${val:,.0f}', ha='left', va='center',
+                     fontsize=9, color='white', fontweight='bold')
+
+        ax2.set_title('🏆 Product Performance',
+                      fontsize=14, fontweight='bold', color='white', pad=20)
+        ax2.set_yticks(range(len(product_sales)))
+        ax2.set_yticklabels(product_sales.index, color='white', fontsize=10)
+        ax2.set_xlabel('Total Sales ($)', color='white', fontsize=11)
+        ax2.tick_params(axis='x', colors='white', labelsize=9)
+        ax2.grid(True, alpha=0.2, color='gray', linestyle='--', axis='x')
+
+    ax2.set_facecolor(theme['card_bg'])
+
+    # 3. Monthly Sales
+    ax3 = axes[1, 0]
+    if len(plot_data) > 0:
+        # Group on integer month keys (chronological) and label only the groups
+        monthly_sales = plot_data['Sales'].groupby(month_key(plot_data['Day'])).sum()
+        monthly_sales.index = month_labels(monthly_sales.index)
+
+        colors = colormaps['plasma'](np.linspace(0.2, 0.8, len(monthly_sales)))
+        bars = ax3.bar(range(len(monthly_sales)), monthly_sales.values,
+                       color=colors, width=0.7, edgecolor='white', linewidth=1)
+
+        # Add value labels
+        for i, (bar, val) in enumerate(zip(bars, monthly_sales.values)):
+            ax3.text(bar.get_x() + bar.get_width() / 2, bar.get_height(),
+                     f'${val:,.0f}', ha='center', va='bottom',
+                     fontsize=9, color='white', rotation=0)
+
+        ax3.set_title('📅 Monthly Sales',
+                      fontsize=14, fontweight='bold', color='white', pad=20)
+        ax3.set_xticks(range(len(monthly_sales)))
+        ax3.set_xticklabels(monthly_sales.index, rotation=45,
+                            color='white', fontsize=9, ha='right')
+        ax3.set_ylabel('Sales ($)', color='white', fontsize=11)
+        ax3.tick_params(axis='y', colors='white', labelsize=9)
+        ax3.grid(True, alpha=0.2, color='gray', linestyle='--', axis='y')
+
+    ax3.set_facecolor(theme['card_bg'])
+
+    # 4. Moving Averages
+    ax4 = axes[1, 1]
+    if len(daily_sales) > 0:
+        ax4.plot(daily_sales.index, daily_sales.values,
+                 color=theme['text_secondary'], alpha=0.4, linewidth=1, label='Daily')
+        ax4.plot(ma_7.index, ma_7.values,
+                 color=theme['success_color'], linewidth=2.5, label='7-Day MA')
+        ax4.plot(ma_30.index, ma_30.values,
+                 color=theme['accent_color'], linewidth=2.5, label='30-Day MA')
+
+        ax4.fill_between(ma_7.index, ma_7.values, alpha=0.2, color=theme['success_color'])
+        ax4.fill_between(ma_30.index, ma_30.values, alpha=0.1, color=theme['accent_color'])
+
+        ax4.set_title('📊 Moving Averages Analysis',
+                      fontsize=14, fontweight='bold', color='white', pad=20)
+        ax4.set_xlabel('Date', color='white', fontsize=11)
+        ax4.set_ylabel('Sales ($)', color='white', fontsize=11)
+        ax4.tick_params(axis='x', colors='white', labelsize=9)
+        ax4.tick_params(axis='y', colors='white', labelsize=9)
+        ax4.legend(facecolor=theme['card_bg'], edgecolor='none',
+                   labelcolor='white', fontsize=10, loc='upper left')
+        ax4.grid(True, alpha=0.2, color='gray', linestyle='--')
+
+    ax4.set_facecolor(theme['card_bg'])
+
+    # Adjust layout
+    fig.tight_layout()
+    return fig
+
+
+def build_decomposition_figure(dates, observed, components, period, title_suffix, theme=None):
+    """Build the stacked observed / trend / seasonal / residual figure of an STL run"""
+    theme = theme or DEFAULT_THEME
+
+    fig = Figure(figsize=(14, 10))
+    axes = fig.subplots(4, 1, sharex=True)
+    fig.patch.set_facecolor(theme['bg_color'])
+
+    panels = [
+        ('Observed', observed, theme['text_secondary']),
+        ('Trend', components['trend'], theme['warning_color']),
+        (f'Seasonal ({period}-day)', components['seasonal'], theme['accent_color']),
+        ('Residual', components['resid'], theme['danger_color']),
+    ]
+    for ax, (label, values, color) in zip(axes, panels):
+        ax.plot(dates, values, color=color, linewidth=1.5)
+        ax.set_ylabel(label, color='white', fontsize=10)
+        ax.tick_params(axis='x', colors='white', labelsize=9)
+        ax.tick_params(axis='y', colors='white', labelsize=9)
+        ax.grid(True, alpha=0.2, color='gray', linestyle='--')
+        ax.set_facecolor(theme['card_bg'])
+
+    axes[-1].axhline(0, color='gray', linewidth=1)
+    axes[0].set_title(f'📉 Seasonal Decomposition - {title_suffix}',
+                      fontsize=14, fontweight='bold', color='white', pad=20)
+
+    fig.tight_layout()
+    return fig
+
+
+def save_figure(fig, filepath, dpi=300, theme=None):
+    """Save an already-built dashboard figure without re-plotting it
+
+    Works for figures embedded in Tk as well as standalone ones; raster
+    output is rendered by Agg either way.
+    """
+    theme = theme or DEFAULT_THEME
+    fig.savefig(filepath, dpi=dpi, bbox_inches='tight', facecolor=theme['bg_color'])
+
+
+def chart_filename(product, taken=None):
+    """File-system safe stem for a product's chart file
+
+    Sanitizing can map different names to one stem ("A/B" and "A_B"). When
+    a `taken` set is given, a stem already in it (compared case-insensitively,
+    as on Windows and macOS file systems) gets a short hash of the product
+    name appended, and the chosen stem is added to the set.
+    """
+    stem = re.sub(r'[^\w\-]+', '_', str(product)).strip('_') or 'product'
+    if taken is None:
+        return stem
+
+    if stem.lower() in taken:
+        digest = hashlib.sha1(str(product).encode('utf-8')).hexdigest()
+        base = stem = f"{stem}_{digest[:8]}"
+        suffix = 2
+        while stem.lower() in taken:
+            stem = f"{base}_{suffix}"
+            suffix += 1
+    taken.add(stem.lower())
+    return stem
+
+
+def _render_chart_file(title, plot_data, filepath, dpi, theme):
+    """Worker entry point: build and save one dashboard image headless"""
+    fig = build_dashboard_figure(plot_data, title, theme)
+    save_figure(fig, filepath, dpi, theme)
+    return filepath
+
+
+def export_chart_pack(sales_data, output_dir, products=None, dpi=150, workers=None,
+                      theme=None, include_overview=True, progress=None):
+    """Write one dashboard image per product, rendered in parallel worker processes
+
+    Products are split once by category code so every worker gets only its
+    own rows. progress, if given, is called as
+    progress(fraction, message). Returns the written file paths.
+    """
+    theme = theme or DEFAULT_THEME
+    os.makedirs(output_dir, exist_ok=True)
+
+    # The overview's stem is reserved so a product can never overwrite it
+    tasks, taken = [], {'all_products'}
+    if include_overview:
+        tasks.append(('All Products', sales_data,
+                      os.path.join(output_dir, 'All_Products.png')))
+    for product, rows in product_slices(sales_data):
+        if products is None or product in products:
+            tasks.append((product, rows,
+                          os.path.join(output_dir, f"{chart_filename(product, taken)}.png")))
+
+    paths = []
+    with tracer.span('export: chart pack', 'export', charts=len(tasks)):
+        if workers == 1:
+            for done, (title, data, path) in enumerate(tasks, 1):
+                paths.append(_render_chart_file(title, data, path, dpi, theme))
+                if progress is not None:
+                    progress(done / len(tasks), f"Rendered {title}")
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_render_chart_file, title, data, path, dpi, theme): title
+                           for title, data, path in tasks}
+                for done, future in enumerate(as_completed(futures), 1):
+                    paths.append(future.result())
+                    if progress is not None:
+                        progress(done / len(tasks), f"Rendered {futures[future]}")
+
+    return paths
@@ -0,0 +1,204 @@
+"""
+🧹 Data Quality Checks for Smart Sales Forecasting AI
+Vectorized validation and repair of raw sales data at load time
+"""
+import numpy as np
+import pandas as pd
+
+from perf_monitor import tracer
+from sales_data import REQUIRED_COLUMNS, SchemaError, datetime_to_day, day_to_datetime
+
+# How days without any record inside a series' date range are filled:
+# 'none' leaves the gap in place (the daily matrix already reads it as zero
+# sales with no records), 'zero' adds a zero-sales row and 'ffill' repeats
+# the series' previous day total
+GAP_FILL_MODES = ('none', 'zero', 'ffill')
+
+# Numeric columns with a known meaning; any other text column is a dimension
+_VALUE_COLUMNS = ('Quantity', 'Price', 'Transactions')
+
+
+# Counters of the individual checks
+_CHECKS = ('bad_dates', 'missing_products', 'bad_sales', 'duplicates', 'negative_sales',
+           'negative_quantity', 'negative_price', 'filled_days')
+
+
+class QualityReport:
+    """What the validation stage found and repaired in one load"""
+
+    def __init__(self, fill='zero'):
+        self.fill = fill
+        self.rows_in = 0
+        self.rows_out = 0
+        self.bad_dates = 0
+        self.missing_products = 0
+        self.bad_sales = 0
+        self.duplicates = 0
+        self.negative_sales = 0
+        self.negative_quantity = 0
+        self.negative_price = 0
+        self.filled_days = 0
+
+    @classmethod
+    def combined(cls, reports, fill='none'):
+        """One report with the summed counts of several (e.g. one per file)"""
+        report = cls(fill)
+        for other in reports:
+            for name in ('rows_in', 'rows_out') + _CHECKS:
+                setattr(report, name, getattr(report, name) + getattr(other, name))
+        return report
+
+    @property
+    def has_issues(self):
+        return any((self.bad_dates, self.missing_products, self.bad_sales, self.duplicates,
+                    self.negative_sales, self.negative_quantity, self.negative_price,
+                    self.filled_days))
+
+    def summary_lines(self):
+        """Human-readable lines for every check that changed the data"""
+        checks = [
+            (self.bad_dates, "row(s) with missing or unparseable dates dropped"),
+            (self.missing_products, "row(s) without a product dropped"),
+            (self.bad_sales, "row(s) with missing or non-numeric Sales dropped"),
+            (self.duplicates, "duplicate row(s) removed"),
+            (self.negative_sales, "negative Sales value(s) set to 0"),
+            (self.negative_quantity, "negative Quantity value(s) set to 0"),
+            (self.negative_price, "negative Price value(s) cleared"),
+            (self.filled_days, f"missing product day(s) filled ({self.fill})"),
+        ]
+        lines = [f"{count:,} {text}" for count, text in checks if count]
+        lines.append(f"{self.rows_in:,} rows in, {self.rows_out:,} rows out")
+        return lines
+
+    def __str__(self):
+        return "\n".join(self.summary_lines())
+
+
+@tracer.traced('load: validate', 'load')
+def repair_sales_data(raw, fill='none', upstream=None):
+    """Validate and repair a raw sales frame before it is made compact
+
+    Returns (frame, report). Rows that cannot be used are dropped, exact
+    duplicates removed, negative values coerced and, unless fill is 'none',
+    every series reindexed onto a continuous daily calendar between its
+    first and last day.
+    upstream is the report of a validation already run on the records raw
+    was aggregated from (see data_sources.read_partial); its counts are
+    included and its row count is reported as rows in.
+    Raises SchemaError when required columns are missing.
+    """
+    if fill not in GAP_FILL_MODES:
+        raise ValueError(f"fill must be one of {', '.join(GAP_FILL_MODES)}")
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in raw.columns]
+    if missing:
+        raise SchemaError(f"Missing required column(s): {', '.join(missing)}")
+
+    report = QualityReport(fill)
+    report.rows_in = len(raw)
+
+    frame = raw.copy()
+    # Times of day are kept until duplicates are removed, so two sales of the
+    # same item on one day are not mistaken for a repeated record
+    frame['Date'] = pd.to_datetime(frame['Date'], errors='coerce')
+    frame['Sales'] = pd.to_numeric(frame['Sales'], errors='coerce')
+
+    bad_dates = frame['Date'].isna().to_numpy()
+    no_product = frame['Product'].isna().to_numpy()
+    bad_sales = ~np.isfinite(frame['Sales'].to_numpy(dtype=np.float64))
+    report.bad_dates = int(bad_dates.sum())
+    report.missing_products = int((no_product & ~bad_dates).sum())
+    report.bad_sales = int((bad_sales & ~bad_dates & ~no_product).sum())
+    frame = frame[~(bad_dates | no_product | bad_sales)]
+
+    # Categorical products make the duplicate check and the gap fill work on codes
+    frame['Product'] = pd.Categorical(frame['Product'].astype(str))
+
+    # One 64-bit hash per row is much cheaper than factorizing every column
+    duplicated = pd.util.hash_pandas_object(frame, index=False).duplicated().to_numpy()
+    report.duplicates = int(duplicated.sum())
+    frame = frame[~duplicated].reset_index(drop=True)
+    frame['Date'] = frame['Date'].dt.normalize()
+
+    negative = frame['Sales'].to_numpy() < 0
+    report.negative_sales = int(negative.sum())
+    frame.loc[negative, 'Sales'] = 0
+
+    if 'Quantity' in frame.columns:
+        quantity = pd.to_numeric(frame['Quantity'], errors='coerce')
+        report.negative_quantity = int((quantity < 0).sum())
+        frame['Quantity'] = quantity.clip(lower=0)
+
+    if 'Price' in frame.columns:
+        price = pd.to_numeric(frame['Price'], errors='coerce')
+        report.negative_price = int((price < 0).sum())
+        frame['Price'] = price.mask(price < 0)
+
+    if fill != 'none' and len(frame):
+        frame = _fill_gaps(frame, fill, report)
+
+    report.rows_out = len(frame)
+    if upstream is not None:
+        total = QualityReport.combined([upstream, report], fill)
+        total.rows_in, total.rows_out = upstream.rows_in, report.rows_out
+        report = total
+    return frame, report
+
+
+def dimension_columns(frame):
+    """Text columns besides the required ones (store, region, ...)"""
+    return [col for col in frame.columns
+            if col not in REQUIRED_COLUMNS + _VALUE_COLUMNS
+            and not pd.api.types.is_numeric_dtype(frame[col])
+            and not pd.api.types.is_datetime64_any_dtype(frame[col])]
+
+
+def _fill_gaps(frame, fill, report):
+    """Append one row per missing day inside each series' date range
+
+    A series is one product within one combination of dimension values, so
+    a gap in one store is filled for that store only. Works on the sorted
+    unique (series, day) keys, so the cost is linear in the data plus the
+    number of filled days. Filled rows copy the series' row from the day
+    before the gap; Quantity and Transactions are 0 and Price is left empty.
+    """
+    keys = ['Product'] + dimension_columns(frame)
+    codes = frame.groupby(keys, sort=False, dropna=False, observed=True).ngroup().to_numpy().astype(np.int64)
+    days = datetime_to_day(frame['Date']).astype(np.int64)
+
+    # Days are offset from the earliest one, so dates before 1970 pack too
+    origin = int(days.min())
+    width = int(days.max()) - origin + 1
+    keys = codes * width + (days - origin)
+    unique_keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    day_totals = np.bincount(inverse, weights=frame['Sales'].to_numpy(dtype=np.float64))
+
+    key_codes = unique_keys // width
+    key_days = unique_keys % width + origin
+    gap = np.diff(key_days) - 1
+    gap[np.diff(key_codes) != 0] = 0
+    starts = np.flatnonzero(gap > 0)
+    if len(starts) == 0:
+        return frame
+
+    lengths = gap[starts]
+    total = int(lengths.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    new_days = np.repeat(key_days[starts], lengths) + 1 + offsets
+
+    # Filled rows are copies of a row of the series on the day before the gap
+    filled = frame.iloc[np.repeat(first[starts], lengths)].copy()
+    filled['Date'] = day_to_datetime(new_days)
+    if fill == 'zero':
+        filled['Sales'] = 0.0
+    else:
+        filled['Sales'] = np.repeat(day_totals[starts], lengths)
+    if 'Quantity' in filled.columns:
+        filled['Quantity'] = 0
+    if 'Transactions' in filled.columns:
+        filled['Transactions'] = 0
+    if 'Price' in filled.columns:
+        filled['Price'] = np.nan
+
+    report.filled_days = total
+    return pd.concat([frame, filled], ignore_index=True)
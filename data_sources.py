@@ -0,0 +1,469 @@
+"""
+🗄️ Data Sources for Smart Sales Forecasting AI
+Interchangeable flat-file and embedded-database loaders
+"""
+import glob
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from data_quality import QualityReport, dimension_columns, repair_sales_data
+from perf_monitor import tracer
+from sales_data import REQUIRED_COLUMNS, SchemaError, datetime_to_day, day_to_datetime
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+FILE_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+DUCKDB_EXTENSIONS = ('.duckdb', '.ddb')
+
+OPTIONAL_COLUMNS = ('Quantity', 'Price')
+
+
+class FileSource:
+    """CSV or Excel file, read whole; slice filters are applied in memory"""
+
+    pushes_down = False
+
+    # Validation already run on the records by the source itself (see
+    # MultiFileSource); None when load() returns them unchecked
+    report = None
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+
+    def dimensions(self):
+        return []
+
+    def dimension_values(self, dimension):
+        return []
+
+    def files(self):
+        return [self.path]
+
+    def load(self, filters=None):
+        """Raw sales records as a DataFrame"""
+        if self.path.lower().endswith('.csv'):
+            return pd.read_csv(self.path)
+        return pd.read_excel(self.path)
+
+
+class MultiFileSource:
+    """Several CSV / Excel files (and every sheet of each workbook) read as one dataset
+
+    Each file or sheet is parsed, validated and pre-aggregated to daily
+    totals in its own worker process (see read_partials), so loading many
+    monthly or per-store exports takes about as long as the slowest one.
+    Files are treated as disjoint parts of the data: duplicates are only
+    removed within a file.
+    """
+
+    pushes_down = False
+    report = None
+
+    def __init__(self, paths, name=None, workers=None):
+        self.paths = list(paths)
+        if not self.paths:
+            raise SchemaError("No CSV or Excel files selected")
+        self.name = name or f"{len(self.paths)} files"
+        self.workers = workers
+
+    def dimensions(self):
+        return []
+
+    def dimension_values(self, dimension):
+        return []
+
+    def files(self):
+        return list(self.paths)
+
+    def tasks(self):
+        """(path, sheet) pairs to read; CSV files have no sheet"""
+        tasks = []
+        for path in self.paths:
+            if path.lower().endswith(EXCEL_EXTENSIONS):
+                tasks.extend((path, sheet) for sheet in sheet_names(path))
+            else:
+                tasks.append((path, None))
+        return tasks
+
+    @tracer.traced('load: files', 'load')
+    def load(self, filters=None, progress=None):
+        """Daily totals of every file and sheet, validated per file"""
+        results = read_partials(self.tasks(), self.workers, progress)
+        self.report = QualityReport.combined([report for _, report in results])
+        return merge_partials([partial for partial, _ in results])
+
+
+class FolderSource:
+    """Drop folder of CSV / Excel files, re-read incrementally as files arrive
+
+    Every file is identified by its (mtime, size) fingerprint; load() only
+    parses files whose fingerprint changed since the last load and reuses
+    the cached daily totals of the others, and records in changed_from the
+    first day any new, changed or removed file covers, so callers can keep
+    what they derived from the days before it. poll() implements the debounce:
+    it reports a batch as ready once the folder has stopped changing for
+    quiet_seconds, so a burst of drops (or a file still being written)
+    leads to a single refresh.
+    """
+
+    pushes_down = False
+    report = None
+
+    def __init__(self, path, quiet_seconds=5.0, workers=None):
+        self.path = path
+        self.name = os.path.basename(os.path.normpath(path))
+        self.quiet_seconds = quiet_seconds
+        self.workers = workers
+        self.frames = {}
+        self.reports = {}
+        self.loaded = {}
+        self.changed_from = None
+        self._seen = {}
+        self._failed = None
+        self._last_change = None
+
+    def dimensions(self):
+        return []
+
+    def dimension_values(self, dimension):
+        return []
+
+    def fingerprints(self):
+        """{file path: (mtime_ns, size)} of the data files in the folder"""
+        prints = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if entry.is_file() and _is_data_file(entry.name):
+                    stat = entry.stat()
+                    prints[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return prints
+
+    def poll(self):
+        """Scan the folder; True when unloaded changes have settled"""
+        current = self.fingerprints()
+        now = time.monotonic()
+        if current != self._seen:
+            self._seen = current
+            self._last_change = now
+        return current != self.loaded and current != self._failed \
+            and now - self._last_change >= self.quiet_seconds
+
+    @tracer.traced('load: folder', 'load')
+    def load(self, filters=None, progress=None):
+        """Daily totals of every file, parsing only new or changed ones"""
+        current = self.fingerprints()
+        changed = [path for path, fingerprint in current.items() if self.loaded.get(path) != fingerprint]
+
+        frames = {path: frame for path, frame in self.frames.items() if path in current}
+        reports = {path: report for path, report in self.reports.items() if path in current}
+        try:
+            results = read_partials([(path, None) for path in changed], self.workers, progress)
+        except Exception:
+            # The same folder state is not retried until something changes
+            self._failed = current
+            raise
+        for path, (frame, report) in zip(changed, results):
+            frames[path], reports[path] = frame, report
+
+        if not frames:
+            raise SchemaError(f"No CSV or Excel files in {self.name}")
+
+        touched = [self.frames[path] for path in self.frames if path not in current or path in changed]
+        touched += [frames[path] for path in changed]
+        first_dates = [pd.to_datetime(frame['Date'], errors='coerce').min() for frame in touched]
+        first_dates = [date for date in first_dates if pd.notna(date)]
+
+        # Swap the cache in whole so a failed read leaves the previous state intact
+        self.changed_from = int(datetime_to_day([min(first_dates)])[0]) if first_dates else None
+        self.frames = frames
+        self.reports = reports
+        self.loaded = current
+        self.report = QualityReport.combined([reports[path] for path in sorted(reports)])
+        return merge_partials([frames[path] for path in sorted(frames)])
+
+
+class SQLSource:
+    """Sales table in a SQLite or DuckDB file, aggregated inside the engine
+
+    Only daily per-product totals are returned; the slice filters and date
+    range become a WHERE clause, so raw rows never reach pandas. Extra text
+    columns (store, region, ...) are offered as dimensions to filter on.
+    Dates may be ISO text / DATE / TIMESTAMP columns or integer Unix
+    timestamps in seconds.
+    """
+
+    pushes_down = True
+    report = None
+
+    def __init__(self, path, table=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.engine = 'duckdb' if path.lower().endswith(DUCKDB_EXTENSIONS) else 'sqlite'
+        if self.engine == 'duckdb' and duckdb is None:
+            raise ImportError("Reading DuckDB files requires the duckdb package")
+
+        self.table, self.columns, self._dimensions, self.epoch_dates = self._inspect(table)
+
+    def _connect(self):
+        if self.engine == 'duckdb':
+            return duckdb.connect(self.path, read_only=True)
+        return sqlite3.connect(self.path)
+
+    def _query(self, sql, params=()):
+        # A short-lived connection per query keeps the source usable from
+        # background threads (SQLite connections are bound to their thread)
+        with closing(self._connect()) as conn:
+            if self.engine == 'duckdb':
+                return conn.execute(sql, list(params)).df()
+            return pd.read_sql_query(sql, conn, params=list(params))
+
+    def _table_columns(self):
+        """{table: [(column, declared type), ...]} for every table and view"""
+        if self.engine == 'duckdb':
+            info = self._query("SELECT table_name, column_name, data_type "
+                               "FROM information_schema.columns ORDER BY table_name, ordinal_position")
+            return {table: list(zip(rows['column_name'], rows['data_type']))
+                    for table, rows in info.groupby('table_name', sort=False)}
+
+        names = self._query("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")['name']
+        tables = {}
+        for name in names:
+            info = self._query(f"PRAGMA table_info({_quote(name)})")
+            tables[name] = list(zip(info['name'], info['type']))
+        return tables
+
+    def _inspect(self, table):
+        """Pick the sales table and map the canonical column names onto it"""
+        tables = self._table_columns()
+        candidates = [table] if table else list(tables)
+
+        for name in candidates:
+            if name not in tables:
+                raise SchemaError(f"Table '{name}' not found in {self.name}")
+            by_lower = {col.lower(): col for col, _ in tables[name]}
+            if all(col.lower() in by_lower for col in REQUIRED_COLUMNS):
+                columns = {col: by_lower[col.lower()]
+                           for col in REQUIRED_COLUMNS + OPTIONAL_COLUMNS if col.lower() in by_lower}
+                used = {c.lower() for c in columns.values()}
+                dimensions = [col for col, kind in tables[name]
+                              if col.lower() not in used and _is_text(kind)]
+                date_kind = dict(tables[name])[columns['Date']]
+                return name, columns, dimensions, 'INT' in str(date_kind).upper()
+
+        raise SchemaError(f"No table in {self.name} has the columns {', '.join(REQUIRED_COLUMNS)}")
+
+    def dimensions(self):
+        return list(self._dimensions)
+
+    def dimension_values(self, dimension):
+        col = _quote(dimension)
+        values = self._query(f"SELECT DISTINCT {col} AS value FROM {_quote(self.table)} "
+                             f"WHERE {col} IS NOT NULL ORDER BY 1")
+        return values['value'].astype(str).tolist()
+
+    def aggregate_sql(self, filters=None, day_range=None):
+        """The daily per-product aggregate query and its parameters
+
+        day_range is an inclusive (first, last) pair of day numbers.
+        """
+        col = {name: _quote(actual) for name, actual in self.columns.items()}
+        if self.engine == 'duckdb':
+            source = f"to_timestamp({col['Date']})" if self.epoch_dates else col['Date']
+            day = f"CAST({source} AS DATE)"
+        else:
+            day = f"DATE({col['Date']}, 'unixepoch')" if self.epoch_dates else f"DATE({col['Date']})"
+
+        select = [f"{day} AS \"Date\"",
+                  f"{col['Product']} AS \"Product\"",
+                  f"SUM({col['Sales']}) AS \"Sales\""]
+        if 'Quantity' in col:
+            select.append(f"SUM({col['Quantity']}) AS \"Quantity\"")
+        if 'Price' in col and 'Quantity' in col:
+            # Quantity-weighted average price of the day; the cast keeps
+            # SQLite from doing integer division on INTEGER columns
+            select.append(f"CAST(SUM({col['Price']} * {col['Quantity']}) AS REAL) / "
+                          f"NULLIF(SUM(CASE WHEN {col['Price']} IS NOT NULL "
+                          f"THEN {col['Quantity']} END), 0) AS \"Price\"")
+        elif 'Price' in col:
+            select.append(f"AVG({col['Price']}) AS \"Price\"")
+        select.append("COUNT(*) AS \"Transactions\"")
+
+        where, params = [], []
+        for dimension, value in (filters or {}).items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            where.append(f"{_quote(dimension)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if day_range is not None:
+            placeholder = "CAST(? AS DATE)" if self.engine == 'duckdb' else "?"
+            where.append(f"{day} BETWEEN {placeholder} AND {placeholder}")
+            params.extend(day_to_datetime(day_range).strftime('%Y-%m-%d'))
+
+        sql = f"SELECT {', '.join(select)} FROM {_quote(self.table)}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " GROUP BY 1, 2 ORDER BY 1"
+        return sql, params
+
+    @tracer.traced('load: sql aggregate', 'load')
+    def load(self, filters=None, day_range=None):
+        """Daily per-product totals for the rows matching the filters and date range"""
+        sql, params = self.aggregate_sql(filters, day_range)
+        return self._query(sql, params)
+
+
+def _is_data_file(name):
+    return name.lower().endswith(FILE_EXTENSIONS) and not name.startswith(('~$', '.'))
+
+
+def expand_paths(pattern):
+    """Data files named by a path: every file in a directory, the matches
+    of a glob pattern, or the file itself"""
+    if os.path.isdir(pattern):
+        return sorted(entry.path for entry in os.scandir(pattern)
+                      if entry.is_file() and _is_data_file(entry.name))
+    if glob.has_magic(pattern):
+        return sorted(path for path in glob.glob(pattern)
+                      if os.path.isfile(path) and _is_data_file(os.path.basename(path)))
+    return [pattern]
+
+
+def sheet_names(path):
+    with pd.ExcelFile(path) as book:
+        return book.sheet_names
+
+
+def read_partial(path, sheet=None):
+    """Validate one file (or one sheet) and pre-aggregate it to daily totals
+
+    Runs in a worker process. Without a sheet, every sheet of a workbook is
+    read. Gaps are not filled here; that needs the whole dataset. Returns
+    (daily totals, QualityReport).
+    """
+    label = os.path.basename(path) + (f" [{sheet}]" if sheet is not None else "")
+    if not path.lower().endswith(EXCEL_EXTENSIONS):
+        raw = pd.read_csv(path)
+    elif sheet is None:
+        raw = pd.concat(pd.read_excel(path, sheet_name=None).values(), ignore_index=True)
+    else:
+        raw = pd.read_excel(path, sheet_name=sheet)
+
+    try:
+        frame, report = repair_sales_data(raw, fill='none')
+    except SchemaError as e:
+        raise SchemaError(f"{label}: {e}") from None
+    return daily_totals(frame), report
+
+
+def daily_totals(frame):
+    """One row per day, product and text dimension, in a mergeable form
+
+    Sales, Quantity and Transactions are sums. Price is carried as its
+    quantity-weighted sum and weight (_PriceSum / _PriceWeight) so partials
+    can be summed again by merge_partials before the average is taken.
+    Other numeric columns are dropped, as for database sources.
+    """
+    keys = ['Date', 'Product'] + dimension_columns(frame)
+    sums = pd.DataFrame({col: frame[col] for col in keys})
+    sums['Product'] = sums['Product'].astype(str)
+    sums['Sales'] = frame['Sales'].to_numpy(dtype=np.float64)
+    if 'Quantity' in frame.columns:
+        sums['Quantity'] = frame['Quantity'].fillna(0).to_numpy(dtype=np.float64)
+    if 'Price' in frame.columns:
+        price = frame['Price'].to_numpy(dtype=np.float64)
+        weight = sums['Quantity'].to_numpy() if 'Quantity' in sums else np.ones(len(frame))
+        weight = np.where(np.isnan(price), 0.0, weight)
+        sums['_PriceSum'] = np.nan_to_num(price) * weight
+        sums['_PriceWeight'] = weight
+    sums['Transactions'] = (frame['Transactions'].to_numpy() if 'Transactions' in frame.columns
+                            else np.ones(len(frame), dtype=np.int64))
+    return _sum_by(sums, keys)
+
+
+def merge_partials(partials):
+    """Combine daily_totals of several files into one daily aggregate frame"""
+    partials = [partial for partial in partials if len(partial)]
+    if not partials:
+        raise SchemaError("Sales data is empty")
+
+    with tracer.span('load: merge partials', 'load', parts=len(partials)):
+        merged = pd.concat(partials, ignore_index=True)
+        keys = [col for col in merged.columns
+                if col not in ('Sales', 'Quantity', 'Transactions', '_PriceSum', '_PriceWeight')]
+        # Rows of different files share a key when the files overlap in time
+        if len(partials) > 1:
+            merged = _sum_by(merged, keys)
+
+        if '_PriceSum' in merged.columns:
+            weight = merged.pop('_PriceWeight').to_numpy()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                merged['Price'] = np.where(weight > 0, merged.pop('_PriceSum').to_numpy() / weight, np.nan)
+        return merged
+
+
+def _sum_by(frame, keys):
+    # dropna=False keeps rows whose dimension value is blank
+    return frame.groupby(keys, sort=False, dropna=False, observed=True).sum().reset_index()
+
+
+def read_partials(tasks, workers=None, progress=None):
+    """read_partial of every (path, sheet) task, in a process pool
+
+    Results come back in task order. workers=1 reads in this process, as
+    does a single task, where a pool would only add start-up time.
+    progress, if given, is called as progress(fraction, message).
+    """
+    results = [None] * len(tasks)
+    with tracer.span('load: read files', 'load', files=len(tasks)):
+        if workers == 1 or len(tasks) <= 1:
+            for done, (path, sheet) in enumerate(tasks, 1):
+                results[done - 1] = read_partial(path, sheet)
+                if progress is not None:
+                    progress(done / len(tasks), f"Read {os.path.basename(path)}")
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(read_partial, path, sheet): i for i, (path, sheet) in enumerate(tasks)}
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    results[i] = future.result()
+                    if progress is not None:
+                        progress(done / len(tasks), f"Read {os.path.basename(tasks[i][0])}")
+    return results
+
+
+def _quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _is_text(declared_type):
+    kind = str(declared_type).upper()
+    return kind == '' or any(word in kind for word in ('CHAR', 'TEXT', 'CLOB', 'STRING'))
+
+
+def open_source(path, table=None):
+    """Pick the data source for a path
+
+    A list of files, a directory, a glob pattern or a workbook with several
+    sheets is read by a MultiFileSource; single files go by extension.
+    """
+    if isinstance(path, (list, tuple)):
+        return MultiFileSource(path) if len(path) != 1 else open_source(path[0], table)
+    if os.path.isdir(path) or glob.has_magic(path):
+        name = os.path.basename(os.path.normpath(path))
+        return MultiFileSource(expand_paths(path), name=name)
+    if path.lower().endswith(SQLITE_EXTENSIONS + DUCKDB_EXTENSIONS):
+        return SQLSource(path, table)
+    if path.lower().endswith(EXCEL_EXTENSIONS) and len(sheet_names(path)) > 1:
+        return MultiFileSource([path], name=os.path.basename(path))
+    return FileSource(path)
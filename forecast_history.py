@@ -0,0 +1,271 @@
+"""
+📜 Forecast History for Smart Sales Forecasting AI
+Append-only columnar log of past forecasts and their realized accuracy
+"""
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from aggregate_store import STORE_DIR
+from perf_monitor import tracer
+
+# Beside the aggregate store, outside it so store eviction never touches it
+HISTORY_DIR = os.path.join(os.path.dirname(STORE_DIR), '.forecast_history')
+
+# Half-width of the stored prediction interval in RMSEs (~95%)
+INTERVAL_Z = 1.96
+
+COLUMNS = ('product', 'segment', 'model', 'origin_day', 'target_day', 'predicted', 'lower', 'upper')
+_DICTIONARY_COLUMNS = ('product', 'segment', 'model')
+
+
+class ForecastLog:
+    """Forecast records of many runs as dictionary-encoded column arrays
+
+    product/segment/model/run hold codes into the matching label arrays;
+    origin_day is the last day the model was trained on and target_day the
+    day being predicted, both as day numbers.
+    """
+
+    def __init__(self, columns, dictionaries, run_ids, run):
+        self.columns = columns
+        self.dictionaries = dictionaries
+        self.run_ids = run_ids
+        self.run = run
+
+    def __len__(self):
+        return len(self.run)
+
+    @property
+    def horizon(self):
+        return self.columns['target_day'] - self.columns['origin_day']
+
+    def frame(self):
+        """Decoded records as a DataFrame"""
+        table = {'Run': self.run_ids[self.run]}
+        for name in COLUMNS:
+            values = self.columns[name]
+            if name in self.dictionaries:
+                values = self.dictionaries[name][values]
+            table[name] = values
+        return pd.DataFrame(table)
+
+
+class ForecastHistory:
+    """Forecast runs on disk as immutable .npz files, one directory per run date
+
+    Each run is first saved as its own file (root/2024-05-31/<run id>.npz);
+    once its day is over, compact() folds that day's run files into a
+    single file covering all its runs and products, so the file count grows
+    with the number of days, not runs. Date-bounded queries only open the
+    partitions they need.
+    """
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+
+    def append(self, records, run_time=None):
+        """Save one run; records maps every name in COLUMNS to an array-like
+
+        Earlier days' partitions are compacted on the way. Returns the new
+        run id.
+        """
+        run_time = run_time or datetime.now()
+        run_id = f"{run_time:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        partition = os.path.join(self.root, f"{run_time:%Y-%m-%d}")
+        os.makedirs(partition, exist_ok=True)
+
+        n_records = len(records['origin_day'])
+        arrays = {'run_ids': np.array([run_id]), 'run': np.zeros(n_records, dtype=np.int32)}
+        for name in _DICTIONARY_COLUMNS:
+            labels, codes = np.unique(np.asarray(records[name], dtype=str), return_inverse=True)
+            arrays[name] = labels
+            arrays[name + '_code'] = codes.astype(np.int32)
+        for name in ('origin_day', 'target_day'):
+            arrays[name] = np.asarray(records[name], dtype=np.int32)
+        for name in ('predicted', 'lower', 'upper'):
+            arrays[name] = np.asarray(records[name], dtype=np.float32)
+
+        _write(os.path.join(partition, run_id + '.npz'), arrays)
+        self.compact(before=run_time)
+        return run_id
+
+    def _partitions(self, first='', last='9999'):
+        """(date, folder, run files) of the partitions dated within [first, last]"""
+        if not os.path.isdir(self.root):
+            return
+        for partition in sorted(os.listdir(self.root)):
+            folder = os.path.join(self.root, partition)
+            if first <= partition <= last and os.path.isdir(folder):
+                yield partition, folder, [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+                                          if name.endswith('.npz')]
+
+    def run_files(self, since=None, until=None):
+        """Run files whose run date lies in [since, until] (datetime-likes or None)"""
+        first = pd.Timestamp(since).strftime('%Y-%m-%d') if since is not None else ''
+        last = pd.Timestamp(until).strftime('%Y-%m-%d') if until is not None else '9999'
+        return [path for _, _, files in self._partitions(first, last) for path in files]
+
+    @tracer.traced('history: compact', 'load')
+    def compact(self, before=None):
+        """Fold each partition dated before `before` (default: today) into one file
+
+        The merged <date>.npz replaces the partition's run files; runs
+        already in it are not duplicated, so a compaction interrupted
+        between writing and deleting is completed by the next one.
+        """
+        cutoff = pd.Timestamp(before if before is not None else datetime.now()).strftime('%Y-%m-%d')
+        for partition, folder, files in self._partitions():
+            if partition >= cutoff or len(files) < 2:
+                continue
+            columns, dictionaries, run_ids, run = _concat_runs([_read(path) for path in files])
+
+            # Leftovers of an interrupted compaction appear twice; keep the first copy
+            first = np.sort(np.unique(run_ids, return_index=True)[1])
+            keep_run = np.full(len(run_ids), -1, dtype=np.int32)
+            keep_run[first] = np.arange(len(first), dtype=np.int32)
+            kept = keep_run[run] >= 0
+            arrays = {'run_ids': run_ids[first], 'run': keep_run[run][kept]}
+            for name in COLUMNS:
+                if name in dictionaries:
+                    arrays[name] = dictionaries[name]
+                    arrays[name + '_code'] = columns[name][kept]
+                else:
+                    arrays[name] = columns[name][kept]
+
+            merged = os.path.join(folder, partition + '.npz')
+            _write(merged, arrays)
+            for path in files:
+                if path != merged:
+                    os.remove(path)
+
+    @tracer.traced('history: load', 'load')
+    def load(self, since=None, until=None):
+        """All records of the runs in a date range as one ForecastLog"""
+        columns, dictionaries, run_ids, run = _concat_runs(
+            [_read(path) for path in self.run_files(since, until)])
+        return ForecastLog(columns, dictionaries, run_ids, run)
+
+    @tracer.traced('history: accuracy', 'model')
+    def accuracy(self, actuals, segment='', since=None, until=None):
+        """Realized accuracy by model and horizon against a DailyMatrix of actuals
+
+        Only records of the given segment (the dimension filters the runs
+        were made under) whose target day has data in actuals are scored;
+        'All Products' records are joined with the matrix column totals.
+        Runs are scored one file at a time and only their per-group sums
+        are kept, so memory does not grow with the length of the history.
+        Returns a DataFrame with Model, Horizon, Forecasts, MAE, MAPE % and
+        the share of actuals inside the stored interval.
+        """
+        partials = []
+        for path in self.run_files(since, until):
+            with np.load(path) as run:
+                scores = _score_run(run, actuals, segment)
+            if scores is not None:
+                partials.append(scores)
+
+        if not partials:
+            return pd.DataFrame(columns=['Model', 'Horizon', 'Forecasts', 'MAE', 'MAPE %', 'Coverage %'])
+
+        sums = pd.concat(partials).groupby(['Model', 'Horizon']).sum().reset_index()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'Model': sums['Model'],
+                'Horizon': sums['Horizon'],
+                'Forecasts': sums['n'],
+                'MAE': sums['abs_error'] / sums['n'],
+                'MAPE %': np.where(sums['n_pct'] > 0, sums['ape'] / sums['n_pct'] * 100, np.nan),
+                'Coverage %': sums['inside'] / sums['n'] * 100,
+            })
+
+
+def _write(path, arrays):
+    """Save arrays under a temporary name first so readers never see half a file"""
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(path + '.tmp', path)
+
+
+def _read(path):
+    """The arrays of one history file; single-run files of the first layout get run codes"""
+    with np.load(path) as run:
+        arrays = {name: run[name] for name in run.files}
+    if 'run_id' in arrays:
+        arrays['run_ids'] = arrays.pop('run_id').reshape(1)
+        arrays['run'] = np.zeros(len(arrays['origin_day']), dtype=np.int32)
+    return arrays
+
+
+def _concat_runs(parts):
+    """Concatenate history files into global columns, dictionaries, run ids and run codes"""
+    # Every file has its own small label dictionaries; merge them into
+    # global ones and remap each file's codes with one take
+    dictionaries, columns = {}, {}
+    for name in _DICTIONARY_COLUMNS:
+        local = [part[name] for part in parts]
+        labels, inverse = np.unique(np.concatenate(local) if local else np.empty(0, dtype=str),
+                                    return_inverse=True)
+        offsets = np.cumsum([0] + [len(labels_) for labels_ in local])
+        dictionaries[name] = labels
+        columns[name] = np.concatenate(
+            [inverse[offsets[i]:offsets[i + 1]][part[name + '_code']] for i, part in enumerate(parts)]
+        ).astype(np.int32) if parts else np.empty(0, dtype=np.int32)
+
+    for name, dtype in (('origin_day', np.int32), ('target_day', np.int32), ('predicted', np.float32),
+                        ('lower', np.float32), ('upper', np.float32)):
+        columns[name] = np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype)
+
+    run_offsets = np.cumsum([0] + [len(part['run_ids']) for part in parts])
+    run_ids = np.concatenate([part['run_ids'].astype(str) for part in parts]) if parts \
+        else np.empty(0, dtype=str)
+    run = np.concatenate([part['run'] + run_offsets[i] for i, part in enumerate(parts)]).astype(np.int32) \
+        if parts else np.empty(0, dtype=np.int32)
+    return columns, dictionaries, run_ids, run
+
+
+def _score_run(run, actuals, segment):
+    """Per (model, horizon) error sums of one run file joined with the actuals"""
+    # Join key: product dictionary -> matrix row, one past the last product
+    # standing for the totals
+    products = pd.Index(actuals.products)
+    lookup = products.get_indexer(run['product'])
+    lookup[run['product'] == 'All Products'] = len(products)
+    rows = lookup[run['product_code']]
+    days = run['target_day'].astype(np.int64) - actuals.start_day
+
+    scored = (run['segment'] == segment)[run['segment_code']] & (rows >= 0) & \
+        (days >= 0) & (days < actuals.n_days)
+    actual, counts = actuals.lookup(rows[scored], days[scored])
+    scored[scored] = counts > 0
+    actual = actual[counts > 0]
+    predicted = run['predicted'][scored].astype(np.float64)
+    abs_error = np.abs(predicted - actual)
+    nonzero = actual != 0
+    inside = (actual >= run['lower'][scored]) & (actual <= run['upper'][scored])
+
+    model = run['model_code'][scored].astype(np.int64)
+    horizon = (run['target_day'] - run['origin_day'])[scored].astype(np.int64)
+    if not len(model):
+        return None
+
+    # One bincount per statistic over the (model, horizon) group key
+    h_min = int(horizon.min())
+    n_h = int(horizon.max()) - h_min + 1
+    key = model * n_h + (horizon - h_min)
+    size = len(run['model']) * n_h
+    n = np.bincount(key, minlength=size)
+    present = np.flatnonzero(n)
+    return pd.DataFrame({
+        'Model': run['model'][present // n_h],
+        'Horizon': present % n_h + h_min,
+        'n': n[present],
+        'abs_error': np.bincount(key, weights=abs_error, minlength=size)[present],
+        'n_pct': np.bincount(key[nonzero], minlength=size)[present],
+        'ape': np.bincount(key[nonzero], weights=abs_error[nonzero] / np.abs(actual[nonzero]),
+                           minlength=size)[present],
+        'inside': np.bincount(key, weights=inside, minlength=size)[present],
+    })
@@ -0,0 +1,172 @@
+"""
+🧮 Intermittent Demand for Smart Sales Forecasting AI
+Demand-pattern classification and Croston-type forecasts over sparse series
+"""
+import numpy as np
+import pandas as pd
+
+from perf_monitor import tracer
+
+# Syntetos-Boylan cut-offs on the average demand interval (ADI) and the
+# squared coefficient of variation of the non-zero demand sizes (CV²)
+ADI_CUTOFF = 1.32
+CV2_CUTOFF = 0.49
+DEMAND_CLASSES = ('smooth', 'erratic', 'intermittent', 'lumpy', 'no demand')
+
+# Smoothing constants for demand size / interval (alpha) and TSB's demand probability (beta)
+ALPHA = 0.1
+BETA = 0.1
+
+# Fewest demand days an intermittent series needs before it is forecast
+MIN_DEMANDS = 3
+
+INTERMITTENT_MODELS = ('Croston', 'SBA', 'TSB')
+
+# The Croston-type model used for each class when routing automatically
+ROUTED_MODEL = {'intermittent': 'SBA', 'lumpy': 'TSB'}
+
+
+class DemandClassification:
+    """ADI / CV² demand pattern of every series in a SparseDaily"""
+
+    def __init__(self, labels, adi, cv2, n_demands, classes):
+        self.labels = labels
+        self.adi = adi
+        self.cv2 = cv2
+        self.n_demands = n_demands
+        self.classes = classes
+
+    def class_of(self, product):
+        return DEMAND_CLASSES[self.classes[self.labels.get_loc(product)]]
+
+    def is_sparse(self):
+        """Mask of series that are intermittent or lumpy"""
+        return self.adi >= ADI_CUTOFF
+
+    def counts(self):
+        """Number of series per demand class"""
+        counts = np.bincount(self.classes, minlength=len(DEMAND_CLASSES))
+        return pd.Series(counts, index=DEMAND_CLASSES)
+
+    def frame(self):
+        return pd.DataFrame({'ADI': self.adi, 'CV²': self.cv2, 'Demand Days': self.n_demands,
+                             'Class': np.array(DEMAND_CLASSES)[self.classes]},
+                            index=pd.Index(self.labels, name='Product'))
+
+
+def _row_ids(sparse):
+    return np.repeat(np.arange(len(sparse.products)), sparse.nnz)
+
+
+def _span(sparse):
+    """Days from each series' first demand to the end of the calendar"""
+    has_demand = sparse.nnz > 0
+    first = np.full(len(sparse.products), sparse.n_days)
+    first[has_demand] = sparse.days[sparse.indptr[:-1][has_demand]]
+    return sparse.n_days - first
+
+
+@tracer.traced('model: classify demand', 'model')
+def classify_demand(sparse):
+    """Classify every series as smooth, erratic, intermittent or lumpy
+
+    ADI is the series' span (first demand to the end of the calendar)
+    divided by its number of demand days; CV² is computed over the demand
+    sizes only. Everything is one bincount pass over the CSR arrays.
+    """
+    n = len(sparse.products)
+    nnz = sparse.nnz
+    rows = _row_ids(sparse)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        adi = np.where(nnz > 0, _span(sparse) / nnz, np.inf)
+        mean = np.bincount(rows, weights=sparse.values, minlength=n) / nnz
+        var = np.bincount(rows, weights=sparse.values ** 2, minlength=n) / nnz - mean ** 2
+        cv2 = np.where(nnz > 1, np.maximum(var, 0) / mean ** 2, 0.0)
+
+    classes = (adi >= ADI_CUTOFF).astype(np.int8) * 2 + (cv2 >= CV2_CUTOFF)
+    classes[nnz == 0] = DEMAND_CLASSES.index('no demand')
+    return DemandClassification(sparse.products, adi, cv2, nnz, classes)
+
+
+def _by_events(sparse):
+    """Rows ordered by decreasing demand count, so the rows still active at
+    the k-th demand are always a prefix of that order"""
+    nnz = sparse.nnz
+    order = np.argsort(-nnz, kind='stable')
+    counts = nnz[order]
+    active = np.searchsorted(-counts, -np.arange(int(counts[0]) if len(counts) else 0), side='left')
+    return order, sparse.indptr[:-1][order], counts, active
+
+
+@tracer.traced('model: croston', 'model')
+def croston_rates(sparse, variant='Croston', alpha=ALPHA, beta=BETA):
+    """Per-series daily demand rate from Croston, SBA or TSB
+
+    Croston smooths the demand sizes z and the intervals p between demands
+    and forecasts z / p; SBA removes Croston's bias with a (1 - alpha / 2)
+    factor. TSB smooths a demand probability instead of the interval, which
+    also decays on every day without demand, and forecasts probability x
+    size, so it adapts when a product stops selling. All series are updated
+    together: the loop runs over the k-th demand of every series, not over
+    calendar days or series, so zero days are never touched.
+    """
+    if variant not in INTERMITTENT_MODELS:
+        raise ValueError(f"variant must be one of {', '.join(INTERMITTENT_MODELS)}")
+
+    n = len(sparse.products)
+    order, starts, counts, active = _by_events(sparse)
+    rates = np.zeros(n)
+    m = int(active[0]) if len(active) else 0
+    if m == 0:
+        return rates
+
+    # Initialize every series at its first demand
+    first = starts[:m]
+    size = sparse.values[first].copy()
+    previous = sparse.days[first].astype(np.float64)
+    span = _span(sparse)[order[:m]]
+    if variant == 'TSB':
+        level = counts[:m] / span
+    else:
+        level = span / counts[:m]
+
+    for k in range(1, len(active)):
+        m = int(active[k])
+        at = starts[:m] + k
+        demand = sparse.values[at]
+        day = sparse.days[at].astype(np.float64)
+
+        size[:m] += alpha * (demand - size[:m])
+        if variant == 'TSB':
+            # Probability decays over the zero days of the gap, then moves
+            # towards 1 on the demand day
+            level[:m] *= (1 - beta) ** (day - previous[:m] - 1)
+            level[:m] += beta * (1 - level[:m])
+        else:
+            level[:m] += alpha * (day - previous[:m] - level[:m])
+        previous[:m] = day
+
+    m = int(active[0])
+    if variant == 'TSB':
+        tail = sparse.n_days - previous - 1
+        rates[order[:m]] = size * level * (1 - beta) ** tail
+    else:
+        factor = 1 - alpha / 2 if variant == 'SBA' else 1.0
+        rates[order[:m]] = factor * size / level
+    return rates
+
+
+def routed_rates(sparse, classification):
+    """Daily rate of every intermittent / lumpy series from its routed model
+
+    Returns (rates, model names); smooth and erratic series get NaN and an
+    empty name, as they are left to the regular forecasting models.
+    """
+    rates = np.full(len(sparse.products), np.nan)
+    models = np.full(len(sparse.products), '', dtype=object)
+    for demand_class, model in ROUTED_MODEL.items():
+        rows = classification.classes == DEMAND_CLASSES.index(demand_class)
+        if rows.any():
+            rates[rows] = croston_rates(sparse, model)[rows]
+            models[rows] = model
+    return rates, models
@@ -0,0 +1,129 @@
+"""
+📦 Inventory Simulation for Smart Sales Forecasting AI
+Monte Carlo evaluation of reorder-point / order-up-to policies
+"""
+import numpy as np
+import pandas as pd
+
+from perf_monitor import tracer
+
+# Default policy settings: supplier lead time and review cycle in days,
+# target cycle service level and number of simulated demand paths
+LEAD_TIME_DAYS = 7
+REVIEW_DAYS = 14
+SERVICE_LEVEL_Z = 1.65  # ~95% cycle service level
+N_PATHS = 2000
+
+
+def reorder_policy(mean_daily, std_daily, lead_time=LEAD_TIME_DAYS, review_days=REVIEW_DAYS,
+                   z=SERVICE_LEVEL_Z):
+    """(reorder point, order-up-to level) per product from daily demand statistics
+
+    The reorder point covers the expected lead-time demand plus z standard
+    deviations of safety stock; the order-up-to level adds one review cycle.
+    """
+    mean_daily = np.asarray(mean_daily, dtype=np.float64)
+    std_daily = np.asarray(std_daily, dtype=np.float64)
+    reorder_point = mean_daily * lead_time + z * std_daily * np.sqrt(lead_time)
+    return reorder_point, reorder_point + mean_daily * review_days
+
+
+class InventoryResult:
+    """Per-product outcome of an inventory simulation"""
+
+    def __init__(self, labels, reorder_point, order_up_to, stockout_probability,
+                 stockout_days, fill_rate, avg_on_hand, orders, n_paths, horizon):
+        self.labels = labels
+        self.reorder_point = reorder_point
+        self.order_up_to = order_up_to
+        self.stockout_probability = stockout_probability
+        self.stockout_days = stockout_days
+        self.fill_rate = fill_rate
+        self.avg_on_hand = avg_on_hand
+        self.orders = orders
+        self.n_paths = n_paths
+        self.horizon = horizon
+
+    def frame(self):
+        """Results table, riskiest products first"""
+        table = pd.DataFrame({
+            'Reorder Point': self.reorder_point,
+            'Order Up To': self.order_up_to,
+            'Stockout %': self.stockout_probability * 100,
+            'Stockout Days': self.stockout_days,
+            'Fill Rate %': self.fill_rate * 100,
+            'Avg On Hand': self.avg_on_hand,
+            'Orders': self.orders,
+        }, index=pd.Index(self.labels, name='Product'))
+        return table.sort_values(['Stockout %', 'Fill Rate %'], ascending=[False, True])
+
+
+@tracer.traced('inventory: simulate', 'model')
+def simulate_inventory(labels, demand_mean, residuals, reorder_point, order_up_to,
+                       lead_time=LEAD_TIME_DAYS, n_paths=N_PATHS, initial_stock=None, seed=None,
+                       progress=None):
+    """Simulate an (s, S) policy for every product over many demand paths at once
+
+    demand_mean is a products x days array of forecast demand and residuals
+    a products x samples pool of forecast errors; each path draws its daily
+    errors from its product's pool (bootstrap). Unmet demand is lost.
+    Orders placed at the end of day t arrive at the start of day t +
+    lead_time. The state of all products x paths advances one day per
+    step, so the only Python loop is over the horizon. progress is called
+    as progress(fraction, message) while the simulation runs.
+    """
+    if lead_time < 1:
+        raise ValueError("lead_time must be at least one day")
+
+    rng = np.random.default_rng(seed)
+    demand_mean = np.asarray(demand_mean, dtype=np.float32)
+    pool = np.nan_to_num(np.asarray(residuals, dtype=np.float32))
+    n_products, horizon = demand_mean.shape
+    n_samples = pool.shape[1]
+
+    s = np.asarray(reorder_point, dtype=np.float32)[:, None]
+    S = np.asarray(order_up_to, dtype=np.float32)[:, None]
+    start = S if initial_stock is None else np.asarray(initial_stock, dtype=np.float32)[:, None]
+
+    on_hand = np.repeat(start, n_paths, axis=1)
+    position = on_hand.copy()
+    pipeline = np.zeros((lead_time + 1, n_products, n_paths), dtype=np.float32)
+    rows = np.arange(n_products)[:, None]
+
+    demand_total = np.zeros(n_products)
+    sold_total = np.zeros(n_products)
+    on_hand_total = np.zeros(n_products)
+    stockout_days = np.zeros(n_products)
+    orders = np.zeros(n_products)
+    stocked_out = np.zeros((n_products, n_paths), dtype=bool)
+
+    for day in range(horizon):
+        if progress is not None and day % 10 == 0:
+            progress(day / horizon, f"Day {day + 1:,} of {horizon:,}")
+
+        slot = day % (lead_time + 1)
+        on_hand += pipeline[slot]
+        pipeline[slot] = 0
+
+        draws = pool[rows, rng.integers(0, n_samples, size=(n_products, n_paths))]
+        demand = np.maximum(demand_mean[:, day:day + 1] + draws, 0)
+        sold = np.minimum(on_hand, demand)
+        short = demand > sold
+
+        on_hand -= sold
+        position -= sold
+        order = np.where(position <= s, S - position, 0)
+        pipeline[(day + lead_time) % (lead_time + 1)] += order
+        position += order
+
+        demand_total += demand.sum(axis=1)
+        sold_total += sold.sum(axis=1)
+        on_hand_total += on_hand.sum(axis=1)
+        stockout_days += short.sum(axis=1)
+        orders += (order > 0).sum(axis=1)
+        stocked_out |= short
+
+    fill_rate = np.divide(sold_total, demand_total, out=np.ones(n_products), where=demand_total > 0)
+    return InventoryResult(list(labels), s[:, 0], S[:, 0], stocked_out.mean(axis=1),
+                           stockout_days / n_paths, fill_rate, on_hand_total / (n_paths * horizon),
+                           orders / n_paths, n_paths, horizon)
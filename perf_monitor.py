@@ -0,0 +1,265 @@
+"""
+⏱️ Performance Monitor for Smart Sales Forecasting AI
+Low-overhead timing spans with Chrome-trace export and an opt-in
+cProfile / tracemalloc profiling mode
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+
+class PerfTracer:
+    """Collect structured timing spans in a bounded in-memory buffer"""
+
+    def __init__(self, max_spans=20000):
+        # Each span is stored as a plain tuple to keep recording cheap:
+        # (name, category, start_ns, duration_ns, thread_id, depth, args)
+        self.spans = deque(maxlen=max_spans)
+        self.enabled = True
+        self._origin_ns = time.perf_counter_ns()
+        self._wall_origin = time.time()
+        self._local = threading.local()
+
+    def _depth(self):
+        return getattr(self._local, 'depth', 0)
+
+    @contextmanager
+    def span(self, name, category='app', **args):
+        """Time the enclosed block and record it as a span"""
+        if not self.enabled:
+            yield
+            return
+
+        depth = self._depth()
+        self._local.depth = depth + 1
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self._local.depth = depth
+            self.spans.append((name, category, start, duration,
+                               threading.get_ident(), depth, args or None))
+
+    def traced(self, name=None, category='app'):
+        """Decorator form of span()"""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*a, **kw):
+                with self.span(span_name, category):
+                    return func(*a, **kw)
+            return wrapper
+        return decorator
+
+    def clear(self):
+        """Drop all recorded spans"""
+        self.spans.clear()
+
+    def recent(self, limit=50):
+        """Return the most recent spans as dicts, newest first"""
+        items = list(self.spans)[-limit:]
+        return [self._as_dict(s) for s in reversed(items)]
+
+    def summary(self):
+        """Aggregate spans per stage, slowest total first"""
+        stats = {}
+        for name, category, _, duration, _, _, _ in list(self.spans):
+            entry = stats.get(name)
+            if entry is None:
+                entry = stats[name] = {'name': name, 'category': category,
+                                       'count': 0, 'total_ms': 0.0,
+                                       'max_ms': 0.0, 'last_ms': 0.0}
+            ms = duration / 1e6
+            entry['count'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['last_ms'] = ms
+
+        for entry in stats.values():
+            entry['avg_ms'] = entry['total_ms'] / entry['count']
+
+        return sorted(stats.values(), key=lambda e: e['total_ms'], reverse=True)
+
+    def export_chrome_trace(self, filepath):
+        """Write spans in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for name, category, start, duration, tid, depth, args in list(self.spans):
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': (start - self._origin_ns) / 1e3,
+                'dur': duration / 1e3,
+                'pid': pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = {k: str(v) for k, v in args.items()}
+            events.append(event)
+
+        trace = {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'origin_unix_time': self._wall_origin},
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+
+        return len(events)
+
+    def _as_dict(self, span):
+        name, category, start, duration, tid, depth, args = span
+        return {
+            'name': name,
+            'category': category,
+            'start_ms': (start - self._origin_ns) / 1e6,
+            'duration_ms': duration / 1e6,
+            'thread': tid,
+            'depth': depth,
+            'args': args or {},
+        }
+
+
+class ProfileSession:
+    """Opt-in deep profiling of selected entry points
+
+    Every profiled call writes ``<label>_<run>.prof`` (load it with
+    ``python -m pstats`` or snakeviz) and ``<label>_<run>.txt`` with the
+    top app functions, the top allocation sites and the allocation growth
+    since the previous profiled run.
+    """
+
+    def __init__(self, output_dir=None, top_n=20, app_root=None):
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.app_root = app_root or os.path.dirname(os.path.abspath(__file__))
+        self.run_count = 0
+        self.last_report = None
+        self._active = False
+        self._previous_snapshot = None
+
+    @property
+    def enabled(self):
+        return self.output_dir is not None
+
+    def enable(self, output_dir):
+        """Start profiling into output_dir"""
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    def disable(self):
+        """Stop profiling"""
+        self.output_dir = None
+        self._previous_snapshot = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def profiled(self, label):
+        """Decorator that profiles each call while the session is enabled"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*a, **kw):
+                # Nested profiled calls run inside the outer profile
+                if not self.enabled or self._active:
+                    return func(*a, **kw)
+                return self.run(label, func, *a, **kw)
+            return wrapper
+        return decorator
+
+    def run(self, label, func, *args, **kwargs):
+        """Call func under cProfile and tracemalloc and write the reports"""
+        self.run_count += 1
+        stem = os.path.join(self.output_dir,
+                            f"{label}_{time.strftime('%Y%m%d_%H%M%S')}_{self.run_count:03d}")
+
+        profiler = cProfile.Profile()
+        self._active = True
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._active = False
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+
+            profiler.dump_stats(stem + '.prof')
+            report = self._build_report(label, profiler, snapshot, elapsed, current, peak)
+            with open(stem + '.txt', 'w', encoding='utf-8') as f:
+                f.write(report)
+
+            self._previous_snapshot = snapshot
+            self.last_report = stem + '.txt'
+
+    def _build_report(self, label, profiler, snapshot, elapsed, current, peak):
+        lines = [
+            f"Profile: {label} (run {self.run_count})",
+            f"Wall time: {elapsed * 1000:,.1f} ms",
+            f"Traced memory: {current / 1e6:,.1f} MB current, {peak / 1e6:,.1f} MB peak",
+            "",
+            f"[TOP {self.top_n} APP FUNCTIONS BY CUMULATIVE TIME]",
+        ]
+        lines.extend(self.top_app_functions(profiler))
+
+        lines += ["", f"[TOP {self.top_n} LIVE ALLOCATION SITES]"]
+        for stat in snapshot.statistics('lineno')[:self.top_n]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:>12,.1f} KiB {stat.count:>9,} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+
+        if self._previous_snapshot is not None:
+            lines += ["", f"[TOP {self.top_n} ALLOCATION GROWTH SINCE PREVIOUS RUN]"]
+            for stat in snapshot.compare_to(self._previous_snapshot, 'lineno')[:self.top_n]:
+                frame = stat.traceback[0]
+                lines.append(f"{stat.size_diff / 1024:>+12,.1f} KiB {stat.count_diff:>+9,} blocks  "
+                             f"{frame.filename}:{frame.lineno}")
+
+        lines += ["", "[FULL PROFILE - TOP FUNCTIONS]"]
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats('cumulative').print_stats(self.top_n)
+        lines.append(buffer.getvalue())
+        return "\n".join(lines)
+
+    def top_app_functions(self, profiler):
+        """Format the slowest functions defined in the application sources"""
+        stats = pstats.Stats(profiler).stats
+        rows = []
+        for (filename, lineno, funcname), (_, ncalls, tottime, cumtime, _) in stats.items():
+            if filename.endswith('.py') and os.path.abspath(filename).startswith(self.app_root):
+                rows.append((cumtime, tottime, ncalls, os.path.basename(filename), lineno, funcname))
+
+        rows.sort(reverse=True)
+        return [f"{cum * 1000:>10,.1f} ms cum {tot * 1000:>10,.1f} ms self {calls:>8,} calls  "
+                f"{name}:{lineno}({func})"
+                for cum, tot, calls, name, lineno, func in rows[:self.top_n]]
+
+
+# Shared tracer used by the dashboard and the analysis engines
+tracer = PerfTracer()
+
+if os.environ.get('SALES_TRACE_DISABLED'):
+    tracer.enabled = False
+
+# Profiling is off unless SALES_PROFILE (or the --profile flag) names a directory
+profiler = ProfileSession()
+
+if os.environ.get('SALES_PROFILE'):
+    _profile_dir = os.environ['SALES_PROFILE']
+    profiler.enable('profiles' if _profile_dir.lower() in ('1', 'true', 'yes') else _profile_dir)
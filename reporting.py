@@ -0,0 +1,462 @@
+"""
+💾 Export & Reporting for Smart Sales Forecasting AI
+Streaming Excel export and PDF/HTML business reports
+"""
+import base64
+import html
+import io
+import os
+import re
+import textwrap
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from openpyxl import Workbook
+
+try:
+    import xlsxwriter
+except ImportError:  # optional, faster constant-memory writer
+    xlsxwriter = None
+
+from analytics import build_insights_text, record_count, compute_kpi_table
+from charts import DEFAULT_THEME, build_dashboard_figure, chart_filename
+from perf_monitor import tracer
+from sales_data import to_export_frame, day_to_datetime, product_slices, DailyMatrix
+
+# Excel's hard limit per worksheet, including the header row
+EXCEL_MAX_ROWS = 1048576
+
+
+def daily_product_totals(sales_data):
+    """Aggregate the compact frame to one row per day and product
+
+    Frames that are already daily aggregates (database sources) carry a
+    Transactions column, which is summed instead of counting rows.
+    """
+    transactions = ('Transactions', 'sum') if 'Transactions' in sales_data.columns else ('Sales', 'size')
+    totals = (sales_data.groupby(['Day', 'Product'], observed=True)
+              .agg(Sales=('Sales', 'sum'),
+                   Quantity=('Quantity', 'sum'),
+                   Avg_Price=('Price', 'mean'),
+                   Transactions=transactions)
+              .reset_index())
+    totals['Sales'] = totals['Sales'].astype(np.float64)
+    return totals
+
+
+def summary_frame(sales_data):
+    """Headline metrics shown on the Summary sheet"""
+    days = sales_data['Day']
+    first, last = day_to_datetime([days.min(), days.max()]).date
+    total = sales_data['Sales'].to_numpy().sum(dtype=np.float64)
+    # Per calendar day with sales records, not per (product, day) row
+    n_days = days.nunique()
+    return pd.DataFrame({
+        'Metric': ['Total Sales', 'Average Daily', 'Transactions', 'Date Range'],
+        'Value': [
+            f"${total:,.2f}",
+            f"${total / n_days:,.2f}" if n_days else "N/A",
+            record_count(sales_data),
+            f"{first} to {last}",
+        ]
+    })
+
+
+def metrics_frame(models):
+    """One row of accuracy metrics per trained model"""
+    return pd.DataFrame([{'Model': name,
+                          'MAE': data['mae'],
+                          'RMSE': data['rmse'],
+                          'R2_Score': data['r2']}
+                         for name, data in models.items()])
+
+
+class _OpenpyxlBook:
+    """openpyxl workbook in write-only (streaming) mode"""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.workbook = Workbook(write_only=True)
+
+    def add_sheet(self, name):
+        return self.workbook.create_sheet(title=name).append
+
+    def save(self):
+        self.workbook.save(self.filepath)
+
+
+class _XlsxWriterBook:
+    """xlsxwriter workbook in constant-memory mode (rows are flushed as written)"""
+
+    def __init__(self, filepath):
+        self.workbook = xlsxwriter.Workbook(filepath, {'constant_memory': True,
+                                                       'default_date_format': 'yyyy-mm-dd'})
+
+    def add_sheet(self, name):
+        sheet = self.workbook.add_worksheet(name)
+        next_row = [0]
+
+        def append(row):
+            sheet.write_row(next_row[0], 0, row)
+            next_row[0] += 1
+        return append
+
+    def save(self):
+        self.workbook.close()
+
+
+def _open_workbook(filepath):
+    """Pick the fastest available streaming writer"""
+    if xlsxwriter is not None:
+        return _XlsxWriterBook(filepath)
+    return _OpenpyxlBook(filepath)
+
+
+def _round_float32(array):
+    """Round float32-derived values to 7 significant digits to drop binary noise"""
+    magnitude = np.zeros_like(array)
+    nonzero = np.isfinite(array) & (array != 0)
+    magnitude[nonzero] = np.floor(np.log10(np.abs(array[nonzero])))
+    scale = 10.0 ** (6 - magnitude)
+    return np.round(array * scale) / scale
+
+
+def _cell_columns(chunk):
+    """Convert a frame chunk to per-column lists of Excel-friendly Python values"""
+    columns = []
+    for col in chunk.columns:
+        values = chunk[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            converted = values.dt.to_pydatetime().tolist()
+        elif pd.api.types.is_float_dtype(values):
+            array = values.to_numpy(dtype=np.float64)
+            if values.dtype == np.float32:
+                array = _round_float32(array)
+            converted = [None if v != v else v for v in array.tolist()]
+        elif pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+            converted = values.tolist()
+        else:
+            converted = [None if pd.isna(v) else str(v) for v in values.tolist()]
+        columns.append(converted)
+    return columns
+
+
+def _write_frame(workbook, sheet_name, frame, chunk_rows, progress=None, expand_days=True):
+    """Stream a frame into write-only sheets, splitting at Excel's row limit
+
+    Returns the names of the sheets written.
+    """
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    expand_days = expand_days and 'Day' in frame.columns
+    header = list(to_export_frame(frame.iloc[:0]).columns if expand_days else frame.columns)
+    n_rows = len(frame)
+    n_sheets = max(1, -(-n_rows // rows_per_sheet))
+    sheet_names = []
+
+    for sheet_idx in range(n_sheets):
+        name = sheet_name if sheet_idx == 0 else f"{sheet_name} {sheet_idx + 1}"
+        append = workbook.add_sheet(name[:31])
+        append(header)
+        sheet_names.append(name)
+
+        sheet_start = sheet_idx * rows_per_sheet
+        sheet_stop = min(sheet_start + rows_per_sheet, n_rows)
+        for start in range(sheet_start, sheet_stop, chunk_rows):
+            chunk = frame.iloc[start:min(start + chunk_rows, sheet_stop)]
+            if expand_days:
+                chunk = to_export_frame(chunk)
+            for row in zip(*_cell_columns(chunk)):
+                append(row)
+
+            if progress is not None:
+                progress(min(start + chunk_rows, sheet_stop), n_rows)
+
+    return sheet_names
+
+
+def write_excel_report(filepath, sales_data, models=None, forecast_results=None,
+                       raw=True, chunk_rows=50000, progress=None):
+    """Write the Excel report with constant memory
+
+    Uses xlsxwriter's constant_memory mode when installed, otherwise
+    openpyxl's write-only mode.
+
+    raw=True streams every record (split across sheets past Excel's row
+    limit); raw=False exports daily product totals instead. progress, if
+    given, is called as progress(fraction, message).
+    """
+    def report(fraction, message):
+        if progress is not None:
+            progress(fraction, message)
+
+    workbook = _open_workbook(filepath)
+
+    with tracer.span('export: excel data sheets', 'export', raw=raw):
+        if raw:
+            data, sheet_name = sales_data, 'Raw Data'
+        else:
+            report(0.0, "Aggregating daily product totals...")
+            data, sheet_name = daily_product_totals(sales_data), 'Daily Product Totals'
+
+        data_sheets = _write_frame(
+            workbook, sheet_name, data, chunk_rows,
+            progress=lambda done, total: report(0.9 * done / max(total, 1),
+                                                f"Writing {sheet_name}: {done:,}/{total:,} rows"))
+
+    report(0.9, "Writing summary sheets...")
+    _write_frame(workbook, 'Summary', summary_frame(sales_data), chunk_rows, expand_days=False)
+
+    if models:
+        _write_frame(workbook, 'Metrics', metrics_frame(models), chunk_rows, expand_days=False)
+
+    if forecast_results is not None and len(forecast_results) > 0:
+        _write_frame(workbook, 'Forecasts', forecast_results, chunk_rows, expand_days=False)
+
+    report(0.95, "Saving workbook...")
+    with tracer.span('export: excel save', 'export'):
+        workbook.save()
+
+    report(1.0, "Done")
+    return data_sheets
+
+
+# ============ BUSINESS REPORTS ============
+
+def report_kpis(totals):
+    """Headline KPIs for a report, computed from daily product totals"""
+    # The totals row is last; positional so a product named 'All Products' can't shadow it
+    kpis = compute_kpi_table(DailyMatrix.from_frame(totals)).iloc[-1]
+    total = kpis['Total Sales']
+    count = record_count(totals)
+    growth = "N/A" if np.isnan(kpis['Growth %']) else f"{kpis['Growth %']:+.1f}%"
+
+    return [
+        ('Total Sales', f"${total:,.2f}"),
+        ('Average per Transaction', f"${total / count:,.2f}" if count else "N/A"),
+        ('Average per Day', f"${kpis['Avg Daily']:,.2f}"),
+        ('Transactions', f"{count:,}"),
+        ('Date Range', f"{kpis['First Day'].date()} to {kpis['Last Day'].date()}"),
+        ('Growth (last vs first 30 days)', growth),
+        ('Top Product', str(totals.groupby('Product', observed=True)['Sales'].sum().idxmax())),
+        ('Best Day', f"{kpis['Best Day'].date()} (${kpis['Best Day Sales']:,.0f})"),
+    ]
+
+
+def build_report(totals, title, models=None):
+    """Collect the content of one business report
+
+    totals is a daily_product_totals() frame, so batch runs can share one
+    precomputed aggregate instead of re-reading raw records.
+    """
+    return {
+        'title': title,
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        'kpis': report_kpis(totals),
+        'insights': build_insights_text(totals),
+        'metrics': metrics_frame(models) if models else None,
+    }
+
+
+def report_sections(report):
+    """The body of a report as (heading, lines) sections
+
+    The insights text is split at its "[SECTION]" markers, so every
+    renderer lays out the same structure instead of re-parsing text.
+    """
+    width = max(len(name) for name, _ in report['kpis'])
+    sections = [('KEY PERFORMANCE INDICATORS',
+                 [f"• {name:<{width}}  {value}" for name, value in report['kpis']])]
+
+    if report['metrics'] is not None:
+        table = report['metrics'].to_string(index=False, float_format=lambda v: f"{v:,.3f}")
+        sections.append(('MODEL PERFORMANCE', table.split("\n")))
+
+    # Text before the first marker is the insights banner and is dropped
+    insights = None
+    for line in report['insights'].split("\n"):
+        marker = re.fullmatch(r'\[(.+)\]', line.strip())
+        if marker:
+            insights = []
+            sections.append((marker.group(1), insights))
+        elif insights is not None and line.strip():
+            insights.append(line)
+    return sections
+
+
+def report_text(report):
+    """Render a report as plain text"""
+    lines = [
+        f"SALES ANALYSIS REPORT - {report['title']}",
+        "=" * 60,
+        f"Generated: {report['generated']}",
+    ]
+    for heading, body in report_sections(report):
+        lines += ["", f"[{heading}]"] + body
+    return "\n".join(lines)
+
+
+def _plain(text):
+    """Drop emoji that PDF fonts cannot render"""
+    return re.sub('[\U00010000-\U0010ffff\ufe0f]', '', text)
+
+
+def _pdf_pages(report, theme, page_size=(11.69, 8.27), fontsize=8.5, wrap=140):
+    """Lay the report sections out over as many A4 pages as they need"""
+    line_height = 1.45 * fontsize / 72 / page_size[1]
+    top, bottom = 0.85, 0.06
+
+    def new_page():
+        page = Figure(figsize=page_size)
+        page.patch.set_facecolor('white')
+        title = _plain(f"Sales Analysis Report - {report['title']}")
+        if pages:
+            page.text(0.05, 0.95, f"{title} (continued)", fontsize=10, color='gray',
+                      va='top', parse_math=False)
+        else:
+            page.text(0.05, 0.95, title, fontsize=18, fontweight='bold',
+                      color=theme['primary_color'], va='top', parse_math=False)
+            page.text(0.05, 0.90, f"Generated: {report['generated']}",
+                      fontsize=9, color='gray', va='top', parse_math=False)
+        pages.append(page)
+        return page, (top if len(pages) == 1 else 0.91)
+
+    pages = []
+    page, y = new_page()
+    for heading, body in report_sections(report):
+        lines = [wrapped for line in body
+                 for wrapped in textwrap.wrap(_plain(line), wrap, subsequent_indent='    ',
+                                              drop_whitespace=False) or ['']]
+        # Keep a heading together with at least its first two lines
+        if y - (2 + min(len(lines), 2)) * line_height < bottom:
+            page, y = new_page()
+        y -= 0.5 * line_height
+        page.text(0.05, y, heading.title(), fontsize=fontsize + 2, fontweight='bold',
+                  color=theme['primary_color'], va='top', parse_math=False)
+        y -= 1.5 * line_height
+
+        for line in lines:
+            if y - line_height < bottom:
+                page, y = new_page()
+            page.text(0.05, y, line, fontsize=fontsize, family='monospace',
+                      va='top', parse_math=False)
+            y -= line_height
+    return pages
+
+
+def write_pdf_report(report, dashboard_figure, filepath, theme=None):
+    """Write a report as a multi-page PDF
+
+    The report sections flow over as many summary pages as they need,
+    followed by the dashboard page.
+    """
+    theme = theme or DEFAULT_THEME
+
+    with PdfPages(filepath) as pdf:
+        for page in _pdf_pages(report, theme):
+            pdf.savefig(page)
+        pdf.savefig(dashboard_figure, facecolor=theme['bg_color'])
+
+
+def write_html_report(report, dashboard_figure, filepath, theme=None):
+    """Write a self-contained HTML report with the dashboard embedded as PNG"""
+    theme = theme or DEFAULT_THEME
+
+    buffer = io.BytesIO()
+    dashboard_figure.savefig(buffer, format='png', dpi=100, bbox_inches='tight',
+                             facecolor=theme['bg_color'])
+    chart = base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    kpi_rows = "".join(f"<tr><th>{html.escape(name)}</th><td>{html.escape(value)}</td></tr>"
+                       for name, value in report['kpis'])
+    metrics = ""
+    if report['metrics'] is not None:
+        metrics = ("<h2>Model Performance</h2>" +
+                   report['metrics'].to_html(index=False, float_format=lambda v: f"{v:,.3f}"))
+
+    page = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Sales Analysis Report - {html.escape(report['title'])}</title>
+<style>
+body {{ background: {theme['bg_color']}; color: {theme['text_color']};
+       font-family: 'Segoe UI', sans-serif; margin: 40px; }}
+h1, h2 {{ color: {theme['accent_color']}; }}
+table {{ border-collapse: collapse; margin-bottom: 20px; }}
+th, td {{ padding: 6px 14px; border-bottom: 1px solid {theme['grid_color']}; text-align: left; }}
+pre {{ background: {theme['card_bg']}; padding: 15px; white-space: pre-wrap; }}
+img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<h1>Sales Analysis Report - {html.escape(report['title'])}</h1>
+<p>Generated: {report['generated']}</p>
+<h2>Key Performance Indicators</h2>
+<table>{kpi_rows}</table>
+{metrics}
+<h2>Business Insights</h2>
+<pre>{html.escape(report['insights'])}</pre>
+<h2>Sales Dashboard</h2>
+<img alt="Sales dashboard" src="data:image/png;base64,{chart}">
+</body>
+</html>
+"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(page)
+
+
+def write_report_files(title, totals, stem, formats=('pdf', 'html'), models=None, theme=None):
+    """Build one report and write it in the requested formats; returns the paths"""
+    report = build_report(totals, title, models)
+    fig = build_dashboard_figure(totals, title, theme)
+
+    paths = []
+    if 'pdf' in formats:
+        write_pdf_report(report, fig, stem + '.pdf', theme)
+        paths.append(stem + '.pdf')
+    if 'html' in formats:
+        write_html_report(report, fig, stem + '.html', theme)
+        paths.append(stem + '.html')
+    return paths
+
+
+def export_report_batch(sales_data, output_dir, formats=('pdf', 'html'), workers=None,
+                        theme=None, include_overview=True, progress=None):
+    """Write one report per product using a process pool
+
+    Daily product totals are computed once and each worker receives only
+    its product's slice of them. Returns all written file paths.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    with tracer.span('export: report aggregates', 'export'):
+        totals = daily_product_totals(sales_data)
+
+    # The overview's stem is reserved so a product can never overwrite it
+    tasks, taken = [], {'all_products'}
+    if include_overview:
+        tasks.append(('All Products', totals, os.path.join(output_dir, 'All_Products')))
+    for product, rows in product_slices(totals):
+        tasks.append((product, rows, os.path.join(output_dir, chart_filename(product, taken))))
+
+    paths = []
+    with tracer.span('export: report batch', 'export', reports=len(tasks)):
+        if workers == 1:
+            for done, (title, data, stem) in enumerate(tasks, 1):
+                paths += write_report_files(title, data, stem, formats, theme=theme)
+                if progress is not None:
+                    progress(done / len(tasks), f"Wrote report for {title}")
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(write_report_files, title, data, stem, formats, None, theme): title
+                           for title, data, stem in tasks}
+                for done, future in enumerate(as_completed(futures), 1):
+                    paths += future.result()
+                    if progress is not None:
+                        progress(done / len(tasks), f"Wrote report for {futures[future]}")
+
+    return paths
@@ -0,0 +1,484 @@
+"""
+📦 Compact Sales Data Model for Smart Sales Forecasting AI
+Canonical in-memory representation of sales records
+"""
+import numpy as np
+import pandas as pd
+
+# Day offsets are counted from the Unix epoch
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+REQUIRED_COLUMNS = ('Date', 'Product', 'Sales')
+
+# Canonical column order and dtypes of the compact frame
+SCHEMA = {
+    'Day': 'int32',
+    'Product': 'category',
+    'Sales': 'float32',
+    'Quantity': 'int32',
+    'Price': 'float32',
+}
+
+
+class SchemaError(ValueError):
+    """Raised when sales data does not match the expected schema"""
+
+
+def to_compact(df):
+    """Convert a raw sales frame into the canonical compact frame
+
+    Dates become int32 day offsets from EPOCH, products become a categorical,
+    Sales/Price become float32 and Quantity int32. Extra text columns are kept
+    as categoricals. Rows are returned sorted by day.
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise SchemaError(f"Missing required column(s): {', '.join(missing)}")
+
+    if len(df) == 0:
+        raise SchemaError("Sales data is empty")
+
+    dates = pd.to_datetime(df['Date'], errors='coerce')
+    bad_dates = int(dates.isna().sum())
+    if bad_dates:
+        raise SchemaError(f"{bad_dates:,} row(s) have missing or unparseable dates")
+
+    sales = pd.to_numeric(df['Sales'], errors='coerce')
+    bad_sales = int(sales.isna().sum())
+    if bad_sales:
+        raise SchemaError(f"{bad_sales:,} row(s) have missing or non-numeric Sales")
+
+    if 'Quantity' in df.columns:
+        quantity = pd.to_numeric(df['Quantity'], errors='coerce').fillna(0).round()
+    else:
+        quantity = np.zeros(len(df))
+
+    if 'Price' in df.columns:
+        price = pd.to_numeric(df['Price'], errors='coerce')
+    else:
+        price = np.full(len(df), np.nan)
+
+    compact = pd.DataFrame({
+        'Day': datetime_to_day(dates),
+        'Product': pd.Categorical(df['Product'].astype(str)),
+        'Sales': np.asarray(sales, dtype=np.float32),
+        'Quantity': np.asarray(quantity, dtype=np.int32),
+        'Price': np.asarray(price, dtype=np.float32),
+    })
+
+    # Carry through any additional columns in their most compact form
+    for col in df.columns:
+        if col in REQUIRED_COLUMNS or col in SCHEMA:
+            continue
+        values = df[col]
+        if pd.api.types.is_float_dtype(values):
+            compact[col] = values.to_numpy(dtype=np.float32)
+        elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+            compact[col] = values.to_numpy()
+        else:
+            compact[col] = pd.Categorical(values.astype(str))
+
+    order = np.argsort(compact['Day'].to_numpy(), kind='stable')
+    compact = compact.iloc[order].reset_index(drop=True)
+
+    validate_schema(compact)
+    return compact
+
+
+def validate_schema(frame):
+    """Check that a frame follows the compact schema, raising SchemaError if not"""
+    for col, dtype in SCHEMA.items():
+        if col not in frame.columns:
+            raise SchemaError(f"Compact frame is missing column '{col}'")
+        actual = frame[col].dtype
+        if dtype == 'category':
+            if not isinstance(actual, pd.CategoricalDtype):
+                raise SchemaError(f"Column '{col}' must be categorical, got {actual}")
+        elif actual != np.dtype(dtype):
+            raise SchemaError(f"Column '{col}' must be {dtype}, got {actual}")
+
+    days = frame['Day'].to_numpy()
+    if len(days) > 1 and (np.diff(days) < 0).any():
+        raise SchemaError("Compact frame must be sorted by Day")
+
+
+def to_export_frame(frame):
+    """Expand a compact frame back into a user-facing frame with a Date column"""
+    export = frame.drop(columns=['Day'])
+    export.insert(0, 'Date', day_to_datetime(frame['Day']))
+    return export
+
+
+def product_slices(frame):
+    """Yield (product, rows) for every product present, splitting once by category code
+
+    Avoids a full-table boolean mask per product; rows keep their day order.
+    """
+    categories = frame['Product'].cat.categories
+    codes = frame['Product'].cat.codes.to_numpy()
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+    for code, product in enumerate(categories):
+        if bounds[code + 1] > bounds[code]:
+            yield product, frame.iloc[order[bounds[code]:bounds[code + 1]]]
+
+
+class SliceIndex:
+    """Precomputed group offsets for every categorical dimension of a compact frame
+
+    For each dimension the row numbers are kept sorted by category code
+    (stably, so each group stays in day order) together with the group
+    boundaries. A slice then costs O(size of the smallest matching group)
+    instead of a boolean mask over the whole table. Because the frame is
+    sorted by Day, date ranges resolve with a binary search. Orderings saved
+    earlier (see AggregateStore) can be passed in as orders to skip the sorts.
+    """
+
+    def __init__(self, frame, orders=None):
+        self.frame = frame
+        self.days = frame['Day'].to_numpy()
+        self.groups = {}
+        for col in frame.columns:
+            if not isinstance(frame[col].dtype, pd.CategoricalDtype):
+                continue
+            categories = frame[col].cat.categories
+            codes = frame[col].cat.codes.to_numpy()
+            if orders is not None and col in orders:
+                order = orders[col]
+            else:
+                order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+            self.groups[col] = (categories, codes, order, bounds)
+
+    @property
+    def dimensions(self):
+        """Sliceable columns other than Product"""
+        return [col for col in self.groups if col != 'Product']
+
+    def values(self, dimension):
+        """Categories of a dimension that have at least one row"""
+        categories, _, _, bounds = self.groups[dimension]
+        return categories[np.diff(bounds) > 0].tolist()
+
+    def _codes(self, dimension, value):
+        categories = self.groups[dimension][0]
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        codes = categories.get_indexer(list(values))
+        return codes[codes >= 0]
+
+    def day_bounds(self, day_range):
+        """First and one-past-last row of an inclusive (start_day, end_day) range
+
+        Either end may be None for an open range.
+        """
+        start, end = day_range
+        lo = 0 if start is None else int(np.searchsorted(self.days, start, side='left'))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, end, side='right'))
+        return lo, max(lo, hi)
+
+    def rows(self, filters, day_range=None):
+        """Ascending row numbers matching every {dimension: value(s)} filter and the day range"""
+        lo, hi = self.day_bounds(day_range) if day_range else (0, len(self.frame))
+        if not filters:
+            return np.arange(lo, hi)
+
+        wanted = {dim: self._codes(dim, value) for dim, value in filters.items()}
+
+        # Start from the smallest group and check the other dimensions on it
+        def group_size(dim):
+            bounds = self.groups[dim][3]
+            return int(np.sum(bounds[wanted[dim] + 1] - bounds[wanted[dim]]))
+
+        first = min(wanted, key=group_size)
+        _, _, order, bounds = self.groups[first]
+        rows = np.concatenate([order[bounds[c]:bounds[c + 1]] for c in wanted[first]]
+                              or [np.empty(0, dtype=order.dtype)])
+        if len(wanted[first]) > 1:
+            rows.sort()
+
+        for dim, codes in wanted.items():
+            if dim != first and len(rows):
+                rows = rows[np.isin(self.groups[dim][1][rows], codes)]
+
+        # Rows are ascending, so the day range is a second binary search
+        return rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)]
+
+    def select(self, filters, day_range=None):
+        """Frame of the rows matching the filters (the full frame when there are none)"""
+        if not filters and not day_range:
+            return self.frame
+        if not filters:
+            return self.frame.iloc[slice(*self.day_bounds(day_range))]
+        return self.frame.take(self.rows(filters, day_range))
+
+
+class DailyMatrix:
+    """Dense product x day aggregate of a compact frame
+
+    values[p, d] holds the summed sales of product p on day start_day + d
+    and counts[p, d] the number of records behind it, so days without any
+    records can be told apart from days that sold nothing. The column sums
+    over all products are kept alongside as totals and total_counts rather
+    than as an extra matrix row.
+    """
+
+    def __init__(self, values, counts, products, start_day, totals=None, total_counts=None):
+        self.values = values
+        self.counts = counts
+        self.products = products
+        self.start_day = int(start_day)
+        self.totals = values.sum(axis=0) if totals is None else totals
+        self.total_counts = counts.sum(axis=0) if total_counts is None else total_counts
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Aggregate a compact frame with one bincount pass"""
+        products = frame['Product'].cat.categories
+        codes = frame['Product'].cat.codes.to_numpy().astype(np.int64)
+        days = frame['Day'].to_numpy()
+        start_day = int(days.min()) if len(days) else 0
+        n_days = int(days.max()) - start_day + 1 if len(days) else 0
+        n_products = len(products)
+
+        flat = codes * n_days + (days - start_day)
+        size = n_products * n_days
+        values = np.bincount(flat, weights=frame['Sales'].to_numpy(), minlength=size)
+        counts = np.bincount(flat, minlength=size).astype(np.int32)
+
+        return cls(values.reshape(n_products, n_days),
+                   counts.reshape(n_products, n_days),
+                   products, start_day)
+
+    @property
+    def n_days(self):
+        return self.values.shape[1]
+
+    @property
+    def days(self):
+        """Day offsets covered by the matrix columns"""
+        return np.arange(self.start_day, self.start_day + self.n_days, dtype=np.int32)
+
+    def dates(self):
+        """DatetimeIndex of the matrix columns"""
+        return day_to_datetime(self.days)
+
+    def row(self, product):
+        """Matrix row index of a product"""
+        return self.products.get_loc(product)
+
+    def series(self, product=None):
+        """Daily sales of one product, or of all products when product is None"""
+        if product is None or product == 'All Products':
+            return self.totals
+        return self.values[self.row(product)]
+
+    def recorded(self, product=None):
+        """(days, sales) of one product, or of all products, on the days that have records"""
+        if product is None or product == 'All Products':
+            counts = self.total_counts
+        else:
+            counts = self.counts[self.row(product)]
+        has_records = counts > 0
+        return self.days[has_records], self.series(product)[has_records]
+
+    def updated(self, frame, first_day):
+        """Matrix of frame, a later state of the data this one was built from
+        in which only the days from first_day on were added or changed
+
+        Columns before first_day are copied and only later records are
+        aggregated, plus every record of the products whose count of earlier
+        records changed (gap filling can reach back before first_day).
+        Returns (matrix, rewritten): rewritten flags the products, and then
+        the total, whose values changed within this matrix's days.
+        """
+        codes = frame['Product'].cat.codes.to_numpy().astype(np.int64)
+        days = frame['Day'].to_numpy().astype(np.int64) - self.start_day
+        n_products = len(self.products)
+        n_days = max(int(days.max()) + 1, self.n_days)
+        first = int(np.clip(first_day - self.start_day, 0, self.n_days))
+
+        earlier = days < first
+        history = np.bincount(codes[earlier], minlength=n_products) != self.counts[:, :first].sum(axis=1)
+        redo = ~earlier | history[codes]
+
+        values = np.zeros((n_products, n_days))
+        counts = np.zeros((n_products, n_days), dtype=np.int32)
+        values[:, :first] = self.values[:, :first]
+        counts[:, :first] = self.counts[:, :first]
+        values[history] = 0
+        counts[history] = 0
+        cells, inverse = np.unique(codes[redo] * n_days + days[redo], return_inverse=True)
+        values.flat[cells] = np.bincount(inverse, weights=frame['Sales'].to_numpy(np.float64)[redo])
+        counts.flat[cells] = np.bincount(inverse)
+
+        if history.any():
+            totals, total_counts = values.sum(axis=0), counts.sum(axis=0)
+        else:
+            totals = np.concatenate([self.totals[:first], values[:, first:].sum(axis=0)])
+            total_counts = np.concatenate([self.total_counts[:first], counts[:, first:].sum(axis=0)])
+
+        old = slice(first, self.n_days)
+        rewritten = history | (values[:, old] != self.values[:, old]).any(axis=1) | \
+            (counts[:, old] != self.counts[:, old]).any(axis=1)
+        matrix = DailyMatrix(values, counts, self.products, self.start_day, totals, total_counts)
+        return matrix, np.append(rewritten, rewritten.any())
+
+    def lookup(self, rows, columns):
+        """(values, counts) at (row, column) pairs, where row len(products)
+        stands for the total of all products"""
+        rows, columns = np.asarray(rows), np.asarray(columns)
+        total = rows == len(self.products)
+        values = np.empty(len(rows))
+        counts = np.empty(len(rows), dtype=np.int64)
+        values[total] = self.totals[columns[total]]
+        counts[total] = self.total_counts[columns[total]]
+        values[~total] = self.values[rows[~total], columns[~total]]
+        counts[~total] = self.counts[rows[~total], columns[~total]]
+        return values, counts
+
+
+class SparseDaily:
+    """Product x day sales in CSR layout, storing only days with demand
+
+    The demand days of product p are days[indptr[p]:indptr[p + 1]] (offsets
+    from start_day, ascending) with their summed sales in values. Long-tail
+    catalogs where most products sell on a few days cost memory in the
+    number of sales days rather than products x calendar days.
+    """
+
+    def __init__(self, indptr, days, values, products, start_day, n_days):
+        self.indptr = indptr
+        self.days = days
+        self.values = values
+        self.products = products
+        self.start_day = int(start_day)
+        self.n_days = int(n_days)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Aggregate a compact frame without materializing the zero days"""
+        products = frame['Product'].cat.categories
+        codes = frame['Product'].cat.codes.to_numpy().astype(np.int64)
+        days = frame['Day'].to_numpy().astype(np.int64)
+        start_day = int(days.min()) if len(days) else 0
+        n_days = int(days.max()) - start_day + 1 if len(days) else 0
+
+        width = max(n_days, 1)
+        keys, totals = _demand_keys(codes * width + (days - start_day),
+                                    frame['Sales'].to_numpy(dtype=np.float64))
+        return cls._from_keys(keys, totals, width, products, start_day, n_days)
+
+    @classmethod
+    def _from_keys(cls, keys, values, width, products, start_day, n_days):
+        """CSR from sorted product * width + day keys"""
+        rows = keys // width
+        indptr = np.searchsorted(rows, np.arange(len(products) + 1))
+        return cls(indptr, (keys - rows * width).astype(np.int32), values, products, start_day, n_days)
+
+    def updated(self, frame, first_day, rebuild):
+        """CSR of frame, a later state of the data this one was built from
+        in which only the days from first_day on were added or changed
+
+        Demand days before first_day are kept, except for the products
+        flagged in rebuild (e.g. DailyMatrix.updated's rewritten rows),
+        which are re-aggregated from all their records. Only the remaining
+        records are sorted.
+        """
+        codes = frame['Product'].cat.codes.to_numpy().astype(np.int64)
+        days = frame['Day'].to_numpy().astype(np.int64) - self.start_day
+        n_days = max(int(days.max()) + 1, self.n_days)
+        first = int(np.clip(first_day - self.start_day, 0, self.n_days))
+
+        # The kept and the re-aggregated (product, day) keys are disjoint
+        rows = np.repeat(np.arange(len(self.products)), self.nnz)
+        kept = (self.days < first) & ~rebuild[rows]
+        redo = (days >= first) | rebuild[codes]
+        keys, totals = _demand_keys(codes[redo] * n_days + days[redo],
+                                    frame['Sales'].to_numpy(dtype=np.float64)[redo])
+        keys = np.concatenate([rows[kept] * n_days + self.days[kept], keys])
+        order = np.argsort(keys, kind='stable')
+        values = np.concatenate([self.values[kept], totals])
+        return SparseDaily._from_keys(keys[order], values[order], n_days, self.products,
+                                      self.start_day, n_days)
+
+    @classmethod
+    def from_dense(cls, values, products=None, start_day=0):
+        """CSR copy of a products x days array"""
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        rows, days = np.nonzero(values > 0)
+        indptr = np.searchsorted(rows, np.arange(values.shape[0] + 1))
+        products = pd.Index(range(values.shape[0])) if products is None else products
+        return cls(indptr, days.astype(np.int32), values[rows, days], products, start_day, values.shape[1])
+
+    @property
+    def nnz(self):
+        """Number of demand days per product"""
+        return np.diff(self.indptr)
+
+    def row(self, product):
+        """(day offsets, sales) of one product's demand days"""
+        p = self.products.get_loc(product)
+        window = slice(self.indptr[p], self.indptr[p + 1])
+        return self.days[window], self.values[window]
+
+    def to_dense(self):
+        dense = np.zeros((len(self.products), self.n_days))
+        dense[np.repeat(np.arange(len(self.products)), self.nnz), self.days] = self.values
+        return dense
+
+
+def _demand_keys(keys, sales):
+    """Sorted unique keys with their summed sales, dropping keys without demand"""
+    # Sorted (product, day) keys are in CSR order; equal keys are summed
+    # with one reduceat over the runs
+    order = np.argsort(keys)
+    keys = keys[order]
+    runs = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, np.int64)
+    totals = np.add.reduceat(sales[order], runs) if len(runs) else np.empty(0)
+    keys = keys[runs]
+    demand = totals > 0
+    return keys[demand], totals[demand]
+
+
+def memory_footprint(frame):
+    """Return the deep memory usage of a frame in bytes"""
+    return int(frame.memory_usage(deep=True).sum())
+
+
+# ============ CALENDAR HELPERS ============
+# Derived calendar fields are computed on demand as integer codes and are
+# never stored on the frame.
+
+def datetime_to_day(dates):
+    """Convert datetimes to int32 day offsets from EPOCH"""
+    values = np.asarray(dates, dtype='datetime64[D]')
+    return (values - EPOCH).astype(np.int32)
+
+
+def day_to_datetime(days):
+    """Convert day offsets back to a DatetimeIndex"""
+    values = EPOCH + np.asarray(days).astype('timedelta64[D]')
+    return pd.DatetimeIndex(values.astype('datetime64[ns]'))
+
+
+def month_key(days):
+    """Months since EPOCH for each day offset (chronologically sortable)"""
+    values = EPOCH + np.asarray(days).astype('timedelta64[D]')
+    return values.astype('datetime64[M]').astype(np.int32)
+
+
+def month_of_year(days):
+    """Calendar month (1-12) for each day offset"""
+    return (month_key(days) % 12 + 1).astype(np.int8)
+
+
+def weekday(days):
+    """Day of week for each day offset, Monday=0 ... Sunday=6"""
+    # 1970-01-01 was a Thursday
+    return ((np.asarray(days) + 3) % 7).astype(np.int8)
+
+
+def month_labels(keys, fmt='%b %Y'):
+    """Format month keys as labels; call on grouped keys, not per row"""
+    months = np.asarray(keys).astype('datetime64[M]')
+    return pd.DatetimeIndex(months.astype('datetime64[ns]')).strftime(fmt).tolist()
@@ -0,0 +1,73 @@
+"""
+🧪 Tests for the validation and repair stage
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_quality import QualityReport, repair_sales_data
+from sales_data import SchemaError
+
+
+def _raw():
+    return pd.DataFrame({
+        'Date': ['2024-01-01 10:00', '2024-01-01 10:00', 'not a date', None, '2024-01-02 10:00',
+                 '2024-01-02 10:00', '2024-01-05 10:00', '2024-01-03 10:00', '2024-01-04 09:00',
+                 '2024-01-04 15:00'],
+        'Product': ['A', 'A', 'A', 'B', None, 'B', 'B', 'A', 'A', 'A'],
+        'Sales': [10, 10, 5, 5, 5, 'n/a', -3, 7, 4, 4],
+        'Quantity': [1, 1, 1, 1, 1, 1, -2, 1, 1, 1],
+        'Price': [10.0, 10.0, 5.0, 5.0, 5.0, 5.0, 1.5, -7.0, 4.0, 4.0],
+    })
+
+
+def test_repair_counts():
+    frame, report = repair_sales_data(_raw())
+
+    assert report.rows_in == 10
+    assert report.bad_dates == 2
+    assert report.missing_products == 1
+    assert report.bad_sales == 1
+    # Same item twice at different times of one day is not a duplicate
+    assert report.duplicates == 1
+    assert report.negative_sales == 1
+    assert report.negative_quantity == 1
+    assert report.negative_price == 1
+    assert report.filled_days == 0
+    assert report.rows_out == len(frame) == 5
+
+    assert (frame['Sales'] >= 0).all() and (frame['Quantity'] >= 0).all()
+    assert frame['Price'].isna().sum() == 1
+    assert (frame['Date'] == frame['Date'].dt.normalize()).all()
+
+
+@pytest.mark.parametrize('fill, filled_sales', [('zero', [0.0, 0.0, 0.0]), ('ffill', [8.0, 8.0, 8.0])])
+def test_gap_fill(fill, filled_sales):
+    raw = pd.DataFrame({'Date': ['1969-12-30', '1970-01-03', '1969-12-30', '1969-12-31'],
+                        'Product': ['A', 'A', 'B', 'B'],
+                        'Sales': [8.0, 2.0, 1.0, 1.0]})
+
+    frame, report = repair_sales_data(raw, fill=fill)
+
+    assert report.filled_days == 3
+    assert report.rows_out == 7
+    a = frame[frame['Product'] == 'A'].sort_values('Date')
+    assert list(a['Date'].dt.strftime('%Y-%m-%d')) == ['1969-12-30', '1969-12-31', '1970-01-01',
+                                                      '1970-01-02', '1970-01-03']
+    np.testing.assert_allclose(a['Sales'].iloc[1:4], filled_sales)
+
+
+def test_upstream_counts_are_combined():
+    upstream = QualityReport()
+    upstream.rows_in, upstream.duplicates = 50, 4
+
+    _, report = repair_sales_data(_raw(), upstream=upstream)
+
+    assert report.rows_in == 50
+    assert report.duplicates == 5
+    assert report.rows_out == 5
+
+
+def test_missing_columns_raise():
+    with pytest.raises(SchemaError):
+        repair_sales_data(pd.DataFrame({'Date': ['2024-01-01'], 'Sales': [1.0]}))
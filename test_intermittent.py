@@ -0,0 +1,72 @@
+"""
+🧪 Tests for demand classification and the Croston-type rates
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from intermittent import ALPHA, BETA, DEMAND_CLASSES, classify_demand, croston_rates
+from sales_data import SparseDaily
+
+
+def _reference_rate(series, variant, alpha=ALPHA, beta=BETA):
+    """Day-by-day Croston / SBA / TSB on one dense series"""
+    demand_days = np.flatnonzero(series > 0)
+    if not len(demand_days):
+        return 0.0
+    first = demand_days[0]
+    span = len(series) - first
+    size = series[first]
+    interval = span / len(demand_days)
+    probability = len(demand_days) / span
+    previous = first
+
+    for day in range(first + 1, len(series)):
+        if series[day] > 0:
+            size += alpha * (series[day] - size)
+            interval += alpha * (day - previous - interval)
+            probability += beta * (1 - probability)
+            previous = day
+        else:
+            probability *= 1 - beta
+
+    if variant == 'TSB':
+        return size * probability
+    factor = 1 - alpha / 2 if variant == 'SBA' else 1.0
+    return factor * size / interval
+
+
+@pytest.fixture
+def sparse():
+    rng = np.random.default_rng(0)
+    values = np.where(rng.random((40, 120)) < rng.uniform(0.02, 0.9, (40, 1)),
+                      rng.gamma(2, 20, (40, 120)), 0.0)
+    values[3] = 0
+    values[7, :-1] = 0
+    return values, SparseDaily.from_dense(values)
+
+
+@pytest.mark.parametrize('variant', ['Croston', 'SBA', 'TSB'])
+def test_croston_rates_match_reference(sparse, variant):
+    values, series = sparse
+    expected = [_reference_rate(row, variant) for row in values]
+    np.testing.assert_allclose(croston_rates(series, variant), expected, rtol=1e-9)
+
+
+def test_croston_rates_rejects_unknown_variant(sparse):
+    with pytest.raises(ValueError):
+        croston_rates(sparse[1], 'ARIMA')
+
+
+def test_classify_demand():
+    values = np.zeros((4, 28))
+    values[0] = 10                           # sells every day
+    values[1, ::7] = 10                      # weekly, constant size
+    values[2, ::7] = [1, 50, 2, 80]          # weekly, very variable size
+    series = SparseDaily.from_dense(values, pd.Index(list('abcd')))
+
+    classes = classify_demand(series)
+
+    assert [classes.class_of(p) for p in 'abcd'] == ['smooth', 'intermittent', 'lumpy', 'no demand']
+    np.testing.assert_allclose(classes.adi[:3], [1.0, 7.0, 7.0])
+    assert classes.counts()[list(DEMAND_CLASSES)].sum() == 4
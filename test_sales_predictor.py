@@ -0,0 +1,91 @@
+"""
+🧪 Tests for the incremental aggregate refresh
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from SalesPredictor import SmartSalesForecaster
+from data_quality import repair_sales_data
+from sales_data import datetime_to_day, to_compact
+
+
+def _raw(start, n_days, products, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=n_days, freq='D')
+    rows = [(date, product) for date in dates for product in products if rng.random() < 0.7]
+    n = len(rows)
+    return pd.DataFrame({'Date': [date for date, _ in rows],
+                         'Product': [product for _, product in rows],
+                         'Sales': rng.gamma(2, 50, n).round(2),
+                         'Quantity': rng.integers(1, 6, n),
+                         'Price': rng.uniform(5, 40, n).round(2)})
+
+
+def _compact(raw):
+    return to_compact(repair_sales_data(raw, fill='zero')[0])
+
+
+@pytest.fixture
+def app():
+    # The aggregate methods touch no widgets or state
+    return SmartSalesForecaster.__new__(SmartSalesForecaster)
+
+
+def _assert_same(incremental, full):
+    m, r = incremental['daily_matrix'], full['daily_matrix']
+    assert (m.start_day, m.n_days) == (r.start_day, r.n_days)
+    np.testing.assert_allclose(m.values, r.values)
+    np.testing.assert_array_equal(m.counts, r.counts)
+    np.testing.assert_allclose(m.totals, r.totals)
+    np.testing.assert_array_equal(m.total_counts, r.total_counts)
+
+    s, rs = incremental['sparse_daily'], full['sparse_daily']
+    np.testing.assert_array_equal(s.indptr, rs.indptr)
+    np.testing.assert_array_equal(s.days, rs.days)
+    np.testing.assert_allclose(s.values, rs.values)
+    np.testing.assert_array_equal(incremental['demand'].classes, full['demand'].classes)
+
+    pd.testing.assert_frame_equal(incremental['kpi_table'], full['kpi_table'], check_exact=False, rtol=1e-9)
+    for name, values in full['rolling_stats'].features.items():
+        np.testing.assert_allclose(incremental['rolling_stats'].features[name], values, rtol=1e-4, atol=1e-3)
+    np.testing.assert_array_equal(incremental['anomalies'].mask, full['anomalies'].mask)
+    np.testing.assert_allclose(incremental['anomalies'].expected, full['anomalies'].expected, rtol=1e-9)
+    np.testing.assert_allclose(incremental['seasonality'].strength, full['seasonality'].strength, rtol=1e-9)
+    np.testing.assert_allclose(incremental['trends'].coefficients, full['trends'].coefficients,
+                               rtol=1e-6, atol=1e-6)
+
+
+def test_extend_with_new_days_matches_full_recompute(app):
+    products = [f"P{i}" for i in range(8)]
+    old = _raw('2024-01-01', 90, products, 0)
+    new = _raw('2024-03-31', 20, products[:5], 1)
+    previous = app.compute_aggregates(_compact(old))
+
+    frame = _compact(pd.concat([old, new], ignore_index=True))
+    first_day = int(datetime_to_day(pd.to_datetime(['2024-03-31']))[0])
+
+    _assert_same(app.extend_aggregates(previous, frame, first_day), app.compute_aggregates(frame))
+
+
+def test_extend_with_rewritten_days_matches_full_recompute(app):
+    products = [f"P{i}" for i in range(8)]
+    raw = _raw('2024-01-01', 90, products, 2)
+    previous = app.compute_aggregates(_compact(raw))
+
+    # The last 10 days are re-delivered with other figures for two products
+    changed = raw.copy()
+    late = (changed['Date'] >= '2024-03-21') & changed['Product'].isin(['P1', 'P6'])
+    changed.loc[late, 'Sales'] *= 1.5
+    frame = _compact(changed)
+    first_day = int(datetime_to_day(pd.to_datetime(['2024-03-21']))[0])
+
+    _assert_same(app.extend_aggregates(previous, frame, first_day), app.compute_aggregates(frame))
+
+
+def test_extend_declines_other_products(app):
+    old = _raw('2024-01-01', 60, ['A', 'B'], 3)
+    previous = app.compute_aggregates(_compact(old))
+    frame = _compact(pd.concat([old, _raw('2024-03-01', 5, ['C'], 4)], ignore_index=True))
+
+    assert app.extend_aggregates(previous, frame, None) is None
@@ -0,0 +1,49 @@
+"""
+🧪 Tests for the batched trend fits
+"""
+import numpy as np
+
+from trend import _design, fit_trends
+
+
+def _reference(values, days, observed, period=7):
+    """Per-series least squares over the observed days only"""
+    X = _design(days, int(days[0]), period)
+    return np.array([np.linalg.lstsq(X[mask], y[mask], rcond=None)[0]
+                     for y, mask in zip(values, observed)])
+
+
+def test_fit_trends_matches_lstsq():
+    rng = np.random.default_rng(0)
+    days = np.arange(19000, 19120)
+    weekday = rng.normal(0, 20, 7)[days % 7]
+    values = 100 + rng.normal(0, 5, (6, 1)) * (days - days[0]) + weekday + rng.normal(0, 3, (6, len(days)))
+    observed = rng.random(values.shape) > 0.3
+
+    fit = fit_trends(values, days, observed)
+
+    np.testing.assert_allclose(fit.coefficients, _reference(values, days, observed), rtol=1e-6, atol=1e-6)
+    np.testing.assert_array_equal(fit.n_observed, observed.sum(axis=1))
+
+
+def test_fit_trends_masks_nan_days_without_observed():
+    rng = np.random.default_rng(1)
+    days = np.arange(200, 260)
+    values = 50 + 0.5 * (days - days[0]) + rng.normal(0, 1, (3, len(days)))
+    values[rng.random(values.shape) < 0.2] = np.nan
+
+    fit = fit_trends(values, days)
+
+    expected = _reference(np.nan_to_num(values), days, np.isfinite(values))
+    np.testing.assert_allclose(fit.coefficients, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_fit_trends_chunks_agree():
+    rng = np.random.default_rng(2)
+    days = np.arange(0, 90)
+    values = rng.gamma(2, 10, (10, len(days)))
+
+    whole = fit_trends(values, days)
+    chunked = fit_trends(values, days, chunk_series=3)
+
+    np.testing.assert_allclose(chunked.coefficients, whole.coefficients, rtol=1e-9, atol=1e-9)
@@ -0,0 +1,172 @@
+"""
+📐 Trend Models for Smart Sales Forecasting AI
+Batched least-squares trend and weekday fits over many daily series
+"""
+import numpy as np
+
+from perf_monitor import tracer
+
+# Seasonal dummies repeat every SEASON_PERIOD days (weekdays by default)
+SEASON_PERIOD = 7
+
+# Series fitted per block, bounding the temporary masked copies
+CHUNK_SERIES = 4096
+
+# Relative ridge added to the normal equations so series that never sold
+# on some weekday still have a unique solution
+_RIDGE = 1e-10
+
+
+class TrendFit:
+    """Trend + seasonal dummy coefficients of many series on one calendar
+
+    coefficients[s] holds series s's level on day origin, its slope per
+    day, then the effects of season positions 1 .. period - 1 relative to
+    position 0, where a day's position is its day number modulo period.
+    Series with fewer than two observed days have NaN coefficients.
+    """
+
+    def __init__(self, coefficients, days, period=SEASON_PERIOD, n_observed=None):
+        self.coefficients = coefficients
+        self.days = np.asarray(days)
+        self.origin = int(self.days[0]) if len(self.days) else 0
+        self.period = period
+        self.n_observed = n_observed
+
+    def __len__(self):
+        return len(self.coefficients)
+
+    def __getitem__(self, rows):
+        """Fit of a subset of the series (a single index keeps one row)"""
+        rows = np.atleast_1d(rows)
+        n_observed = self.n_observed[rows] if self.n_observed is not None else None
+        return TrendFit(self.coefficients[rows], self.days, self.period, n_observed)
+
+    def with_rows(self, rows, part):
+        """Fit on part's calendar with the given rows taken from part, a fit of
+        just those rows; the other series keep their coefficients"""
+        coefficients = np.array(self.coefficients)
+        coefficients[rows] = part.coefficients
+        n_observed = None
+        if self.n_observed is not None and part.n_observed is not None:
+            n_observed = np.array(self.n_observed)
+            n_observed[rows] = part.n_observed
+        return TrendFit(coefficients, part.days, self.period, n_observed)
+
+    @property
+    def intercept(self):
+        return self.coefficients[:, 0]
+
+    @property
+    def slope(self):
+        """Trend in sales per day"""
+        return self.coefficients[:, 1]
+
+    def predict(self, days):
+        """Model values of every series on the given days, as a series x days array"""
+        return self.coefficients @ _design(days, self.origin, self.period).T
+
+    def fitted(self):
+        """Model values over the fitted calendar"""
+        return self.predict(self.days)
+
+    def trend(self, days=None):
+        """The trend component alone (level plus slope, no seasonal effects)"""
+        days = self.days if days is None else np.asarray(days)
+        return self.intercept[:, None] + self.slope[:, None] * (days - self.origin)
+
+    def forecast(self, horizon):
+        """Model values of the horizon days after the fitted calendar"""
+        last = int(self.days[-1]) if len(self.days) else self.origin - 1
+        return self.predict(np.arange(last + 1, last + 1 + horizon))
+
+
+def _design(days, origin, period):
+    """[1, day - origin, season dummies] for every day"""
+    days = np.asarray(days, dtype=np.int64)
+    X = np.zeros((len(days), 2 + period - 1))
+    X[:, 0] = 1.0
+    X[:, 1] = days - origin
+    season = days % period
+    rows = np.flatnonzero(season > 0)
+    X[rows, 1 + season[rows]] = 1.0
+    return X
+
+
+@tracer.traced('model: trend fit', 'model')
+def fit_trends(values, days, observed=None, period=SEASON_PERIOD, chunk_series=CHUNK_SERIES):
+    """Least-squares trend + seasonal dummy fit of every row of values at once
+
+    values is a series x days array (or one series) on the calendar days;
+    observed optionally masks the days each series has data for, so gaps
+    are left out of the fit rather than counted as zero sales. All series
+    share one design matrix X, so each series' normal equations
+    X'WX b = X'Wy come from two matrix products over a block of series,
+    and the small systems are solved together.
+    """
+    values = np.atleast_2d(values)
+    days = np.asarray(days)
+    n_series, n_days = values.shape
+    origin = int(days[0]) if len(days) else 0
+    X = _design(days, origin, period)
+    k = X.shape[1]
+
+    # Time is scaled to [0, 1] for the solve so the systems stay well conditioned
+    span = max(int(days[-1]) - origin, 1) if len(days) else 1
+    Xs = X.copy()
+    Xs[:, 1] /= span
+
+    # X'WX only involves the observed-day count, sum of t and sum of t² of
+    # each season position, so one product with this T x 3 * period matrix
+    # gives every entry
+    season = np.asarray(days, dtype=np.int64) % period
+    onehot = (season[:, None] == np.arange(period)).astype(np.float64)
+    t = Xs[:, 1:2]
+    moments = np.hstack([onehot, onehot * t, onehot * t ** 2])
+    diagonal = np.arange(2, k)
+
+    coefficients = np.empty((n_series, k))
+    n_observed = np.empty(n_series, dtype=np.int64)
+    for first in range(0, n_series, chunk_series):
+        block = slice(first, min(first + chunk_series, n_series))
+        if observed is None:
+            weight = np.isfinite(values[block])
+            y = np.where(weight, values[block], 0.0)
+            weight = weight.astype(np.float64)
+        else:
+            weight = np.atleast_2d(observed)[block].astype(np.float64)
+            y = values[block] * weight
+
+        count, t_sum, t2_sum = np.split(weight @ moments, 3, axis=1)
+        A = np.zeros((len(count), k, k))
+        A[:, 0, 0] = count.sum(axis=1)
+        A[:, 0, 1] = A[:, 1, 0] = t_sum.sum(axis=1)
+        A[:, 1, 1] = t2_sum.sum(axis=1)
+        A[:, 0, 2:] = A[:, 2:, 0] = A[:, diagonal, diagonal] = count[:, 1:]
+        A[:, 1, 2:] = A[:, 2:, 1] = t_sum[:, 1:]
+        b = y @ Xs
+        n_observed[block] = A[:, 0, 0]
+        ridge = _RIDGE * np.maximum(np.trace(A, axis1=1, axis2=2), 1.0)
+        A[:, np.arange(k), np.arange(k)] += ridge[:, None]
+        coefficients[block] = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+
+    coefficients[:, 1] /= span
+    coefficients[n_observed < 2] = np.nan
+    return TrendFit(coefficients, days, period, n_observed)
+
+
+def fit_matrix_trends(matrix, period=SEASON_PERIOD, rows=None):
+    """fit_trends of every product row of a DailyMatrix, plus the total of
+    all products as the last row; days without records are masked
+
+    rows optionally picks ascending rows, len(matrix.products) standing for
+    the total.
+    """
+    n_products = len(matrix.products)
+    rows = np.arange(n_products + 1) if rows is None else np.asarray(rows)
+    products = rows[rows < n_products]
+    fits = [fit_trends(matrix.values[products], matrix.days, matrix.counts[products] > 0, period)]
+    if len(products) < len(rows):
+        fits.append(fit_trends(matrix.totals, matrix.days, matrix.total_counts > 0, period))
+    return TrendFit(np.vstack([fit.coefficients for fit in fits]), matrix.days, period,
+                    np.concatenate([fit.n_observed for fit in fits]))
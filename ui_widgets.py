@@ -0,0 +1,225 @@
+"""
+🧩 Reusable Widgets for Smart Sales Forecasting AI
+Tk widgets that stay responsive with catalog-sized data
+"""
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+
+class UpdateScheduler:
+    """Debounced, coalesced UI work on the Tk event loop
+
+    request(key, callback, delay_ms) schedules the callback with after(); a
+    newer request under the same key replaces the pending one, so a burst
+    of changes runs the work once, for the latest state. Callbacks always
+    start from the event loop, never nested inside another handler.
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._pending = {}
+
+    def request(self, key, callback, delay_ms=0):
+        self.cancel(key)
+        self._pending[key] = self.widget.after(delay_ms, self._run, key, callback)
+
+    def cancel(self, key):
+        after_id = self._pending.pop(key, None)
+        if after_id is not None:
+            self.widget.after_cancel(after_id)
+
+    def _run(self, key, callback):
+        self._pending.pop(key, None)
+        callback()
+
+
+class VirtualGrid(tk.Frame):
+    """Sortable, filterable table that only renders the visible rows
+
+    Rows live in NumPy column arrays; the Treeview holds just the handful
+    of rows on screen and is refilled on scroll, so loading, sorting and
+    filtering cost array operations rather than one widget item per row.
+    """
+
+    def __init__(self, parent, columns, widths=None, anchors=None, formats=None,
+                 filter_column=None, on_open=None, style='Custom.Treeview', bg=None):
+        """formats maps a column to a format string or a callable for display;
+        on_open is called with the backing row index of an activated row."""
+        super().__init__(parent, bg=bg)
+        self.columns = tuple(columns)
+        self.formats = formats or {}
+        self.filter_column = filter_column
+        self.on_open = on_open
+
+        self.data = {col: np.empty(0) for col in self.columns}
+        self.tags = None
+        self.view = np.empty(0, dtype=np.int64)
+        self.top = 0
+        self.visible_rows = 12
+        self.sort_column = None
+        self.sort_descending = False
+        self._filter_keys = None
+        self._filter_text = ''
+
+        row_height = ttk.Style().lookup(style, 'rowheight')
+        self._row_height = int(row_height) if row_height else 20
+
+        if filter_column is not None:
+            filter_frame = tk.Frame(self, bg=bg)
+            filter_frame.pack(fill=tk.X, pady=(0, 8))
+
+            tk.Label(filter_frame,
+                     text=f"Filter {filter_column}:",
+                     font=('Segoe UI', 10),
+                     bg=bg,
+                     fg='#8892b0').pack(side=tk.LEFT)
+
+            self.filter_var = tk.StringVar()
+            self.filter_var.trace_add('write', lambda *_: self.set_filter(self.filter_var.get()))
+            tk.Entry(filter_frame,
+                     textvariable=self.filter_var,
+                     font=('Segoe UI', 10),
+                     bg='#2d3748',
+                     fg='white',
+                     insertbackground='white',
+                     relief='flat').pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 0))
+
+        table_frame = tk.Frame(self, bg=bg)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(table_frame, columns=self.columns, show='headings',
+                                 style=style, height=self.visible_rows)
+        for col in self.columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=(widths or {}).get(col, 120),
+                             anchor=(anchors or {}).get(col, tk.CENTER))
+
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-1))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(1))
+        self.tree.bind('<Double-1>', self._on_open)
+        self.tree.bind('<Return>', self._on_open)
+
+    def __len__(self):
+        return len(self.view)
+
+    def set_data(self, data, tags=None):
+        """Replace the rows; data maps every column to an array-like of equal length
+
+        tags optionally gives one Treeview tag per row (see tag_configure).
+        """
+        self.data = {}
+        for col in self.columns:
+            values = np.asarray(data[col])
+            # Text columns become fixed-width unicode so sorting stays in C
+            if values.dtype == object:
+                values = values.astype(str)
+            self.data[col] = values
+        self.tags = None if tags is None else np.asarray(tags, dtype=str)
+
+        if self.filter_column is not None:
+            self._filter_keys = np.char.lower(self.data[self.filter_column])
+
+        self._rebuild_view()
+
+    def clear(self):
+        self.set_data({col: np.empty(0) for col in self.columns})
+
+    def tag_configure(self, tag, **options):
+        self.tree.tag_configure(tag, **options)
+
+    def sort_by(self, column, descending=None):
+        """Sort by a column; clicking the same heading again reverses the order"""
+        if descending is None:
+            descending = not self.sort_descending if column == self.sort_column else False
+        self.sort_column = column
+        self.sort_descending = descending
+
+        for col in self.columns:
+            arrow = (' ▼' if descending else ' ▲') if col == column else ''
+            self.tree.heading(col, text=col + arrow)
+        self._rebuild_view()
+
+    def set_filter(self, text):
+        """Keep rows whose filter column contains text (case-insensitive)"""
+        self._filter_text = text.strip().lower()
+        self._rebuild_view()
+
+    def row(self, index):
+        """Backing values of one row as a dict"""
+        return {col: self.data[col][index] for col in self.columns}
+
+    def scroll(self, rows):
+        self._scroll_to(self.top + rows)
+
+    def _rebuild_view(self):
+        view = np.arange(len(self.data[self.columns[0]]))
+        if self._filter_text and self._filter_keys is not None:
+            view = view[np.char.find(self._filter_keys, self._filter_text) >= 0]
+
+        if self.sort_column is not None and len(view):
+            keys = self.data[self.sort_column][view]
+            # Missing values go last in both directions
+            missing = np.isnan(keys) if keys.dtype.kind == 'f' else np.zeros(len(keys), dtype=bool)
+            present = np.flatnonzero(~missing)
+            keys = keys[present]
+            if self.sort_descending:
+                # Stable sort of the reversed keys, reversed back: descending
+                # with ties still in row order, and no negation to overflow
+                # unsigned columns
+                order = (len(keys) - 1 - np.argsort(keys[::-1], kind='stable'))[::-1]
+            else:
+                order = np.argsort(keys, kind='stable')
+            view = np.concatenate([view[present[order]], view[missing]])
+
+        self.view = view
+        self._scroll_to(0)
+
+    def _scroll_to(self, top):
+        self.top = int(max(0, min(top, len(self.view) - self.visible_rows)))
+        self._render()
+
+    def _render(self):
+        self.tree.delete(*self.tree.get_children())
+        rows = self.view[self.top:self.top + self.visible_rows]
+        for index in rows:
+            values = []
+            for col in self.columns:
+                value = self.data[col][index]
+                fmt = self.formats.get(col)
+                if callable(fmt):
+                    value = fmt(value)
+                elif fmt:
+                    value = fmt.format(value)
+                values.append(value)
+            tags = (self.tags[index],) if self.tags is not None else ()
+            self.tree.insert('', 'end', iid=str(index), values=values, tags=tags)
+
+        total = max(len(self.view), 1)
+        self.scrollbar.set(self.top / total, min((self.top + self.visible_rows) / total, 1.0))
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self._scroll_to(round(float(amount) * len(self.view)))
+        elif unit == 'pages':
+            self.scroll(int(amount) * self.visible_rows)
+        else:
+            self.scroll(int(amount))
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self._row_height - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._scroll_to(self.top)
+
+    def _on_open(self, event=None):
+        selection = self.tree.selection()
+        if selection and self.on_open is not None:
+            self.on_open(int(selection[0]))